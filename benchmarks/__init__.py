@@ -0,0 +1,4 @@
+import os
+
+# benchmark 不寫 tech_agent.log 到專案目錄（需在 import utils.logger 之前設定）
+os.environ.setdefault("TECH_LOG_PATH", "")
@@ -0,0 +1,101 @@
+"""Session 歷史查詢：``SELECT *`` 全部輪次 vs. 投影 + ``TOP @k`` 參數化查詢.
+
+離線模式（預設）：以測試資料中的完整對話紀錄為樣板，合成 10 / 50 / 200 輪的 session，
+比較回傳 payload 大小（RU 主要隨回傳位元組與文件數成長）、每輪儲存大小（完整文件 vs. turn record）
+與 JSON 解碼 + 組 messages 的時間。
+
+線上模式：設定 TECH_COSMOS_URL / TECH_COSMOS_KEY / TECH_COSMOS_DB / TECH_COSMOS_CONTAINER
+與 BENCH_SESSION_IDS（逗號分隔的長 session）後，對實際 container 執行兩種查詢，
+回報每次查詢的 RU（x-ms-request-charge，跨頁加總）與延遲。
+
+    python -m benchmarks.bench_history_query
+"""
+
+import json
+import os
+import time
+
+from benchmarks.common import summarize
+from src.integrations.cosmos_process import HISTORY_QUERY, MOCK_HISTORY, project_history, split_turn
+from src.integrations.session_state import SessionState
+
+TURNS = (10, 50, 200)
+WINDOW = 20
+REPEATS = 200
+LEGACY_QUERY = 'SELECT * FROM c where c.session_id = "{}" ORDER BY c._ts'
+
+
+def synthetic_session(turns: int) -> list:
+    template = MOCK_HISTORY[0]
+    return [{**template, "user_input": f"{template['user_input']} #{i}", "_ts": 1_700_000_000 + i} for i in range(turns)]
+
+
+def offline():
+    for turns in TURNS:
+        docs = synthetic_session(turns)
+        legacy_payload = json.dumps(docs, ensure_ascii=False).encode("utf-8")
+        turn_records = [split_turn(doc)[0] for doc in docs]  # hot/cold 拆分後 chat log 只存 turn
+        projected_payload = json.dumps(
+            [project_history(doc) for doc in turn_records[-WINDOW:]], ensure_ascii=False
+        ).encode("utf-8")
+
+        legacy_ms, projected_ms = [], []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            results = json.loads(legacy_payload)
+            SessionState.from_history([project_history(doc) for doc in results], None).history("q")
+            legacy_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            SessionState.from_history(json.loads(projected_payload), None).history("q")
+            projected_ms.append((time.perf_counter() - start) * 1000)
+
+        print(f"turns={turns:<4} payload SELECT * = {len(legacy_payload) / 1024:8.1f}KiB   "
+              f"projected TOP {WINDOW} = {len(projected_payload) / 1024:6.1f}KiB   "
+              f"stored/turn full = {len(legacy_payload) / turns / 1024:5.1f}KiB  "
+              f"turn record = {len(json.dumps(turn_records[-1], ensure_ascii=False).encode()) / 1024:5.1f}KiB")
+        print("  " + summarize("decode SELECT *", legacy_ms))
+        print("  " + summarize("decode projected", projected_ms))
+
+
+def query_with_charge(container, **kwargs):
+    """回傳 (文件數, RU, 毫秒)；RU 為各頁 request charge 加總"""
+    start = time.perf_counter()
+    count, charge = 0, 0.0
+    for page in container.query_items(**kwargs).by_page():
+        count += len(list(page))
+        charge += float(container.client_connection.last_response_headers.get("x-ms-request-charge", 0))
+    return count, charge, (time.perf_counter() - start) * 1000
+
+
+def online(session_ids):
+    from azure.cosmos import CosmosClient
+
+    client = CosmosClient(os.environ["TECH_COSMOS_URL"], credential=os.environ["TECH_COSMOS_KEY"])
+    container = client.get_database_client(os.environ["TECH_COSMOS_DB"]).get_container_client(
+        os.environ["TECH_COSMOS_CONTAINER"]
+    )
+    for session_id in session_ids:
+        legacy = query_with_charge(
+            container, query=LEGACY_QUERY.format(session_id), enable_cross_partition_query=True
+        )
+        projected = query_with_charge(
+            container,
+            query=HISTORY_QUERY,
+            parameters=[{"name": "@session_id", "value": session_id}, {"name": "@k", "value": WINDOW}],
+            partition_key=session_id,
+        )
+        for name, (count, charge, ms) in (("SELECT *", legacy), (f"projected TOP {WINDOW}", projected)):
+            print(f"{session_id}  {name:<18} docs={count:<4} RU={charge:8.2f}  latency={ms:8.1f}ms")
+
+
+def run():
+    session_ids = [s for s in os.environ.get("BENCH_SESSION_IDS", "").split(",") if s]
+    if session_ids and os.environ.get("TECH_COSMOS_URL"):
+        online(session_ids)
+    else:
+        offline()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,81 @@
+"""Startup load time / resident memory: kb_mappings.pkl（unpickle 成 dict）vs. mmap KBStore.
+
+每種格式在獨立的 spawn 子行程量測，RSS 取自 /proc/self/status（含共用的檔案頁）：
+載入後、以及模擬線上查詢隨機讀取 200 筆 content 之後各量一次。
+
+    python -m benchmarks.bench_kb_store
+"""
+
+import multiprocessing
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from src.integrations.kb_store import KBStore
+
+PICKLE_PATH = "config/kb_mappings.pkl"
+LOOKUPS = 200
+
+
+def rss_kib() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def load_pickle(_):
+    with open(PICKLE_PATH, "rb") as f:
+        return pickle.load(f)
+
+
+def load_store(path):
+    return KBStore.open(path)
+
+
+def measure(loader, path, keys, queue):
+    before = rss_kib()
+    start = time.perf_counter()
+    mapping = loader(path)
+    load_ms = (time.perf_counter() - start) * 1000
+    after_load = rss_kib()
+    start = time.perf_counter()
+    for key in keys:
+        mapping.get(key).get("content")
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(keys)
+    queue.put((load_ms, after_load - before, rss_kib() - before, lookup_us))
+
+
+def run():
+    with open(PICKLE_PATH, "rb") as f:
+        kb_mappings = pickle.load(f)
+    keys = random.Random(0).sample(list(kb_mappings), LOOKUPS)
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "kb_store.bin")
+        compressed = os.path.join(directory, "kb_store_zlib.bin")
+        KBStore.write(plain, kb_mappings)
+        KBStore.write(compressed, kb_mappings, compression="zlib")
+        print(f"file size: pickle={os.path.getsize(PICKLE_PATH) / 2**20:.2f}MiB "
+              f"store={os.path.getsize(plain) / 2**20:.2f}MiB store+zlib={os.path.getsize(compressed) / 2**20:.2f}MiB")
+
+        ctx = multiprocessing.get_context("spawn")
+        for name, loader, path in (
+            ("pickle dict", load_pickle, PICKLE_PATH),
+            ("KBStore mmap", load_store, plain),
+            ("KBStore mmap + zlib", load_store, compressed),
+        ):
+            queue = ctx.Queue()
+            process = ctx.Process(target=measure, args=(loader, path, keys, queue))
+            process.start()
+            load_ms, load_rss, total_rss, lookup_us = queue.get()
+            process.join()
+            print(f"{name:<22} load={load_ms:8.2f}ms  rss+load={load_rss / 1024:6.2f}MiB  "
+                  f"rss+{LOOKUPS}lookups={total_rss / 1024:6.2f}MiB  lookup={lookup_us:6.2f}us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,85 @@
+"""Intent 高頻詞比對：逐一子字串迴圈 vs. Aho-Corasick 自動機.
+
+以線上 intent_dict 為基礎，再補上合成 keyword 到數千個（中英混合、長度 2~12），
+對一批模擬使用者問句（多數不含任何 keyword，最壞情況需走完整個迴圈）逐句比對，
+並確認兩者結果完全一致。
+
+    python -m benchmarks.bench_keyword_matcher
+"""
+
+import random
+import string
+import time
+
+from benchmarks.common import summarize
+from src.services.service_discriminator_merge_input import KeywordSearch
+from utils.keyword_matcher import KeywordMatcher
+
+KEYWORD_COUNTS = (500, 2000, 5000)
+QUERIES = 2000
+CJK = "筆電螢幕開機藍屏無法充電鍵盤觸控板喇叭聲音風扇過熱驅動程式更新重灌系統網路連線藍牙耳機滑鼠電池"
+
+
+def synthetic_intent_dict(rng, total):
+    intent_dict = {intent: list(keywords) for intent, keywords in KeywordSearch(config={}).get_intent_dict().items()}
+    count = sum(len(keywords) for keywords in intent_dict.values())
+    intents = list(intent_dict)
+    while count < total:
+        if rng.random() < 0.5:
+            keyword = "".join(rng.choices(CJK, k=rng.randint(2, 5)))
+        else:
+            keyword = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        intent_dict[rng.choice(intents)].append(keyword)
+        count += 1
+    return intent_dict
+
+
+def make_queries(rng):
+    templates = [
+        "我的筆電{}怎麼辦", "請問{}要怎麼處理", "my laptop {} after the update", "{}",
+        "電腦開機後{}，已經試過重開機", "how do i fix {} on my zenbook",
+    ]
+    fillers = [
+        "一直閃爍", "沒有反應", "screen flickers", "no sound", "卡在 logo", "wifi keeps dropping",
+        "保固期限到了嗎", "想查維修進度", "need the invoice",
+    ]
+    return [rng.choice(templates).format(rng.choice(fillers)) for _ in range(QUERIES)]
+
+
+def loop_search(intent_dict, text):
+    for intent, keywords in intent_dict.items():
+        for keyword in keywords:
+            if keyword in text:
+                return keyword, intent
+    return None
+
+
+def timed(fn, queries):
+    durations, results = [], []
+    for text in queries:
+        start = time.perf_counter()
+        results.append(fn(text))
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations, results
+
+
+def run():
+    rng = random.Random(0)
+    queries = make_queries(rng)
+    for total in KEYWORD_COUNTS:
+        intent_dict = synthetic_intent_dict(rng, total)
+        start = time.perf_counter()
+        matcher = KeywordMatcher(intent_dict)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        loop_ms, loop_results = timed(lambda text: loop_search(intent_dict, text), queries)
+        matcher_ms, matcher_results = timed(matcher.search, queries)
+        assert loop_results == matcher_results
+        hits = sum(result is not None for result in matcher_results)
+        print(f"keywords={len(matcher)}  build={build_ms:.1f}ms  hits={hits}/{len(queries)}")
+        print("  " + summarize("loop", loop_ms))
+        print("  " + summarize("aho-corasick", matcher_ms))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,56 @@
+"""Per-request CPU: ChatFlow 每次建立 Translator vs. 使用 lifespan 預載的共用實例.
+
+舊流程在 ``ChatFlow.__init__`` 解碼憑證、建立 translate.Client、反序列化 langid 模型、
+建立 OpenCC；新流程只取用 container 上的 ``language_processor``。
+
+    python -m benchmarks.bench_language_processor
+"""
+
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+from benchmarks.common import fake_llm_config, summarize
+from shared_lib.sharedlib.get_translation import Translator
+from src.core.chat_flow import ChatFlow
+
+ITERATIONS = 5
+SHARED_ITERATIONS = 1000
+
+
+def measure(build, iterations):
+    wall, cpu = [], []
+    for _ in range(iterations):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        build()
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+    return wall, cpu
+
+
+def run():
+    creds_b64 = fake_llm_config()["TECH_GEMINI_CREDENTIALS"]
+    data = SimpleNamespace(product_line="notebook")
+
+    def per_request():
+        # 等同舊版 ChatFlow.__init__ 的工作
+        info = json.loads(base64.b64decode(creds_b64))
+        Translator(info=info, client=None)
+
+    shared = Translator(info=json.loads(base64.b64decode(creds_b64)), client=None)
+    container = SimpleNamespace(language_processor=shared)
+
+    def with_shared():
+        ChatFlow(data=data, last_hint=None, container=container)
+
+    wall, cpu = measure(per_request, ITERATIONS)
+    print(summarize("wall / per-request Translator", wall))
+    print(summarize("cpu  / per-request Translator", cpu))
+    wall, cpu = measure(with_shared, SHARED_ITERATIONS)
+    print(summarize("wall / shared processor", wall))
+    print(summarize("cpu  / shared processor", cpu))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,64 @@
+"""Per-request setup cost: 每次重建 LLM clients vs. 共用 LLMClientRegistry.
+
+模擬 ``ServiceProcess`` 在每個 request 建立 ``TSRAG`` + ``TSProductLine``：
+
+* before: 每個 service 自行解碼憑證、建立 genai.Client / AsyncAzureOpenAI
+* after:  從 lifespan 建好的 registry 取得共用 client
+
+另外以 N 個並行 request（setup + 50ms 假 LLM 呼叫）量測端到端延遲的尾端，
+setup 是跑在 event loop 上的同步 CPU 工作，會直接拉高其他 request 的 p99。
+
+    python -m benchmarks.bench_llm_client_registry
+"""
+
+import asyncio
+import time
+
+from benchmarks.common import fake_llm_config, summarize
+from src.core.technical_support_async import TSProductLine, TSRAG
+from src.integrations.llm_clients import LLMClientRegistry
+
+ITERATIONS = 200
+CONCURRENCY = 50
+FAKE_LLM_LATENCY = 0.05
+
+
+def build_services(config, clients):
+    TSRAG(config=config, clients=clients)
+    TSProductLine(config=config, productline_name_map={}, clients=clients)
+
+
+def setup_cost(config, clients) -> list:
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        build_services(config, clients)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def request_latency(config, clients) -> list:
+    async def one_request():
+        start = time.perf_counter()
+        build_services(config, clients)
+        await asyncio.sleep(FAKE_LLM_LATENCY)
+        return (time.perf_counter() - start) * 1000
+
+    samples = []
+    for _ in range(ITERATIONS // CONCURRENCY):
+        samples.extend(await asyncio.gather(*(one_request() for _ in range(CONCURRENCY))))
+    return samples
+
+
+def run():
+    config = fake_llm_config()
+    registry = LLMClientRegistry(config)
+
+    print(summarize("setup / per-request clients", setup_cost(config, None)))
+    print(summarize("setup / shared registry", setup_cost(config, registry)))
+    print(summarize("e2e / per-request clients", asyncio.run(request_latency(config, None))))
+    print(summarize("e2e / shared registry", asyncio.run(request_latency(config, registry))))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,92 @@
+"""Recall vs. latency: LocalVectorIndex（mmap float32 / float16）對照 in-memory brute force.
+
+合成資料：N 筆 DIM 維、群聚分布的向量（相似度接近，較能看出 float16 的排序誤差），
+metadata 與線上 FAQ 類似（3 個 site、多 productLine、兩個 version）。
+Brute force 為全矩陣 float64 內積 + 全排序，作為 recall 的標準答案。
+
+    python -m benchmarks.bench_local_vector_index
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize
+from src.integrations.local_vector_index import LocalVectorIndex
+
+N = 50000
+DIM = 384
+CLUSTERS = 200
+QUERIES = 200
+TOP_N = 10
+SITES = ("tw", "us", "jp")
+PRODUCT_LINES = ("notebook", "desktop", "phone", "motherboard", "nuc", "chromebook")
+
+
+def synthetic(rng):
+    centers = rng.normal(size=(CLUSTERS, DIM))
+    embeddings = (centers[rng.integers(CLUSTERS, size=N)] + 0.35 * rng.normal(size=(N, DIM))).astype(np.float32)
+    records = [
+        {
+            "kb_no": 1000000 + i,
+            "websiteCode": SITES[i % len(SITES)],
+            "productLine": ",".join(p for j, p in enumerate(PRODUCT_LINES) if (i >> j) & 1) or "notebook",
+            "version": "4.0" if i % 10 else "5.0",
+            "hide": 999,
+        }
+        for i in range(N)
+    ]
+    return embeddings, records
+
+
+def brute_force(normed, records, query, payload):
+    scores = normed @ (query / np.linalg.norm(query))
+    keep = np.array([
+        r["websiteCode"] == payload["websiteCode"]
+        and r["version"] == payload["version"]
+        and payload["productLine"] in r["productLine"].split(",")
+        for r in records
+    ])
+    scores = np.where(keep, scores, -np.inf)
+    return set(np.argsort(-scores)[:payload["n"]].tolist())
+
+
+def run():
+    rng = np.random.default_rng(0)
+    embeddings, records = synthetic(rng)
+    normed = embeddings.astype(np.float64)
+    normed /= np.linalg.norm(normed, axis=1, keepdims=True)
+    queries = embeddings[rng.integers(N, size=QUERIES)] + 0.2 * rng.normal(size=(QUERIES, DIM)).astype(np.float32)
+    payloads = [
+        {"websiteCode": SITES[q % len(SITES)], "productLine": PRODUCT_LINES[q % len(PRODUCT_LINES)],
+         "version": "4.0", "n": TOP_N, "hide_min": 0, "hide_max": 999}
+        for q in range(QUERIES)
+    ]
+
+    truth, latency = [], []
+    for query, payload in zip(queries, payloads):
+        start = time.perf_counter()
+        truth.append(brute_force(normed, records, query, payload))
+        latency.append((time.perf_counter() - start) * 1000)
+    print(summarize("brute force (f64, dict filter)", latency))
+
+    for dtype in ("float32", "float16"):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            index = LocalVectorIndex.build(directory, embeddings, records, dtype=dtype)
+            build_s = time.perf_counter() - start
+            latency, hits = [], 0
+            for query, payload, expected in zip(queries, payloads, truth):
+                start = time.perf_counter()
+                rows, _ = index.top_k(query, payload)
+                latency.append((time.perf_counter() - start) * 1000)
+                hits += len(expected & set(rows.tolist()))
+            print(summarize(f"LocalVectorIndex {dtype} (mmap)", latency))
+            print(f"{'':<32} recall@{TOP_N}={hits / (TOP_N * QUERIES):.4f} "
+                  f"matrix={index.embeddings.nbytes / 2**20:.1f}MiB build={build_s:.2f}s")
+            del index
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""每個 request 的 payload log 成本：同步 ``json.dumps(indent=2)`` + FileHandler vs. 佇列 + LazyJson.
+
+以測試資料中的完整對話紀錄當 cosmos_data，量測呼叫端（event loop thread）每次 log 花費的時間：
+- legacy：呼叫前先序列化，FileHandler 在呼叫端寫檔
+- queued：LazyJson 在呼叫端序列化、背景 thread 寫檔（sample rate 1.0 / 0.1）
+- disabled：stage level 調高後不輸出，LazyJson 不序列化
+
+    python -m benchmarks.bench_logging
+"""
+
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+import utils.logger as log_module
+from benchmarks.common import summarize
+from src.integrations.cosmos_process import MOCK_HISTORY
+from utils.logger import DroppingQueueHandler, LazyJson
+
+REPEATS = 2000
+
+
+def measure(name, emit):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        emit()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(summarize(name, samples))
+
+
+def bench_logger(name, handler):
+    bench = logging.getLogger(f"bench.{name}")
+    bench.handlers[:] = [handler]
+    bench.propagate = False
+    bench.setLevel(logging.INFO)
+    return bench
+
+
+def run():
+    payload = MOCK_HISTORY[0]
+    print(f"payload {len(json.dumps(payload, ensure_ascii=False).encode()) / 1024:.1f}KiB, {REPEATS} records")
+    with tempfile.TemporaryDirectory() as directory:
+        file_handler = logging.FileHandler(os.path.join(directory, "legacy.log"), encoding="utf-8")
+        legacy = bench_logger("legacy", file_handler)
+
+        def legacy_emit():
+            log_json = json.dumps(payload, ensure_ascii=False, indent=2)
+            legacy.info(f"\n[Cosmos DB] 寫入資料: {log_json}\n")
+
+        measure("legacy sync", legacy_emit)
+        file_handler.close()
+
+        queued_file = logging.FileHandler(os.path.join(directory, "queued.log"), encoding="utf-8")
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=REPEATS * 4))
+        listener = QueueListener(queue_handler.queue, queued_file)
+        listener.start()
+        queued = bench_logger("queued", queue_handler)
+        for rate in (1.0, 0.1):
+            log_module.LARGE_PAYLOAD_SAMPLE_RATE = rate
+            measure(f"queued rate={rate:g}",
+                    lambda: queued.info("\n[Cosmos DB] 寫入資料: %s\n", LazyJson(payload, large=True)))
+        queued.setLevel(logging.WARNING)
+        measure("queued disabled",
+                lambda: queued.info("\n[Cosmos DB] 寫入資料: %s\n", LazyJson(payload, large=True)))
+        listener.stop()
+        queued_file.close()
+        print(f"dropped (queue full): {queue_handler.dropped}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,92 @@
+"""Per-worker memory: 每個 worker 各自 unpickle mappings vs. 共用 mmap mapping snapshot.
+
+以 spawn 啟動 1 / 4 / 8 個 worker（模擬 uvicorn --workers），各自載入
+rag_mappings / rag_hint_id_index_mapping / kb_mappings 並做 200 次查詢；
+所有 worker 都載入完成後才同時讀取 /proc/self/smaps_rollup：
+USS = Private_Clean + Private_Dirty（該 worker 獨佔的記憶體），PSS 則把共用頁平均分攤。
+數值為「載入後 - 載入前」，扣除直譯器與 import 的基本開銷。
+
+    python -m benchmarks.bench_mapping_snapshot
+"""
+
+import multiprocessing
+import os
+import pickle
+import random
+import tempfile
+
+from src.integrations import mapping_snapshot
+
+WORKER_COUNTS = (1, 4, 8)
+LOOKUPS = 200
+RAG_PICKLES = ("config/rag_mappings.pkl", "config/rag_hint_id_index_mapping.pkl")
+KB_PICKLE = "config/kb_mappings.pkl"
+
+
+def smaps_kib() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {"uss": values["Private_Clean"] + values["Private_Dirty"], "pss": values["Pss"]}
+
+
+def load_tables():
+    with open(RAG_PICKLES[0], "rb") as f1, open(RAG_PICKLES[1], "rb") as f2, open(KB_PICKLE, "rb") as f3:
+        return {
+            "rag_mappings": pickle.load(f1),
+            "rag_hint_id_index_mapping": pickle.load(f2),
+            "KB_mappings": pickle.load(f3),
+            "PL_mappings": {},
+            "productline_name_map": {},
+            "specific_kb_mappings": {},
+        }
+
+
+def worker(mode, snapshot_path, rag_keys, kb_keys, barrier, queue):
+    before = smaps_kib()
+    if mode == "pickle":
+        tables = load_tables()
+    else:
+        tables = mapping_snapshot.load_or_build(snapshot_path, "bench", load_tables).tables
+    for rag_key, kb_key in zip(rag_keys, kb_keys):
+        tables["rag_mappings"].get(rag_key)
+        tables["KB_mappings"].get(kb_key).get("content")
+    barrier.wait()  # 全部 worker 都載入後再量，共用頁才會被計為 shared
+    after = smaps_kib()
+    queue.put({k: after[k] - before[k] for k in after})
+    barrier.wait()
+
+
+def run():
+    tables = load_tables()
+    rng = random.Random(0)
+    rag_keys = rng.sample(list(tables["rag_mappings"]), LOOKUPS)
+    kb_keys = rng.sample(list(tables["KB_mappings"]), LOOKUPS)
+    ctx = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "mapping_snapshot.bin")
+        mapping_snapshot.load_or_build(snapshot_path, "bench", lambda: tables)  # 預先建檔，只量 attach
+        for mode in ("pickle", "snapshot"):
+            for count in WORKER_COUNTS:
+                barrier, queue = ctx.Barrier(count), ctx.Queue()
+                processes = [
+                    ctx.Process(target=worker, args=(mode, snapshot_path, rag_keys, kb_keys, barrier, queue))
+                    for _ in range(count)
+                ]
+                for process in processes:
+                    process.start()
+                results = [queue.get() for _ in processes]
+                for process in processes:
+                    process.join()
+                uss = sum(r["uss"] for r in results) / count / 1024
+                pss = sum(r["pss"] for r in results) / count / 1024
+                print(f"{mode:<9} workers={count}  USS/worker=+{uss:6.2f}MiB  PSS/worker=+{pss:6.2f}MiB  "
+                      f"USS total=+{uss * count:6.2f}MiB")
+
+
+if __name__ == "__main__":
+    run()
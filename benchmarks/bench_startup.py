@@ -0,0 +1,108 @@
+"""Cold start: import 時間分解與 time-to-ready（每次都是新的直譯器）。
+
+1. ``python -X importtime -c "import main"``：總 import 時間，並依頂層套件彙總 self time
+2. time-to-ready：import main 後載入 mappings，直到第一次查表完成
+   - legacy：read_excel 兩個 xlsx + unpickle 三個 mapping 檔（改版前的啟動路徑）
+   - snapshot cold：第一個 worker 建 mapping snapshot
+   - snapshot warm：snapshot 已存在，直接 mmap（其餘 worker / 重啟）
+
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+RUNS = 5
+TOP_PACKAGES = 12
+
+READY_SCRIPT = r"""
+import json, pickle, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+mode = sys.argv[1]
+if mode == "legacy":
+    import pandas as pd
+    for name in ("ts_rag_open_remarks_mappings", "pl_reask_open_remarks_mappings"):
+        pd.read_excel(f"data/{name}.xlsx").set_index("lang")["opening_remarks"].to_dict()
+    tables = {}
+    for name, path in (("rag_hint_id_index_mapping", "config/rag_hint_id_index_mapping.pkl"),
+                       ("rag_mappings", "config/rag_mappings.pkl"), ("KB_mappings", "config/kb_mappings.pkl")):
+        with open(path, "rb") as f:
+            tables[name] = pickle.load(f)
+else:
+    from src.integrations.containers import DependencyContainer
+    from src.integrations.mapping_snapshot import MappingTables
+    from src.services.update_service import UpdateService
+    containers = DependencyContainer.__new__(DependencyContainer)  # 不建立外部 client
+    containers.mappings = MappingTables()
+    containers.publish_mappings(UpdateService(containers).attach_mapping_snapshot())
+    tables = containers.mappings.as_dict()
+next(iter(tables["KB_mappings"].values()))
+next(iter(tables["rag_mappings"].values()))
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "ready": ready - start}))
+"""
+
+
+def import_breakdown():
+    """回傳 (總 import 秒數, {頂層套件: self 秒數})。"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True,
+    )
+    total, packages = 0.0, defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # 標題列
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        if name == "main":
+            total = int(cumulative_us) / 1e6
+    return total, packages
+
+
+def time_to_ready(mode: str, env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", READY_SCRIPT, mode],
+        capture_output=True, text=True, check=True, env=env,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run():
+    breakdowns = [import_breakdown() for _ in range(RUNS)]
+    totals = [total for total, _ in breakdowns]
+    packages = defaultdict(list)
+    for _, by_package in breakdowns:
+        for name, seconds in by_package.items():
+            packages[name].append(seconds)
+    print(f"import main: median {statistics.median(totals) * 1000:8.1f}ms over {RUNS} runs")
+    ranked = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+    for name, values in ranked[:TOP_PACKAGES]:
+        print(f"  {name:<28} self {statistics.median(values) * 1000:8.1f}ms")
+    print(f"  pandas imported: {'pandas' in packages}   openpyxl imported: {'openpyxl' in packages}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            TECH_MAPPING_SNAPSHOT_PATH=os.path.join(directory, "mapping_snapshot.bin"),
+            TECH_KB_STORE_PATH=os.path.join(directory, "kb_store.bin"),  # 不存在：由 kb_mappings.pkl 建 snapshot
+        )
+        for mode, runs in (("legacy", RUNS), ("snapshot-cold", 1), ("snapshot-warm", RUNS)):
+            results = [time_to_ready(mode, env) for _ in range(runs)]
+            ready = statistics.median(r["ready"] for r in results) * 1000
+            imported = statistics.median(r["import"] for r in results) * 1000
+            print(f"{mode:<14} time-to-ready {ready:8.1f}ms  (import {imported:8.1f}ms, mappings {ready - imported:8.1f}ms)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,58 @@
+"""Benchmark 共用小工具：假憑證設定與延遲統計。
+
+於專案根目錄以 ``python -m benchmarks.<name>`` 執行各 benchmark。
+"""
+
+import base64
+import json
+import statistics
+
+
+def fake_llm_config() -> dict:
+    """產生可離線建立 Gemini / Azure OpenAI client 的假設定（RSA key 為臨時產生）。"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    info = {
+        "type": "service_account",
+        "project_id": "bench-project",
+        "private_key_id": "bench",
+        "private_key": pem,
+        "client_email": "bench@bench-project.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+    return {
+        "TECH_GEMINI_CREDENTIALS": base64.b64encode(json.dumps(info).encode()).decode(),
+        "TECH_GEMINI_LOCATION": "us-central1",
+        "TECH_GEMINI_MODEL_NAME": "gemini-2.0-flash",
+        "TECH_OPENAI_GPT41MINI_PAYGO_EU_MODEL": "gpt-4.1-mini",
+        "TECH_OPENAI_GPT41MINI_PAYGO_EU_AZURE_ENDPOINT": "https://bench.openai.azure.com",
+        "TECH_OPENAI_GPT41MINI_PAYGO_EU_API_KEY": "bench",
+        "TECH_OPENAI_GPT41MINI_PAYGO_EU_API_VERSION": "2024-10-21",
+    }
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name: str, values_ms) -> str:
+    """單行輸出 mean / p50 / p95 / p99（毫秒）。"""
+    return (
+        f"{name:<32} n={len(values_ms):<5} "
+        f"mean={statistics.fmean(values_ms):8.3f}ms "
+        f"p50={percentile(values_ms, 50):8.3f}ms "
+        f"p95={percentile(values_ms, 95):8.3f}ms "
+        f"p99={percentile(values_ms, 99):8.3f}ms"
+    )
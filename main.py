@@ -1,22 +1,28 @@
 # main.py
 
+import os
 import json
+import time
 import pickle
 import aiohttp
 import uvicorn
 import asyncio
 
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 
-from src.core.tech_agent_api import TechAgentProcessor
+from src.core.tech_agent_api import TechAgentProcessor, websitecode_label
 from src.integrations.containers import DependencyContainer
-from src.services.update_service import UpdateService
+from src.services.update_service import UpdateService, KB_STORE_PATH, MAPPING_SNAPSHOT_PATH
+from src.integrations.kb_store import KBStore
 from src.routes.admin_routes import router as admin_router
+from src.core.config_loader import getenv_bool, getenv_int
 from utils.logger import logger
+from utils.metrics import REGISTRY
+from utils.sse import SSE_HEADERS, sse_stream
 
 # ========================
 # ✅ 輔助函式
@@ -42,19 +48,40 @@ async def load_rag_mappings(containers, update_service):
         await update_service.update_technical_rag()
 
 async def load_kb_mappings(containers, update_service):
-    """非阻塞載入 KB mappings"""
+    """非阻塞載入 KB mappings（mmap KB store；首次啟動由舊 pickle 轉檔）"""
     try:
         loop = asyncio.get_event_loop()
         
         def load_file():
-            with open("config/kb_mappings.pkl", "rb") as f:
-                return pickle.load(f)
+            if not os.path.exists(KB_STORE_PATH):
+                with open("config/kb_mappings.pkl", "rb") as f:
+                    KBStore.write(KB_STORE_PATH, pickle.load(f))
+            return KBStore.open(KB_STORE_PATH)
         
         containers.KB_mappings = await loop.run_in_executor(None, load_file)
         
     except Exception as e:
         logger.warning(f"[Load KB Mapping Error] {e}, updating from database...")
-        await update_service.update_KB()
+        await asyncio.to_thread(update_service.update_KB)  # update_KB 為同步函式
+
+MAPPING_SNAPSHOT_ENABLED = getenv_bool("TECH_MAPPING_SNAPSHOT", True)
+MAPPING_SNAPSHOT_POLL_SECONDS = getenv_int("TECH_MAPPING_SNAPSHOT_POLL_SECONDS", 30)
+
+
+async def load_mapping_snapshot(containers, update_service):
+    """多 worker 共用的唯讀 mapping snapshot：第一個 worker 建檔，其餘 worker 直接 mmap 開啟"""
+    tables = await asyncio.to_thread(update_service.attach_mapping_snapshot)
+    containers.publish_mappings(tables)
+
+
+async def load_mappings(containers, update_service):
+    return await asyncio.gather(
+        load_rag_mappings(containers, update_service),
+        load_kb_mappings(containers, update_service),
+        asyncio.to_thread(update_service.update_website_botname),
+        asyncio.to_thread(update_service.update_specific_KB),
+        return_exceptions=True  # 即使某個任務失敗，其他任務也繼續
+    )
 
 # ========================
 # ✅ lifespan：啟動初始化 + 關閉清理
@@ -89,15 +116,22 @@ async def lifespan(app: FastAPI):
     app.state.container = containers
     
     update_service = UpdateService(containers)
+    snapshot_watcher = None
 
     try:
-        results = await asyncio.gather(
-            load_rag_mappings(containers, update_service),
-            load_kb_mappings(containers, update_service),
-            asyncio.to_thread(update_service.update_website_botname),
-            asyncio.to_thread(update_service.update_specific_KB),
-            return_exceptions=True  # 即使某個任務失敗，其他任務也繼續
-        )
+        results = []
+        if MAPPING_SNAPSHOT_ENABLED:
+            try:
+                await load_mapping_snapshot(containers, update_service)
+                # 其他 worker 完成重新載入後，本 worker 定期 attach 新的 snapshot
+                snapshot_watcher = asyncio.create_task(
+                    containers.watch_mapping_snapshot(MAPPING_SNAPSHOT_PATH, MAPPING_SNAPSHOT_POLL_SECONDS)
+                )
+            except Exception as e:
+                logger.warning(f"[Mapping Snapshot Error] {e}, loading per-worker mappings...")
+                results = await load_mappings(containers, update_service)
+        else:
+            results = await load_mappings(containers, update_service)
         
         # 檢查是否有錯誤
         for i, result in enumerate(results):
@@ -107,8 +141,9 @@ async def lifespan(app: FastAPI):
         yield
         
     finally:
-        await aiohttp_session.close()
-        await asyncio.sleep(0.25)
+        if snapshot_watcher is not None:
+            snapshot_watcher.cancel()
+        await containers.close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -143,36 +178,47 @@ async def tech_agent_api(user_input: TechAgentInput):
     return await tech_process.process()
 
 
-# @app.post("/tech_agent/stream")
-# async def tech_agent_api_stream(user_input: TechAgentInput):
-#     """技術支援 Streaming API"""
-#     containers: DependencyContainer = app.state.container
-#     processor = TechAgentProcessor(containers=containers, user_input=user_input)
-    
-#     async def event_generator():
-#         try:
-#             async for event in processor.process_stream():
-#                 # 使用 SSE (Server-Sent Events) 格式
-#                 json_data = json.dumps(event, ensure_ascii=False)
-#                 yield f"data: {json_data}\n\n"
-#         except Exception as e:
-#             logger.error(f"Streaming error: {e}", exc_info=True)
-#             error_event = {
-#                 "status": 500,
-#                 "message": f"error: {str(e)}",
-#                 "result": {}
-#             }
-#             yield f"data: {json.dumps(error_event, ensure_ascii=False)}\n\n"
-    
-#     return StreamingResponse(
-#         event_generator(),
-#         media_type="text/event-stream",
-#         headers={
-#             "Cache-Control": "no-cache",
-#             "Connection": "keep-alive",
-#             "X-Accel-Buffering": "no",  # 關閉 Nginx 緩衝
-#         }
-#     )
+SSE_HEARTBEAT_SECONDS = getenv_int("TECH_SSE_HEARTBEAT_SECONDS", 15)
+sse_ttfb_seconds = REGISTRY.histogram(
+    "tech_agent_sse_ttfb_seconds",
+    "Time from request start to the first SSE data event.",
+    ("websitecode",),
+)
+
+
+@app.post("/v1/tech_agent/stream")
+async def tech_agent_api_stream(request: Request, user_input: TechAgentInput):
+    """技術支援 Streaming API（Server-Sent Events）"""
+    containers: DependencyContainer = app.state.container
+    processor = TechAgentProcessor(containers=containers, user_input=user_input)
+
+    def record_ttfb():
+        ttfb = time.perf_counter() - processor.start_time
+        sse_ttfb_seconds.observe(ttfb, websitecode=websitecode_label(user_input.websitecode))
+        logger.info(f"[SSE] TTFB {ttfb:.3f}s")
+
+    async def event_generator():
+        try:
+            async for chunk in sse_stream(
+                request,
+                processor.process_stream(),
+                heartbeat_interval=SSE_HEARTBEAT_SECONDS,
+                on_first_event=record_ttfb,
+            ):
+                yield chunk
+        finally:
+            processor.cancel_pending()
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
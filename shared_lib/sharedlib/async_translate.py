@@ -0,0 +1,131 @@
+# --------------------------------- Import Modules --------------------------------------------------
+import asyncio
+from collections import defaultdict
+
+import aiohttp
+from google.auth.transport.requests import Request
+
+TRANSLATE_URL = "https://translation.googleapis.com/language/translate/v2"
+MAX_SEGMENTS_PER_CALL = 128  # Cloud Translation v2 單次請求上限
+
+# --------------------------------- Function Definitions --------------------------------------------
+
+
+class AsyncGoogleTranslateClient:
+    """Cloud Translation v2 REST 的非同步 client（aiohttp 連線池）。
+
+    ``session`` 建議傳入 lifespan 建立的共用 ClientSession；未傳入時自行建立並於 ``close`` 關閉。
+    回傳格式與 ``translate_v2.Client.translate`` 相同（預設 html 格式，後續由 _clean_text 處理）。
+    """
+
+    def __init__(self, credentials, session: aiohttp.ClientSession = None, url: str = TRANSLATE_URL):
+        self.credentials = credentials
+        self.url = url
+        self._session = session
+        self._owns_session = session is None
+        self._token_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=30, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=20),
+            )
+        return self._session
+
+    async def _auth_headers(self) -> dict:
+        if not self.credentials.valid:
+            async with self._token_lock:
+                if not self.credentials.valid:
+                    # google-auth 只有同步 refresh，丟到 thread 避免卡住 event loop
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    async def translate_batch(self, texts: list, target: str) -> list:
+        """一次翻譯多個字串，回傳與 ``texts`` 同順序的 translatedText。"""
+        results = []
+        for start in range(0, len(texts), MAX_SEGMENTS_PER_CALL):
+            chunk = texts[start:start + MAX_SEGMENTS_PER_CALL]
+            async with self._get_session().post(
+                self.url,
+                headers=await self._auth_headers(),
+                json={"q": chunk, "target": target},
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json()
+            translations = payload["data"]["translations"]
+            if len(translations) != len(chunk):
+                raise ValueError(f"expected {len(chunk)} translations, got {len(translations)}")
+            results.extend(t.get("translatedText") for t in translations)
+        return results
+
+    async def translate(self, text: str, target: str) -> str:
+        return (await self.translate_batch([text], target))[0]
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+
+
+class TranslateBatcher:
+    """把短時間窗內、來自不同 session 的翻譯請求合併成一次多字串 API 呼叫。
+
+    同一目標語言的請求在第一筆進來後等待 ``window`` 秒（或累積到 ``max_batch`` 筆）即送出；
+    相同字串只送一次。
+    """
+
+    def __init__(self, client: AsyncGoogleTranslateClient, window: float = 0.005, max_batch: int = 64):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = defaultdict(list)  # target -> [(text, future)]
+        self._timers = {}
+        self._inflight = set()
+        self.calls = 0
+        self.requests = 0
+
+    async def translate(self, text: str, target: str) -> str:
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending[target]
+        batch.append((text, future))
+        self.requests += 1
+
+        if len(batch) >= self.max_batch:
+            self._flush_now(target)
+        elif target not in self._timers:
+            self._timers[target] = loop.call_later(self.window, self._flush_now, target)
+        return await future
+
+    def _flush_now(self, target):
+        timer = self._timers.pop(target, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(target, [])
+        if batch:
+            task = asyncio.ensure_future(self._send(target, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, target, batch):
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.calls += 1
+        try:
+            translated = dict(zip(unique_texts, await self.client.translate_batch(unique_texts, target)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(translated[text])
+
+    async def close(self):
+        for target in list(self._pending):
+            self._flush_now(target)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.client.close()
@@ -3,6 +3,7 @@ import json
 import re
 import html
 import asyncio
+import threading
 from opencc import OpenCC
 
 from google.oauth2 import service_account
@@ -16,25 +17,36 @@ from shared_lib.sharedlib.call_llm_openai import CallOpenAI
 # Translator
 class Translator(CallOpenAI):
     _instance = None
+    _instance_lock = threading.Lock()
      
     @classmethod
-    def get_instance(cls, model_name=None, info=None, client=None):
-        """Returns the Singleton instance of the Translator class. If the instance doesn't exist, it is created."""
-        
+    def get_instance(cls, model_name='openai_gpt41mini_paygo_eu', info=None, client=None, translate_backend=None):
+        """Returns the Singleton instance of the Translator class. If the instance doesn't exist, it is created.
+
+        建立成本高（langid 模型反序列化約數秒），每個 process 只建一次；
+        建立後的實例只做唯讀查詢，可跨 request / thread 共用。
+        """
         if cls._instance is None:
-            cls._instance = cls(model_name=model_name, info=info, client=client)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        model_name=model_name, info=info, client=client,
+                        translate_backend=translate_backend,
+                    )
         return cls._instance
     
     def __init__(self, 
                  model_name: str = 'openai_gpt41mini_paygo_eu',
                  info: str = None,
-                 client=None):
+                 client=None,
+                 translate_backend=None):
         """
         初始化翻譯器
         
         Args:
             model_name (str): OpenAI 模型名稱
             credentials_path (str): Google Translate API 憑證檔案路徑
+            translate_backend: 非同步翻譯後端（例如 TranslateBatcher），未提供時改用 thread 執行同步 client
         """
         super().__init__(model_name=model_name, client=client)
         self.model = model_name
@@ -44,6 +56,8 @@ class Translator(CallOpenAI):
         ]
         creds = service_account.Credentials.from_service_account_info(info).with_scopes(SCOPES)
         self.translate_client = translate.Client(credentials=creds)
+        self._translate_lock = threading.Lock()  # 同步 client 底層的 requests.Session 非 thread-safe
+        self.translate_backend = translate_backend
 
         # 建立服務
         # self.translate_client = translate.Client.from_service_account_json(self.key_path)
@@ -61,9 +75,16 @@ class Translator(CallOpenAI):
     def _translate_text(self, target, text):
         if isinstance(text, bytes):
             text = text.decode("utf-8")
-        result = self.translate_client.translate(text, target_language=target)
+        with self._translate_lock:
+            result = self.translate_client.translate(text, target_language=target)
         return result.get('translatedText')
 
+    async def _translate_text_async(self, target, text):
+        """不阻塞 event loop 的翻譯：優先走非同步後端，否則把同步 client 丟到 thread"""
+        if self.translate_backend is not None:
+            return await self.translate_backend.translate(text, target)
+        return await asyncio.to_thread(self._translate_text, target, text)
+
     # @timed
     async def get_translation(self, user_input=None):
         system_prompt = '''
@@ -110,7 +131,7 @@ The question is as follows: {user_input}.
 
         is_en, prob = self.identifier.classify(response)
         if (is_en != 'en') or (is_en == 'en' and prob <= 0.8):
-            response = self._translate_text('en', response)
+            response = await self._translate_text_async('en', response)
 
         return self._clean_text(response)
 
@@ -1,8 +1,8 @@
 
-import base64
 import json
 import asyncio
 from shared_lib.sharedlib.get_translation import *
+from utils.cache import normalize_text
 
 class ChatFlow:
     def __init__(self, data: dict, last_hint: dict, container: object):
@@ -17,9 +17,8 @@ class ChatFlow:
         }
         self.container = container
 
-        cred_b64 = self.container.creds_trans  # 取得key
-        info = json.loads(base64.b64decode(cred_b64))
-        self.language_processor = Translator(info=info, client=container._trans_client)
+        # lifespan 預先建立的共用 Translator，不在每個 request 重建
+        self.language_processor = container.language_processor
 
     # @async_timer.timeit
     async def get_bot_scope_chat(
@@ -125,10 +124,17 @@ class ChatFlow:
                 search_info = self.last_hint.get("searchInfo")
                 return search_info
 
-        """2. 翻譯"""
+        """2. 翻譯（先查跨 session 共用的翻譯快取）"""
+        cache_key = normalize_text(his_inputs[-1])
+        search_info = self.container.translation_cache.get(cache_key)
+        if search_info is not None:
+            return search_info
+
         search_info = await translaor.get_translation(his_inputs[-1])
         # search_info = search_info[0].lower()
-        return search_info.lower()
+        search_info = search_info.lower()
+        self.container.translation_cache.set(cache_key, search_info)
+        return search_info
 
     async def is_follow_up(self, prev_question: str, prev_answer: str, prev_answer_refs: str, new_question: str):
         """4. 是否為追問"""
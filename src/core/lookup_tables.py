@@ -0,0 +1,79 @@
+"""小型 xlsx 對照表的預編譯產物。
+
+``data/*.xlsx`` 由營運維護；部署前以下列指令編譯成 ``data/compiled/<name>.json``::
+
+    python -m src.core.lookup_tables
+
+執行期只讀 JSON（不 import pandas / openpyxl）。JSON 內記錄來源 xlsx 的 sha1，
+來源更新但忘了重新編譯時，載入會退回讀 xlsx 並嘗試寫回編譯結果。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from utils.logger import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DATA_DIR = REPO_ROOT / "data"
+COMPILED_DIR = DATA_DIR / "compiled"
+
+# 名稱 -> (key 欄位, value 欄位)；來源為 data/<名稱>.xlsx
+LOOKUPS = {
+    "ts_rag_open_remarks_mappings": ("lang", "opening_remarks"),
+    "pl_reask_open_remarks_mappings": ("lang", "opening_remarks"),
+    "FAQ_LanguageMapping_ForOpenAI": ("websitecode", "lang"),
+}
+
+
+def _source_path(name: str) -> Path:
+    return DATA_DIR / f"{name}.xlsx"
+
+
+def _compiled_path(name: str) -> Path:
+    return COMPILED_DIR / f"{name}.json"
+
+
+def _sha1(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def read_source(name: str) -> dict:
+    import pandas as pd  # 只有編譯（或退回讀 xlsx）時才需要
+
+    key_column, value_column = LOOKUPS[name]
+    return pd.read_excel(_source_path(name)).set_index(key_column)[value_column].to_dict()
+
+
+def compile_lookup(name: str) -> Path:
+    """讀 xlsx 寫成 JSON（暫存檔再 rename），回傳輸出路徑。"""
+    path = _compiled_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    artifact = {"source_sha1": _sha1(_source_path(name)), "data": read_source(name)}
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(artifact, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_lookup(name: str) -> dict:
+    try:
+        artifact = json.loads(_compiled_path(name).read_text(encoding="utf-8"))
+        if artifact["source_sha1"] == _sha1(_source_path(name)):
+            return artifact["data"]
+        logger.warning(f"[Lookup] {name}.json is stale, recompiling from xlsx")
+    except (OSError, ValueError, KeyError):
+        logger.warning(f"[Lookup] {name}.json missing, compiling from xlsx")
+
+    try:
+        compile_lookup(name)
+    except OSError as e:  # 唯讀檔案系統：直接用讀到的結果
+        logger.warning(f"[Lookup] cannot write {name}.json: {e}")
+        return read_source(name)
+    return json.loads(_compiled_path(name).read_text(encoding="utf-8"))["data"]
+
+
+if __name__ == "__main__":
+    for lookup_name in LOOKUPS:
+        print(f"{lookup_name}: {compile_lookup(lookup_name)}")
@@ -9,8 +9,8 @@ from utils.warper import async_timer
 
 class MergeUserInput(BaseService):  # BaseService
 
-    def __init__(self,config):
-        super().__init__(config)
+    def __init__(self,config, clients=None):
+        super().__init__(config, clients)
     @async_timer.timeit
     async def merge_user_input_GPT(self, user_input, prev_merge_input=[]):
         # Prompt
@@ -5,8 +5,8 @@ from src.services.base_service import BaseService
 
 class ModelName(BaseService):
     
-    def __init__(self,config):
-        BaseService.__init__(self,config)
+    def __init__(self,config, clients=None):
+        BaseService.__init__(self,config, clients)
 
     async def extract_modelname(self, user_input: str):
         """Extract product names from user input based on predefined rules."""
@@ -0,0 +1,120 @@
+"""Dependency-graph stage scheduler for the tech agent pipeline.
+
+每個 Stage 宣告 inputs / outputs（資料名稱），scheduler 依宣告推導相依關係，
+輸入一就緒就啟動該 stage，並記錄每個 stage 的起訖時間與 critical path。
+Stage 本身是無參數的 coroutine function（通常是 processor 的 bound method），
+實際資料仍寫在 processor 屬性上；inputs / outputs 只用來排程與檢查。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[], Awaitable]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    name: str
+    start: float
+    end: float
+    blocked_by: Optional[str] = None  # 最後完成、讓本 stage 得以啟動的上游 stage
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class StageGraphRun:
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+
+    def critical_path(self) -> List[StageTiming]:
+        """從最後完成的 stage 沿 blocked_by 往回走，得到決定總延遲的 stage 序列。"""
+        if not self.timings:
+            return []
+        current = max(self.timings.values(), key=lambda t: t.end)
+        path = [current]
+        while current.blocked_by:
+            current = self.timings[current.blocked_by]
+            path.append(current)
+        return path[::-1]
+
+    def describe_critical_path(self) -> str:
+        return " -> ".join(f"{t.name}({t.duration:.3f}s)" for t in self.critical_path())
+
+
+class StageGraph:
+    def __init__(self, stages: List[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("duplicate stage name")
+
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"output {output!r} produced by both {producers[output]!r} and {stage.name!r}")
+                producers[output] = stage.name
+
+        self.upstream = {}
+        for stage in stages:
+            missing = [i for i in stage.inputs if i not in producers]
+            if missing:
+                raise ValueError(f"stage {stage.name!r} has no producer for inputs {missing}")
+            self.upstream[stage.name] = {producers[i] for i in stage.inputs}
+
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        remaining = {name: set(deps) for name, deps in self.upstream.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"stage graph has a cycle among {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    async def run(self) -> StageGraphRun:
+        """執行所有 stage；任一 stage 失敗即取消其餘 stage 並拋出例外。"""
+        result = StageGraphRun()
+        origin = time.perf_counter()
+        finished_at: Dict[str, float] = {}
+        running: Dict[asyncio.Task, Tuple[str, float, Optional[str]]] = {}
+        pending = set(self.stages)
+
+        def start_ready():
+            for name in sorted(pending):
+                deps = self.upstream[name]
+                if deps.issubset(finished_at):
+                    blocked_by = max(deps, key=finished_at.get) if deps else None
+                    task = asyncio.create_task(self.stages[name].run())
+                    running[task] = (name, time.perf_counter() - origin, blocked_by)
+                    pending.discard(name)
+
+        start_ready()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name, start, blocked_by = running.pop(task)
+                    task.result()  # 失敗時拋出，交給外層取消其餘 stage
+                    end = time.perf_counter() - origin
+                    finished_at[name] = end
+                    result.timings[name] = StageTiming(name, start, end, blocked_by)
+                start_ready()
+        finally:
+            for task in running:
+                task.cancel()
+            # 等被取消的 stage 確實結束，避免拋出例外後仍在背景執行
+            await asyncio.gather(*running, return_exceptions=True)
+        return result
@@ -1,4 +1,3 @@
-import json
 import time
 import asyncio
 import uuid
@@ -6,12 +5,49 @@ from datetime import datetime
 
 from pydantic import BaseModel
 from src.core.chat_flow import ChatFlow
+from src.core.config_loader import getenv_bool
+from src.core.lookup_tables import load_lookup
+from src.core.stage_graph import Stage, StageGraph
 from src.services.service_process import ServiceProcess
-from utils.logger import logger
+from utils.logger import LazyJson, get_stage_logger, logger
+from utils.metrics import REGISTRY
+from utils.stage_metrics import StageRecorder, record_stage, stage_timer
 
 TOP1_KB_SIMILARITY_THRESHOLD = 0.87
 KB_THRESHOLD = 0.92
 
+# 以預測產品線（使用者指定或上一輪 bot scope）提前查 FAQ，預設關閉
+SPECULATIVE_FAQ_SEARCH = getenv_bool("TECH_SPECULATIVE_FAQ_SEARCH", False)
+# payload log 分 stage 控制 level（TECH_LOG_STAGE_LEVELS），只有真的輸出時才序列化
+input_logger = get_stage_logger("input")
+history_logger = get_stage_logger("history")
+user_info_logger = get_stage_logger("user_info")
+discrimination_logger = get_stage_logger("discrimination")
+cosmos_logger = get_stage_logger("cosmos")
+
+# stage graph 中要輸出 latency 的 stage -> tech_agent_stage_latency_seconds 的 stage label
+STAGE_LATENCY_LABELS = {
+    "history": "history_fetch",
+    "sentence_grouping": "sentence_grouping",
+    "translation": "translation",
+    "user_info": "user_info_gpt",
+    "bot_scope": "bot_scope",
+}
+
+# websitecode 來自 request body：只有對照表中的站點作為 metrics label，其餘歸為 "other"，避免 series 無限增加
+KNOWN_WEBSITECODES = frozenset(load_lookup("FAQ_LanguageMapping_ForOpenAI"))
+
+
+def websitecode_label(websitecode: str) -> str:
+    return websitecode if websitecode in KNOWN_WEBSITECODES else "other"
+
+
+speculative_faq_total = REGISTRY.counter(
+    "tech_agent_speculative_faq_total",
+    "Speculative FAQ searches by outcome (hit / miss / skipped / error).",
+    ("result",),
+)
+
 class TechAgentInput(BaseModel):
     cus_id :str
     session_id: str
@@ -24,6 +60,8 @@ class TechAgentInput(BaseModel):
 class TechAgentProcessor:
     def __init__(self, containers, user_input: TechAgentInput):
         self.containers = containers
+        # 整個 request 使用同一版 mapping（重新載入只替換 container 上的參照）
+        self.mappings = containers.mappings
         self.user_input = user_input
         self.start_time = time.perf_counter()
 
@@ -60,70 +98,57 @@ class TechAgentProcessor:
         self.final_result = {}
         self.renderId = ""
         self.fu_task = None
+        self.translation = None
+        self.tech_support_related = "true"
+        self.stage_run = None
+        self.stage_recorder = StageRecorder()
+        self.predicted_bot_scope = None
+        self.faq_speculation = None
+        self.kb_search_started = False
 
     async def process(self, log_record: bool = True):
         """Main processing flow for the tech agent."""
-        log_json = json.dumps(
-            self.user_input.dict(), ensure_ascii=False, indent=2
-        )
-        logger.info(f"\n[Agent 啟動] 輸入內容: {log_json}")
-
-        await self._initialize_chat()
-        await self._process_history()
-        self.avatar_process = asyncio.create_task(
-            self.service_process.ts_rag.reply_with_faq_gemini_sys_avatar(
-                self.his_inputs[-1], self.lang
-                )
-            )
-        await self._get_user_and_scope_info()
-        await self._search_knowledge_base()
-        self._process_kb_results()
+        self.stage_recorder.use()
+        input_logger.info("\n[Agent 啟動] 輸入內容: %s", LazyJson(self.user_input.dict()))
 
-        follow_up = await self.fu_task if self.fu_task else {}
-        self.is_follow_up = bool(follow_up.get("is_follow_up", False))
-        logger.info(f"是否延續問題追問 : {self.is_follow_up}")
-        
+        await self._run_pipeline()
         await self._generate_response()
+        self.stage_recorder.finish(self.type, websitecode_label(self.user_input.websitecode))
 
         if log_record:
-            asyncio.create_task(self._log_and_save_results())
+            # 只排入 write-behind 佇列（佇列滿時的 backpressure 回到 request 上），不另開背景 task
+            await self._log_and_save_results()
 
         return self.response_data
 
+    def cancel_pending(self):
+        """取消本 request 仍在背景執行的 LLM 任務（例如 SSE client 已斷線）。"""
+        for task in (self.avatar_process, self.fu_task, self.faq_speculation):
+            if task is not None and not task.done():
+                task.cancel()
+
     async def process_stream(self):
         """Main processing flow with streaming support."""
         try:
-            log_json = json.dumps(
-                self.user_input.dict(), ensure_ascii=False, indent=2
-            )
-            logger.info(f"\n[Agent 啟動] 輸入內容: {log_json}")
-
-            await self._initialize_chat()
-            await self._process_history()
-            self.avatar_process = asyncio.create_task(
-                self.service_process.ts_rag.reply_with_faq_gemini_sys_avatar(
-                    self.his_inputs[-1], self.lang
-                )
-            )
-            await self._get_user_and_scope_info()
-            await self._search_knowledge_base()
-            self._process_kb_results()
+            self.stage_recorder.use()
+            input_logger.info("\n[Agent 啟動] 輸入內容: %s", LazyJson(self.user_input.dict()))
 
-            follow_up = await self.fu_task if self.fu_task else {}
-            self.is_follow_up = bool(follow_up.get("is_follow_up", False))
-            logger.info(f"是否延續問題追問 : {self.is_follow_up}")
+            await self._run_pipeline()
 
-            # Stream response generation
+            # Stream response generation（類型確定後即送出前處理各 stage 的 latency）
             if not self.bot_scope_chat:
                 self.type = "avatarAskProductLine"
+                self.stage_recorder.finish(self.type, websitecode_label(self.user_input.websitecode))
                 async for event in self._handle_no_product_line_stream():
                     yield event
             elif self.top1_kb_sim > TOP1_KB_SIMILARITY_THRESHOLD:
                 self.type = "avatarTechnicalSupport"
+                self.stage_recorder.finish(self.type, websitecode_label(self.user_input.websitecode))
                 async for event in self._handle_high_similarity_stream():
                     yield event
             else:
                 self.type = "avatarText"
+                self.stage_recorder.finish(self.type, websitecode_label(self.user_input.websitecode))
                 async for event in self._handle_low_similarity_stream():
                     yield event
 
@@ -139,20 +164,54 @@ class TechAgentProcessor:
             }
 
 
+    def _build_stage_graph(self) -> StageGraph:
+        """Pipeline 的 stage 相依圖：每個 stage 在其 inputs 都完成後立即啟動。"""
+        return StageGraph([
+            Stage("history", self._initialize_chat, outputs=("history",)),
+            Stage("sentence_grouping", self._process_history, inputs=("history",), outputs=("grouped_history",)),
+            Stage("avatar", self._start_avatar_reply, inputs=("grouped_history",)),
+            Stage("translation", self._translate_user_input, inputs=("history",), outputs=("translation",)),
+            Stage("tech_support_check", self._check_tech_support_related, inputs=("history",), outputs=("tech_support_related",)),
+            Stage("user_info", self._extract_user_info, inputs=("grouped_history",), outputs=("user_info",)),
+            Stage("search_info", self._resolve_search_info, inputs=("translation", "tech_support_related"), outputs=("search_info",)),
+            Stage("bot_scope", self._resolve_bot_scope, inputs=("user_info",), outputs=("bot_scope",)),
+            Stage("kb_speculation", self._start_speculative_kb_search, inputs=("search_info",)),
+            Stage("kb_search", self._search_knowledge_base, inputs=("search_info", "bot_scope"), outputs=("kb_results",)),
+        ])
+
+    async def _run_pipeline(self):
+        """依 stage graph 執行前處理，並記錄本次 request 的 critical path。"""
+        try:
+            self.stage_run = await self._build_stage_graph().run()
+        except BaseException:
+            # stage 啟動的背景任務（avatar / follow-up / 預測查詢）不會隨 stage 一起取消
+            self.cancel_pending()
+            raise
+        logger.info(f"[Stage] critical path: {self.stage_run.describe_critical_path()}")
+        for name, label in STAGE_LATENCY_LABELS.items():
+            timing = self.stage_run.timings.get(name)
+            if timing is not None:
+                record_stage(label, timing.duration)
+
+        self._process_kb_results()
+
+        follow_up = await self.fu_task if self.fu_task else {}
+        self.is_follow_up = bool(follow_up.get("is_follow_up", False))
+        logger.info(f"是否延續問題追問 : {self.is_follow_up}")
+
     async def _initialize_chat(self):
         """Initialize chat, retrieve history and basic info - 優化版"""
         settings = self.containers.cosmos_settings
         
-        # ✅ 並行執行所有 I/O 操作
-        messages_task = settings.create_GPT_messages(
+        # ✅ 並行執行所有 I/O 操作（歷史與 hint 走 session 狀態，一次查詢）
+        session_task = settings.load_session(
             self.user_input.session_id, self.user_input.user_input
         )
-        hint_task = settings.get_latest_hint(self.user_input.session_id)
         lang_task = settings.get_language_by_websitecode_dev(self.user_input.websitecode)
         
         # ✅ 一次等待所有結果
-        results, self.last_hint, self.lang = await asyncio.gather(
-            messages_task, hint_task, lang_task
+        (results, self.last_hint), self.lang = await asyncio.gather(
+            session_task, lang_task
         )
         
         (
@@ -160,8 +219,7 @@ class TechAgentProcessor:
             self.last_bot_scope, self.last_extract_output
         ) = results
         
-        log_json = json.dumps(results, ensure_ascii=False, indent=2)
-        logger.info(f"\n[歷史對話]\n{log_json}")
+        history_logger.info("\n[歷史對話]\n%s", LazyJson(results, large=True))
 
         # ✅ 處理預設值（同步操作，很快）
         if not self.user_input.session_id:
@@ -179,7 +237,7 @@ class TechAgentProcessor:
 
         # ✅ 初始化服務（同步操作）
         self.service_process = ServiceProcess(
-            system_code=self.user_input.system_code, container=self.containers
+            system_code=self.user_input.system_code, container=self.containers, mappings=self.mappings
         )
         self.chat_flow = ChatFlow(
             data=self.user_input, last_hint=self.last_hint,
@@ -207,7 +265,7 @@ class TechAgentProcessor:
         self.prev_q = str(self.his_inputs[-2])
         self.prev_a = str(self.last_extract_output.get("answer", ""))
         self.kb_no = str(self.last_extract_output.get("kb", {}).get("kb_no", ""))
-        self.content = str(self.containers.KB_mappings.get(
+        self.content = str(self.mappings.KB_mappings.get(
             f"{self.kb_no}_{self.lang}", {}).get("content")
         )
 
@@ -239,70 +297,112 @@ class TechAgentProcessor:
         )
         
 
-    async def _get_user_and_scope_info(self):
-        """Get user info, search info, and determine bot scope - 優化版"""
-        
-        # ✅ 並行執行所有可以並行的操作
-        ui_task = self.chat_flow.get_userInfo(his_inputs=self.his_inputs)
-        si_task = self.chat_flow.get_searchInfo(self.his_inputs)
-        
-        # 並行處理 tech_support_related 判斷
-        tech_support_task = None
-        if self.last_hint and self.last_hint.get("hintType") == "productline-reask":
-            prompt_content = f'''Please determine whether the sentence "{self.his_inputs[-1]}" 
+    async def _start_avatar_reply(self):
+        """Avatar 回覆只需要最新一句，先丟到背景執行。"""
+        self.avatar_process = asyncio.create_task(
+            self.service_process.ts_rag.reply_with_faq_gemini_sys_avatar(
+                self.his_inputs[-1], self.lang
+            )
+        )
+
+    async def _translate_user_input(self):
+        """翻譯只需要使用者最新輸入（與分組結果的最後一句相同），不必等句子分組。"""
+        try:
+            self.translation = await self.chat_flow.get_searchInfo(self.his_inputs[-1:])
+        except Exception as e:
+            logger.warning(f"[Translation] 失敗，改用原句: {e}")
+            self.translation = None
+
+    async def _check_tech_support_related(self):
+        """產品線追問後，判斷使用者新輸入是否仍與技術支援相關。"""
+        self.tech_support_related = "true"
+        if not (self.last_hint and self.last_hint.get("hintType") == "productline-reask"):
+            return
+        prompt_content = f'''Please determine whether the sentence "{self.his_inputs[-1]}" 
             mentions any technical support-related issues, and reply with "true" or "false" only. 
             Here is an example you can refer to. 
             1. user's question:  it can only be turned on when plugged in. your response: "true" 
             2. user's question:  wearable. your response: "false" 
             3. user's question:  notebook. your response: "false"'''
-            prompt = [{"role": "user", "content": prompt_content}]
-            tech_support_task = self.chat_flow.container.base_service.GPT41_mini_response(prompt)
-        
-        # ✅ 使用 gather 並行等待
-        results = await asyncio.gather(
-            ui_task,
-            si_task,
-            tech_support_task if tech_support_task else asyncio.sleep(0),
-            return_exceptions=True
-        )
-        
-        # 處理結果
-        result_user_info = results[0]
-        self.user_info_dict = result_user_info[0] if not isinstance(result_user_info, Exception) else {}
-        
-        search_info_result = results[1]
-        tech_support_related = results[2] if tech_support_task else "true"
-        
-        log_json = json.dumps(self.user_info_dict, ensure_ascii=False, indent=2)
-        logger.info(f"\n[使用者資訊]\n{log_json}")
-        
-        # ✅ 決定 search_info
-        if tech_support_related == "false" and self.last_hint:
+        prompt = [{"role": "user", "content": prompt_content}]
+        try:
+            self.tech_support_related = await self.chat_flow.container.base_service.GPT41_mini_response(prompt)
+        except Exception as e:
+            logger.warning(f"[Tech Support Check] 失敗: {e}")
+            self.tech_support_related = None
+
+    async def _extract_user_info(self):
+        try:
+            result_user_info = await self.chat_flow.get_userInfo(his_inputs=self.his_inputs)
+            self.user_info_dict = result_user_info[0]
+        except Exception as e:
+            logger.warning(f"[User Info] 擷取失敗: {e}")
+            self.user_info_dict = {}
+
+        user_info_logger.info("\n[使用者資訊]\n%s", LazyJson(self.user_info_dict))
+
+    async def _resolve_search_info(self):
+        if self.tech_support_related == "false" and self.last_hint:
             self.search_info = self.last_hint.get("searchInfo")
         else:
-            self.search_info = search_info_result if not isinstance(search_info_result, Exception) else self.his_inputs[-1]
-        
-        # ✅ 取得 bot_scope（需要等前面的結果）
+            self.search_info = self.translation if self.translation is not None else self.his_inputs[-1]
+
+    async def _resolve_bot_scope(self):
         self.bot_scope_chat = self.user_input.product_line or await self.chat_flow.get_bot_scope_chat(
             prev_user_info=self.user_info,
             curr_user_info=self.user_info_dict,
             last_bot_scope=self.last_bot_scope
         )
-        
+
         logger.info(f"\n[Bot Scope 判斷] {self.bot_scope_chat}")
 
+    async def _discriminate_with_productline(self, product_line):
+        with stage_timer("vector_search"):
+            return await self.containers.sd.service_discreminator_with_productline(
+                user_question_english=self.search_info,
+                site=self.user_input.websitecode,
+                specific_kb_mappings=self.mappings.specific_kb_mappings,
+                productLine=product_line,
+            )
+
+    async def _start_speculative_kb_search(self):
+        """search_info 一就緒就以預測的產品線先查 FAQ，不等 bot scope（需開啟 TECH_SPECULATIVE_FAQ_SEARCH）。"""
+        if not SPECULATIVE_FAQ_SEARCH:
+            return
+        self.predicted_bot_scope = self.user_input.product_line or self.last_bot_scope
+        # search_info 比 bot scope 晚完成時兩個 stage 同時就緒，kb_search 已自行查詢，不再預測
+        if not self.predicted_bot_scope or self.kb_search_started:
+            speculative_faq_total.inc(result="skipped")
+            return
+        self.faq_speculation = asyncio.create_task(
+            self._discriminate_with_productline(self.predicted_bot_scope)
+        )
+
     async def _search_knowledge_base(self):
         """Search knowledge base with product line."""
-        response = await self.containers.sd.service_discreminator_with_productline(
-            user_question_english=self.search_info,
-            site=self.user_input.websitecode,
-            specific_kb_mappings=self.containers.specific_kb_mappings,
-            productLine=self.bot_scope_chat,
-        )
-        log_json = json.dumps(response, ensure_ascii=False, indent=2)
-        logger.info(
+        self.kb_search_started = True
+        speculation, self.faq_speculation = self.faq_speculation, None
+        response = None
+        if speculation is not None:
+            if self.predicted_bot_scope == self.bot_scope_chat:
+                try:
+                    response = await speculation
+                    speculative_faq_total.inc(result="hit")
+                except Exception as e:
+                    logger.warning(f"[Speculative FAQ] 預測查詢失敗，重新查詢: {e}")
+                    speculative_faq_total.inc(result="error")
+            else:
+                speculation.cancel()
+                speculative_faq_total.inc(result="miss")
+                logger.info(
+                    f"[Speculative FAQ] miss: predicted={self.predicted_bot_scope}, actual={self.bot_scope_chat}"
+                )
+        if response is None:
+            response = await self._discriminate_with_productline(self.bot_scope_chat)
+
+        discrimination_logger.info(
             "[ServiceDiscriminator] discrimination_productline_response: %s",
-            log_json
+            LazyJson(response, large=True)
         )
         self.faq_result = response[0]
         self.faq_result_wo_pl = response[1]
@@ -347,17 +447,19 @@ class TechAgentProcessor:
         try:
             # 檢查服務是否支援 streaming
             if hasattr(self.service_process.ts_rag, 'reply_with_faq_gemini_sys_avatar_stream'):
-                full_response = ""
+                response_parts = []
                 chunk_count = 0
                 
                 logger.info("[Avatar Streaming] 開始 streaming...")
+                stream_start = time.perf_counter()
                 
                 try:
+                    # chunk 已在 reply_gemini_text_stream 依字數 / 時間窗合併，每個 chunk 對應一個 render 事件
                     async for chunk in self.service_process.ts_rag.reply_with_faq_gemini_sys_avatar_stream(
                         self.his_inputs[-1], self.lang, content_data
                     ):
                         chunk_count += 1
-                        full_response += chunk
+                        response_parts.append(chunk)
                         yield {
                             "status": 200,
                             "message": "OK",
@@ -376,9 +478,12 @@ class TechAgentProcessor:
                             }
                         }
                     
+                    full_response = "".join(response_parts)
+                    record_stage("avatar_reply", time.perf_counter() - stream_start)
                     logger.info(f"[Avatar Streaming] 完成！共收到 {chunk_count} 個 chunks，總長度 {len(full_response)} 字元")
                     
                 except Exception as stream_error:
+                    full_response = "".join(response_parts)
                     logger.error(f"[Avatar Streaming] 迭代中發生錯誤: {stream_error}")
                     import traceback
                     traceback.print_exc()
@@ -464,12 +569,13 @@ class TechAgentProcessor:
         )
         relative_questions = rag_response.get("relative_questions", [])
         
-        await self.containers.cosmos_settings.insert_hint_data(
-            chatflow_data=self.chat_flow.data,
-            intent_hints=relative_questions,
-            search_info=self.search_info,
-            hint_type="productline-reask",
-        )
+        with stage_timer("cosmos_write"):
+            await self.containers.cosmos_settings.insert_hint_data(
+                chatflow_data=self.chat_flow.data,
+                intent_hints=relative_questions,
+                search_info=self.search_info,
+                hint_type="productline-reask",
+            )
         
         self.response_data = {
             "status": 200, 
@@ -607,7 +713,7 @@ class TechAgentProcessor:
                 "hint_candidates": [],
                 "kb": {
                     "kb_no": str(self.top1_kb or ""), 
-                    "title": str(self.containers.KB_mappings.get(
+                    "title": str(self.mappings.KB_mappings.get(
                         f"{self.top1_kb}_{self.lang}", {}).get("title", "")
                     ),
                     "similarity": float(self.top1_kb_sim or 0.0),
@@ -731,12 +837,13 @@ class TechAgentProcessor:
             self.avatar_process, reask_result_task
         )
         relative_questions = rag_response.get("relative_questions", [])
-        await self.containers.cosmos_settings.insert_hint_data(
-            chatflow_data=self.chat_flow.data,
-            intent_hints=relative_questions,
-            search_info=self.search_info,
-            hint_type="productline-reask",
-        )
+        with stage_timer("cosmos_write"):
+            await self.containers.cosmos_settings.insert_hint_data(
+                chatflow_data=self.chat_flow.data,
+                intent_hints=relative_questions,
+                search_info=self.search_info,
+                hint_type="productline-reask",
+            )
         self.response_data = {
             "status": 200, 
             "type": "reask",
@@ -893,7 +1000,7 @@ class TechAgentProcessor:
                 "hint_candidates": [],
                 "kb": {
                     "kb_no": str(self.top1_kb or ""), 
-                    "title": str(self.containers.KB_mappings.get(
+                    "title": str(self.mappings.KB_mappings.get(
                         f"{self.top1_kb}_{self.lang}", {}).get("title", "")
                     ),
                     "similarity": float(self.top1_kb_sim or 0.0),
@@ -1010,9 +1117,10 @@ class TechAgentProcessor:
             "extract": self.response_data,
             "total_time": exec_time
         }
-        asyncio.create_task(self.containers.cosmos_settings.insert_data(cosmos_data))
-        log_json = json.dumps(cosmos_data, ensure_ascii=False, indent=2)
-        logger.info(f"\n[Cosmos DB] 寫入資料: {log_json}\n")
+        # 只排入 write-behind 佇列；佇列滿時最多等待 put_timeout（實際寫入延遲見 tech_agent_write_latency_seconds）
+        with stage_timer("cosmos_write"):
+            await self.containers.cosmos_settings.insert_data(cosmos_data)
+        cosmos_logger.info("\n[Cosmos DB] 寫入資料: %s\n", LazyJson(cosmos_data, large=True))
 
         return cosmos_data
 
@@ -17,18 +17,18 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from src.services.base_service import BaseService
+from src.core.lookup_tables import load_lookup
+from utils.stage_metrics import stage_timer, timed_stage
 import asyncio
-import pandas as pd
 import logging
 
-# 使用專案根目錄來讀取 data 資料夾
-pl_reask_open_remarks_mappings = pd.read_excel(REPO_ROOT / "data" / "pl_reask_open_remarks_mappings.xlsx")
-pl_reask_open_remarks_mappings = pl_reask_open_remarks_mappings.set_index("lang")["opening_remarks"].to_dict()
+# 預編譯的 JSON（data/compiled），import 時不經過 pandas / openpyxl
+pl_reask_open_remarks_mappings = load_lookup("pl_reask_open_remarks_mappings")
 
 class TSRAG(BaseService):
 
-    def __init__(self,config):
-        super().__init__(config)
+    def __init__(self,config, clients=None):
+        super().__init__(config, clients)
 
     async def reply_with_faq_gpt(self, content, last_his_input, lang):
 
@@ -172,6 +172,7 @@ class TSRAG(BaseService):
         generated_response = response
         return generated_response
     # gemini
+    @timed_stage("avatar_reply")
     async def reply_with_faq_gemini_sys_avatar(self, last_his_input, lang, content=None):
 
         system_instructions = f"""
@@ -333,7 +334,8 @@ class TSRAG(BaseService):
             if top1_kb in [1008276, 1045127]:
                 content = await self._specific_content_extract(content)
 
-            rag_output = await self.reply_with_faq_gemini(content, last_his_input, lang)
+            with stage_timer("rag_generation"):
+                rag_output = await self.reply_with_faq_gemini(content, last_his_input, lang)
             rag_output = rag_output['response'].answer
 
         except Exception as e1:
@@ -341,7 +343,8 @@ class TSRAG(BaseService):
             rag_output = ""  # 若出錯則避免中斷流程
 
         try:
-            rag_bool = await self._result_evaluation(last_his_input, rag_output, content)
+            with stage_timer("rag_evaluation"):
+                rag_bool = await self._result_evaluation(last_his_input, rag_output, content)
         except Exception as e2:
             print(f"evaluation_error : {e2}")
 
@@ -566,8 +569,8 @@ pd_line_mapping = [
 
 class TSProductLine(BaseService):
 
-    def __init__(self, config, productline_name_map):
-        BaseService.__init__(self, config)
+    def __init__(self, config, productline_name_map, clients=None):
+        BaseService.__init__(self, config, clients)
         # 優先排序向量相似度高過門檻的產品線
         self.pl_threshold = 0.97
         self.bot_scope_sorted = bot_scope_sorted
@@ -32,8 +32,8 @@ class UserInfo(BaseModel):
 
 class UserinfoDiscriminator(BaseService):
 
-    def __init__(self, config):
-        super().__init__(config)
+    def __init__(self, config, clients=None):
+        super().__init__(config, clients)
 
         self.empty_userInfo = {
             "main_product_category": None,
@@ -330,8 +330,8 @@ class FollowUpClassifierFunctionOnly(BaseService):
     {new_query}
     """.strip()
 
-    def __init__(self, config):
-        super().__init__(config)
+    def __init__(self, config, clients=None):
+        super().__init__(config, clients)
 
     def _build_messages(self, prev_reply: str, new_query: str) -> List[Dict[str, str]]:
         sys_content = self.SYSTEM_PROMPT + ("\n\n" + self.FEW_SHOT)
@@ -14,8 +14,8 @@ from utils.warper import async_timer
 # 20240620 add NUC
 class UserinfoDiscriminator_MKT(BaseService):
 
-    def __init__(self,config):
-        super().__init__(config)
+    def __init__(self,config, clients=None):
+        super().__init__(config, clients)
 
         self.empty_userInfo = {
             "productline_mkt": [],
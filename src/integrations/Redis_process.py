@@ -1,8 +1,21 @@
 import aiohttp, json, asyncio, functools
 from utils.warper import async_timer
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
+from src.integrations.vector_search_batcher import VectorSearchBatcher
 from aiohttp import ClientError
 import requests, json
 
+# 會走向量搜尋 API 的方法，各自一個結果快取（方便分開看命中率）
+VECTOR_SEARCH_METHODS = (
+    "get_hint_simiarity",
+    "get_productline",
+    "get_specific_service",
+    "get_replace_service",
+    "get_service",
+    "get_faq",
+)
+
 def async_retry(max_retries=1, delay=0.1):
     def decorator(func):
         @functools.wraps(func)
@@ -22,7 +35,6 @@ def async_retry(max_retries=1, delay=0.1):
 
 class RedisConfig:
     def __init__(self, config, session: aiohttp.ClientSession):
-        self.faq_ver = "4.0"
         self.headers = {
             "accept": "text/plain",
             "apikey": "moneyislife",
@@ -31,6 +43,91 @@ class RedisConfig:
         self.redis_url = config.get("TECH_REDIS_E50_URL")
         self.session = session  # ✅ 使用 lifespan 傳進來的共用 session
 
+        # 向量搜尋結果快取：key 為完整 payload（含 version）+ 索引版本
+        cache_size = int(config.get("TECH_VECTOR_CACHE_SIZE", 2048))
+        cache_ttl = int(config.get("TECH_VECTOR_CACHE_TTL_SECONDS", 600))
+        self.response_caches = {
+            method: TTLCache(name=f"vector_search.{method}", maxsize=cache_size, ttl=cache_ttl)
+            for method in VECTOR_SEARCH_METHODS
+        }
+        # 相同 payload 的並發請求只打一次 API（不分 method，payload 相同即是同一個 POST）
+        self.inflight = SingleFlight("vector_search")
+        # 本機向量索引（LocalVectorIndex）；設定後不再呼叫外部 API
+        self.vector_backend = None
+        # 合併同一時間窗的多筆 query 成一次 list payload（需端點支援，預設關閉）
+        self.batcher = None
+        if str(config.get("TECH_VECTOR_BATCH_ENABLED", "false")).strip().lower() in ("1", "true", "yes", "y", "on"):
+            self.batch_url = config.get("TECH_VECTOR_BATCH_URL") or self.redis_url
+            self.batcher = VectorSearchBatcher(
+                self._post_vector_search_batch,
+                window=int(config.get("TECH_VECTOR_BATCH_WINDOW_MS", 3)) / 1000,
+                max_batch=int(config.get("TECH_VECTOR_BATCH_MAX", 16)),
+            )
+        self._faq_ver = "4.0"
+        self._index_version = config.get("TECH_VECTOR_INDEX_VERSION", "")
+
+    @property
+    def faq_ver(self):
+        return self._faq_ver
+
+    @faq_ver.setter
+    def faq_ver(self, value):
+        if value != self._faq_ver:
+            self._faq_ver = value
+            self.invalidate_cache()
+
+    @property
+    def index_version(self):
+        return self._index_version
+
+    @index_version.setter
+    def index_version(self, value):
+        """向量索引重建後更新版本，舊的快取結果一併失效。"""
+        if value != self._index_version:
+            self._index_version = value
+            self.invalidate_cache()
+
+    def invalidate_cache(self):
+        for cache in self.response_caches.values():
+            cache.clear()
+
+    def cache_stats(self) -> dict:
+        return {method: cache.stats() for method, cache in self.response_caches.items()}
+
+    def use_local_index(self, index):
+        """改用本機索引回答向量搜尋；索引版本不同，舊快取一併失效。"""
+        self.vector_backend = index
+        self.index_version = f"local:{index.version}"
+
+    async def _post_vector_search(self, data: dict) -> dict:
+        if self.vector_backend is not None:
+            return await self.vector_backend.search(data)
+        if self.batcher is not None:
+            return await self.batcher.search(data)
+        async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
+            return await response.json()
+
+    async def _post_vector_search_batch(self, payloads: list) -> dict:
+        async with self.session.post(self.batch_url, headers=self.headers, data=json.dumps(payloads)) as response:
+            return await response.json()
+
+    async def close(self):
+        if self.batcher is not None:
+            await self.batcher.close()
+
+    async def _vector_search(self, method: str, data: dict) -> dict:
+        """向量搜尋：結果快取 -> single-flight -> 本機索引 或 (batcher) -> HTTP；只快取有 faqs 的正常回應。"""
+        cache = self.response_caches[method]
+        cache_key = (self._index_version, json.dumps(data, sort_keys=True, ensure_ascii=False))
+        response_json = cache.get(cache_key)
+        if response_json is not None:
+            return response_json
+
+        response_json = await self.inflight.do(cache_key, lambda: self._post_vector_search(data))
+        if ((response_json or {}).get("result") or {}).get("faqs"):
+            cache.set(cache_key, response_json)
+        return response_json
+
     @async_retry(max_retries=3, delay=1)
     async def get_hint_simiarity(self, search_info):
         data = {
@@ -43,9 +140,8 @@ class RedisConfig:
             "hide_max": 2001,
         }
 
-        async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
-            response_json = await response.json()
-            top1_faq = response_json.get("result").get("faqs")[0]
+        response_json = await self._vector_search("get_hint_simiarity", data)
+        top1_faq = response_json.get("result").get("faqs")[0]
 
         return {
             "faq": top1_faq["kb_no"],
@@ -105,9 +201,8 @@ class RedisConfig:
             "hide_max": 2000,
         }
 
-        # async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
-        #     response_json = await response.json()
-        #     return response_json.get("result").get("faqs")[0]["productLine"]
+        # response_json = await self._vector_search("get_productline", data)
+        # return response_json.get("result").get("faqs")[0]["productLine"]
         return "notebook"   # 先寫死回傳 notebook 測試用  gina
 
     @async_retry(max_retries=3, delay=1)
@@ -122,13 +217,13 @@ class RedisConfig:
             "hide_max": 3012,
         }
 
-        async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
-            top1_result = (await response.json()).get("result").get("faqs")[0]
-            return {
-                "service_from_search": self.hide_to_service(top1_result.get("hide")),
-                "service_similarity": top1_result.get("cosineSimilarity"),
-                "service_pl": top1_result.get("productLine"),
-            }
+        response_json = await self._vector_search("get_specific_service", data)
+        top1_result = response_json.get("result").get("faqs")[0]
+        return {
+            "service_from_search": self.hide_to_service(top1_result.get("hide")),
+            "service_similarity": top1_result.get("cosineSimilarity"),
+            "service_pl": top1_result.get("productLine"),
+        }
 
     def hide_to_service(self, hide):   # gina LLM的痕跡
         # （此處略，與你原始內容一致）
@@ -146,12 +241,12 @@ class RedisConfig:
             "hide_max": 1999
         }
 
-        async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
-            top1_result = (await response.json()).get("result").get("faqs")[0]
-            return {
-                'service_from_search': self.hide_to_service(top1_result.get('hide')),
-                'service_similarity': top1_result.get('cosineSimilarity')
-            }
+        response_json = await self._vector_search("get_replace_service", data)
+        top1_result = response_json.get("result").get("faqs")[0]
+        return {
+            'service_from_search': self.hide_to_service(top1_result.get('hide')),
+            'service_similarity': top1_result.get('cosineSimilarity')
+        }
 
     @async_retry(max_retries=3, delay=1)
     async def get_service(self, search_info, site):
@@ -165,12 +260,12 @@ class RedisConfig:
             "hide_max": 1999,
         }
 
-        async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data)) as response:
-            top1_result = (await response.json()).get("result").get("faqs")[0]
-            return {
-                "service_from_search": self.hide_to_service(top1_result.get("hide")),
-                "service_similarity": top1_result.get("cosineSimilarity"),
-            }
+        response_json = await self._vector_search("get_service", data)
+        top1_result = response_json.get("result").get("faqs")[0]
+        return {
+            "service_from_search": self.hide_to_service(top1_result.get("hide")),
+            "service_similarity": top1_result.get("cosineSimilarity"),
+        }
 
     @async_retry(max_retries=3, delay=1)
     async def get_faq(self, search_info, site, productLine, top_n=4):
@@ -230,25 +325,21 @@ class RedisConfig:
 
 
         # try:
-        #     async with self.session.post(self.redis_url, headers=self.headers, data=json.dumps(data), timeout=aiohttp.ClientTimeout(total=20)) as response:
-        #         # 確保 response.json() 成功解析並且包含 "result" 和 "faqs"
-        #         response_json = await response.json()
-                
-        #         # print(json.dumps(data))
-        #         # print(response_json)
-        #         if not response_json:
-        #             raise ValueError("返回的 JSON 資料為空")
-                
-        #         result = response_json.get("result")
-        #         if not result or "faqs" not in result:
-        #             raise KeyError('"faqs" 不存在於返回的結果中')
-
-        #         faqs = result["faqs"]
-        #         return {
-        #             "faq": [faq.get("kb_no") for faq in faqs],
-        #             "cosineSimilarity": [faq.get("cosineSimilarity") for faq in faqs],
-        #             "productLine": [faq.get("productLine") for faq in faqs],
-        #         }
+        #     response_json = await self._vector_search("get_faq", data)
+        #     # 確保 response.json() 成功解析並且包含 "result" 和 "faqs"
+        #     if not response_json:
+        #         raise ValueError("返回的 JSON 資料為空")
+
+        #     result = response_json.get("result")
+        #     if not result or "faqs" not in result:
+        #         raise KeyError('"faqs" 不存在於返回的結果中')
+
+        #     faqs = result["faqs"]
+        #     return {
+        #         "faq": [faq.get("kb_no") for faq in faqs],
+        #         "cosineSimilarity": [faq.get("cosineSimilarity") for faq in faqs],
+        #         "productLine": [faq.get("productLine") for faq in faqs],
+        #     }
 
         # except Exception as e:
         #     print(f"處理 FAQ 時發生錯誤: {e}")
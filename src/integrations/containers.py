@@ -6,7 +6,20 @@ from src.services.service_discriminator_merge_input import ServiceDiscriminator
 from src.services.content_policy_check import ContentPolicyCheck
 from src.core.userInfo_discriminator import UserinfoDiscriminator, FollowUpClassifierFunctionOnly
 from src.services.base_service import BaseService
+from src.integrations.llm_clients import LLMClientRegistry
+from src.integrations.local_vector_index import LocalVectorIndex, AzureOpenAIEmbedder
+from src.integrations.mapping_snapshot import MappingSnapshot, MappingTables, read_signature
+from src.services.reload_jobs import ReloadJobs
+from utils.logger import logger
+from utils.cache import TTLCache
+from shared_lib.sharedlib.async_translate import AsyncGoogleTranslateClient, TranslateBatcher
+from shared_lib.sharedlib.get_translation import Translator
 import os
+import json
+import asyncio
+import base64
+import dataclasses
+from google.oauth2 import service_account
 # from src.core.config_loader import load_config
 from src.core.config_loader import * 
 
@@ -18,7 +31,26 @@ os.environ["CURRENT_ENV"] = "dev"
 # env_config = load_config()
 # cfg = env_config
 
+def _mapping_property(name):
+    """container.<name> 讀取目前生效的 MappingTables；指定新值時整組替換（不修改現有表）。"""
+
+    def getter(self):
+        return getattr(self.mappings, name)
+
+    def setter(self, value):
+        self.mappings = dataclasses.replace(self.mappings, **{name: value})
+
+    return property(getter, setter)
+
+
 class DependencyContainer:
+    rag_mappings = _mapping_property("rag_mappings")
+    rag_hint_id_index_mapping = _mapping_property("rag_hint_id_index_mapping")
+    KB_mappings = _mapping_property("KB_mappings")
+    PL_mappings = _mapping_property("PL_mappings")
+    productline_name_map = _mapping_property("productline_name_map")
+    specific_kb_mappings = _mapping_property("specific_kb_mappings")
+
     def __init__(self):
         self.cfg = config
         self.aiohttp_session = None  # 暫不初始化
@@ -30,6 +62,9 @@ class DependencyContainer:
         self.lookup_db = None
 
         # 工具類也先留空
+        self.llm_clients = None  # 共用 Gemini / Azure OpenAI clients
+        self.translate_batcher = None  # 非同步 Google Translate（合併併發請求）
+        self.language_processor = None  # 共用 Translator（langid / OpenCC / GPT 翻譯）
         self.base_service = None
         self.merge_user_input = None
         self.sd = None
@@ -38,13 +73,9 @@ class DependencyContainer:
         self.userinfo_discrimiator_mkt = None
         self.followup_discrimiator = None
 
-        # 暫存資料
-        self.rag_mappings = {}
-        self.rag_hint_id_index_mapping = {}
-        self.KB_mappings = {}
-        self.PL_mappings = {}
-        self.productline_name_map = {}
-        self.specific_kb_mappings = {}
+        # 暫存資料：mapping 表整組放在 MappingTables（重新載入時單一參照交換）
+        self.mappings = MappingTables()
+        self.reload_jobs = ReloadJobs()  # mapping 背景重新載入 job
 
         trans_endpoint     = require(f"TECH_OPENAI_GPT41MINI_PAYGO_EU_AZURE_ENDPOINT").rstrip("/")
         openai_api_key     = require(f"TECH_OPENAI_GPT41MINI_PAYGO_EU_API_KEY")
@@ -56,6 +87,13 @@ class DependencyContainer:
         )
         self.creds_trans = require("TECH_TRANSLATE_CREDENTIALS")
 
+        # 翻譯結果快取（key 為正規化後的使用者輸入）
+        self.translation_cache = TTLCache(
+            name="translation",
+            maxsize=getenv_int("TECH_TRANSLATION_CACHE_SIZE", 4096),
+            ttl=getenv_int("TECH_TRANSLATION_CACHE_TTL_SECONDS", 86400),
+        )
+
     async def init_async(self, aiohttp_session):
         # 非同步初始化 aiohttp session
         self.aiohttp_session = aiohttp_session
@@ -63,29 +101,88 @@ class DependencyContainer:
         # 依賴初始化（需要 session 的）
         self.redis_config = RedisConfig(config=self.cfg, session=self.aiohttp_session)
         self.cosmos_settings = CosmosConfig(config=self.cfg)
-        self.sentence_group_classification = SentenceGroupClassification(config=self.cfg)
+        # LLM clients 每個 worker 只建一次，所有 BaseService 子類共用
+        self.llm_clients = LLMClientRegistry(self.cfg)
+        await self.llm_clients.warm_up()
+        if getenv("TECH_VECTOR_BACKEND", "http") == "local":
+            local_index = await asyncio.to_thread(
+                LocalVectorIndex.open,
+                require("TECH_LOCAL_VECTOR_INDEX_DIR"),
+                embedder=AzureOpenAIEmbedder(self.llm_clients.openai_client, require("TECH_LOCAL_VECTOR_EMBED_MODEL")),
+            )
+            self.redis_config.use_local_index(local_index)
+
+        self.sentence_group_classification = SentenceGroupClassification(config=self.cfg, clients=self.llm_clients)
         # self.lookup_db = self.cosmos_settings.lookup_db # gina 為了測試copilot 暫時不跑
 
-        self.base_service = BaseService(config=self.cfg)
+        self.base_service = BaseService(config=self.cfg, clients=self.llm_clients)
         self.sd = ServiceDiscriminator(self.redis_config, self.base_service)
-        self.content_policy_check = ContentPolicyCheck(config=self.cfg)
-        self.userinfo_discrimiator = UserinfoDiscriminator(config=self.cfg)
-        self.followup_discrimiator = FollowUpClassifierFunctionOnly(config=self.cfg)
+        self.content_policy_check = ContentPolicyCheck(config=self.cfg, clients=self.llm_clients)
+        self.userinfo_discrimiator = UserinfoDiscriminator(config=self.cfg, clients=self.llm_clients)
+        self.followup_discrimiator = FollowUpClassifierFunctionOnly(config=self.cfg, clients=self.llm_clients)
+
+        # Google Translate 走共用 aiohttp 連線池，並把數毫秒內的請求合併成一次呼叫
+        trans_info = json.loads(base64.b64decode(self.creds_trans))
+        trans_creds = service_account.Credentials.from_service_account_info(trans_info).with_scopes(
+            ["https://www.googleapis.com/auth/cloud-platform"]
+        )
+        self.translate_batcher = TranslateBatcher(
+            AsyncGoogleTranslateClient(trans_creds, session=self.aiohttp_session),
+            window=getenv_int("TECH_TRANSLATE_BATCH_WINDOW_MS", 5) / 1000,
+            max_batch=getenv_int("TECH_TRANSLATE_BATCH_MAX", 64),
+        )
+
+        # Translator 建立時要反序列化整個 langid 模型，只在啟動時於 thread 中建一次，所有 ChatFlow 共用
+        self.language_processor = await asyncio.to_thread(
+            Translator.get_instance,
+            info=trans_info,
+            client=self._trans_client,
+            translate_backend=self.translate_batcher,
+        )
 
     async def close(self):
+        if self.cosmos_settings:
+            await self.cosmos_settings.close()  # 先把 write-behind 佇列寫完
+        await self.reload_jobs.close()
+        if self.translate_batcher:
+            await self.translate_batcher.close()
+        if self.redis_config:
+            await self.redis_config.close()
+        if self.llm_clients:
+            await self.llm_clients.close()
         if self.aiohttp_session:
             await self.aiohttp_session.close()
 
+    def publish_mappings(self, tables: MappingTables):
+        """發布新版本 mapping；進行中的 request 仍持有舊版參照，不受影響。"""
+        previous, self.mappings = self.mappings, tables
+        logger.info(f"[Mappings] published version {tables.version or '-'} (previous {previous.version or '-'})")
+
+    async def watch_mapping_snapshot(self, path, interval: float = 30.0):
+        """其他 worker 重新載入後 snapshot 檔會被替換；定期比對 signature，變動即 attach 新檔。"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                signature = await asyncio.to_thread(read_signature, path)
+                if signature and signature != self.mappings.signature:
+                    snapshot = await asyncio.to_thread(MappingSnapshot.open, path)
+                    self.publish_mappings(MappingTables.from_snapshot(snapshot))
+            except Exception as e:
+                logger.warning(f"[Mappings] snapshot watch failed: {e}")
+
     def load_rag_pickle(self, rag_data, rag_index):
-        self.rag_mappings = rag_data
-        self.rag_hint_id_index_mapping = rag_index
+        # 兩張表彼此對應，須一次替換（逐一 setter 會有一瞬間新舊混用）
+        self.mappings = dataclasses.replace(
+            self.mappings, rag_mappings=rag_data, rag_hint_id_index_mapping=rag_index
+        )
 
     def load_kb_mappings(self, kb_mappings):
         self.KB_mappings = kb_mappings
 
     def load_pl_mappings(self, pl_mappings, pl_name_map):
-        self.PL_mappings = pl_mappings
-        self.productline_name_map = pl_name_map
+        self.mappings = dataclasses.replace(
+            self.mappings, PL_mappings=pl_mappings, productline_name_map=pl_name_map
+        )
 
     def load_specific_kb(self, specific_kb):
         self.specific_kb_mappings = specific_kb
\ No newline at end of file
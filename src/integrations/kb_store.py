@@ -0,0 +1,278 @@
+"""Columnar KB store: ``kb_mappings`` 的唯讀 mmap 檔案格式（取代整包 unpickle 的 dict of dicts）。
+
+檔案結構（little-endian，各區段 8-byte 對齊）::
+
+    b"KBSTORE1" | uint32 header 長度 | header JSON（n、langs、compression、extras）
+    keys     uint64[n]      (kb_no << 16) | lang_id，已排序，查詢用 searchsorted
+    offsets  uint64[3n+1]   title / summary / content 依序在 blob 內的起訖位置
+    nulls    uint8[n]       bit i = 第 i 個欄位為 None
+    blob     UTF-8（compression="zlib" 時每個欄位各自壓縮）
+
+對外提供 ``Mapping`` 介面：``store.get(f"{kb_no}_{lang}")`` 回傳 ``KBRecord``，
+欄位在 ``.get("content")`` 等存取時才解碼。
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"KBSTORE1"
+FIELDS = ("title", "summary", "content")
+LANG_BITS = 16
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _split_key(key: str):
+    kb_no, sep, lang = key.partition("_")
+    if not sep or not kb_no.isdigit():
+        return None
+    return int(kb_no), lang
+
+
+def _parse_rows(mapping: Mapping):
+    rows, extras = [], {}
+    for key, value in mapping.items():
+        parsed = _split_key(key)
+        if parsed is None:
+            extras[key] = {field: value.get(field) for field in FIELDS}
+        else:
+            rows.append((parsed, value))
+    return rows, extras
+
+
+def _lang_ids(langs):
+    if len(langs) >= 1 << LANG_BITS:
+        raise ValueError("too many languages")
+    return {lang: i for i, lang in enumerate(langs)}
+
+
+def _encode_fields(value, compression):
+    """單筆 KB 的三個欄位 -> (各欄位 bytes, null bits)"""
+    chunks, nulls = [], 0
+    for column, field in enumerate(FIELDS):
+        text = value.get(field)
+        if text is None:
+            nulls |= 1 << column
+            data = b""
+        else:
+            data = str(text).encode("utf-8")
+            if compression == "zlib":
+                data = zlib.compress(data)
+        chunks.append(data)
+    return chunks, nulls
+
+
+def _pack(keys, lengths, nulls, chunks, langs, compression, extras) -> bytes:
+    """``lengths`` 為每筆三個欄位的 byte 數（shape (n, 3)），``chunks`` 依序串起來即為 blob"""
+    offsets = np.zeros(3 * len(keys) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum(np.asarray(lengths, dtype="<u8").reshape(-1), dtype=np.uint64)
+    header = json.dumps(
+        {"n": len(keys), "langs": langs, "compression": compression, "extras": extras},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    parts = [MAGIC, struct.pack("<I", len(header)), header]
+    size = 12 + len(header)
+    for array in (np.asarray(keys, dtype="<u8"), offsets):
+        parts.append(b"\0" * (_align(size) - size))
+        size = _align(size)
+        parts.append(array.tobytes())
+        size += array.nbytes
+    nulls = np.asarray(nulls, dtype=np.uint8)
+    parts.append(nulls.tobytes())
+    size += nulls.nbytes
+    parts.append(b"\0" * (_align(size) - size))
+    parts.extend(chunks)
+    return b"".join(parts)
+
+
+class KBRecord(Mapping):
+    """單筆 KB（title / summary / content），欄位延遲解碼。"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, field):
+        try:
+            column = FIELDS.index(field)
+        except ValueError:
+            raise KeyError(field) from None
+        return self._store._decode(self._row, column)
+
+    def __contains__(self, field):
+        return field in FIELDS  # 不必解碼欄位
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"KBRecord({dict(self)!r})"
+
+
+class KBStore(Mapping):
+    """``buffer`` 可為 bytes、mmap 或 shared memory 的 memoryview；本身不複製資料。"""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if bytes(view[:8]) != MAGIC:
+            raise ValueError("not a KB store")
+        (header_len,) = struct.unpack_from("<I", view, 8)
+        header = json.loads(bytes(view[12:12 + header_len]))
+        self.langs = header["langs"]
+        self.compression = header["compression"]
+        self._lang_ids = {lang: i for i, lang in enumerate(self.langs)}
+        self._extras = header["extras"]  # 無法轉成整數 key 的少數資料（例如 kb_no 為 None）
+
+        n = header["n"]
+        offset = _align(12 + header_len)
+        self._keys = np.frombuffer(buffer, dtype="<u8", count=n, offset=offset)
+        offset += 8 * n
+        self._offsets = np.frombuffer(buffer, dtype="<u8", count=3 * n + 1, offset=offset)
+        offset += 8 * (3 * n + 1)
+        self._nulls = np.frombuffer(buffer, dtype=np.uint8, count=n, offset=offset)
+        self._blob_start = _align(offset + n)
+        self._view = view
+
+    # ---- 建立 ----
+    @staticmethod
+    def build(mapping: Mapping, compression: str = None) -> bytes:
+        """由 ``{f"{kb_no}_{lang}": {"title", "summary", "content"}}`` 產生 store bytes。"""
+        if compression not in (None, "zlib"):
+            raise ValueError(f"unsupported compression {compression!r}")
+        rows, extras = _parse_rows(mapping)
+        langs = sorted({lang for (_, lang), _ in rows})
+        lang_ids = _lang_ids(langs)
+        rows.sort(key=lambda row: (row[0][0] << LANG_BITS) | lang_ids[row[0][1]])
+
+        keys = [(kb_no << LANG_BITS) | lang_ids[lang] for (kb_no, lang), _ in rows]
+        lengths, nulls, chunks = [], [], []
+        for _, value in rows:
+            fields, null_bits = _encode_fields(value, compression)
+            lengths.append([len(data) for data in fields])
+            nulls.append(null_bits)
+            chunks.extend(fields)
+        return _pack(keys, np.reshape(lengths, (-1, 3)), nulls, chunks, langs, compression, extras)
+
+    @classmethod
+    def merge(cls, base: Mapping, changes: Mapping) -> bytes:
+        """``base`` 加上 ``changes``（新增或覆寫的項目）產生新的 store bytes（增量重新載入用）。
+
+        ``base`` 為 KBStore 時未變動的資料列直接複製 blob 內已編碼（或已壓縮）的位元組，
+        不解碼欄位、不建立 KBRecord；成本只和變動筆數與檔案大小有關。"""
+        if not isinstance(base, KBStore):
+            return cls.build({**base, **changes})
+        compression = base.compression
+        rows, extras = _parse_rows(changes)
+        extras = {**base._extras, **extras}
+        langs = sorted(set(base.langs) | {lang for (_, lang), _ in rows})
+        lang_ids = _lang_ids(langs)
+
+        # 語言表是原本的超集且已排序，舊 lang_id 換成新 id 後既有資料列的順序不變
+        shift, mask = np.uint64(LANG_BITS), np.uint64((1 << LANG_BITS) - 1)
+        remap = np.asarray([lang_ids[lang] for lang in base.langs] or [0], dtype="<u8")
+        base_keys = ((base._keys >> shift) << shift) | remap[(base._keys & mask).astype(np.intp)]
+        change_keys = np.asarray([(kb_no << LANG_BITS) | lang_ids[lang] for (kb_no, lang), _ in rows], dtype="<u8")
+
+        kept = np.flatnonzero(~np.isin(base_keys, change_keys))
+        keys = np.concatenate([base_keys[kept], change_keys])
+        sources = np.concatenate([kept, -1 - np.arange(len(rows))])  # 負數：changes 的第幾筆
+        order = np.argsort(keys, kind="stable")
+
+        base_lengths = np.diff(base._offsets.astype(np.int64)).reshape(-1, 3)
+        lengths, nulls, chunks = np.zeros((len(order), 3), dtype=np.int64), np.zeros(len(order), dtype=np.uint8), []
+        for out, source in enumerate(sources[order].tolist()):
+            if source >= 0:
+                start = base._blob_start + int(base._offsets[3 * source])
+                end = base._blob_start + int(base._offsets[3 * source + 3])
+                chunks.append(base._view[start:end])
+                lengths[out] = base_lengths[source]
+                nulls[out] = base._nulls[source]
+            else:
+                fields, nulls[out] = _encode_fields(rows[-1 - source][1], compression)
+                lengths[out] = [len(data) for data in fields]
+                chunks.extend(fields)
+        return _pack(keys[order], lengths, nulls, chunks, langs, compression, extras)
+
+    def tobytes(self) -> bytes:
+        return bytes(self._view)
+
+    @classmethod
+    def write(cls, path, mapping: Mapping, compression: str = None):
+        """寫到暫存檔再 rename，已開啟舊檔的 worker 不受影響。"""
+        path = Path(path)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        if isinstance(mapping, KBStore) and mapping.compression == compression:
+            data = mapping.tobytes()  # 已是 store 格式（例如 merge 的結果），直接寫出
+        else:
+            data = cls.build(mapping, compression)
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # ---- 查詢 ----
+    def _find(self, key):
+        parsed = _split_key(key) if isinstance(key, str) else None
+        if parsed is None:
+            return None
+        lang_id = self._lang_ids.get(parsed[1])
+        if lang_id is None or parsed[0] >= 1 << (64 - LANG_BITS):
+            return None
+        packed = (parsed[0] << LANG_BITS) | lang_id
+        row = int(np.searchsorted(self._keys, packed))
+        if row < len(self._keys) and int(self._keys[row]) == packed:
+            return row
+        return None
+
+    def _decode(self, row: int, column: int):
+        if self._nulls[row] & (1 << column):
+            return None
+        index = 3 * row + column
+        start = self._blob_start + int(self._offsets[index])
+        end = self._blob_start + int(self._offsets[index + 1])
+        data = self._view[start:end]
+        if self.compression == "zlib":
+            data = zlib.decompress(data)
+        return str(data, "utf-8")
+
+    def __getitem__(self, key):
+        row = self._find(key)
+        if row is not None:
+            return KBRecord(self, row)
+        if key in self._extras:
+            return dict(self._extras[key])
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return self._find(key) is not None or key in self._extras
+
+    def __iter__(self):
+        mask = (1 << LANG_BITS) - 1
+        for packed in self._keys.tolist():
+            yield f"{packed >> LANG_BITS}_{self.langs[packed & mask]}"
+        yield from self._extras
+
+    def __len__(self):
+        return len(self._keys) + len(self._extras)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._view)
@@ -0,0 +1,85 @@
+# flake8: noqa: E501
+"""Process-wide LLM client registry.
+
+Gemini (Vertex AI) 與 Azure OpenAI client 只在 lifespan 建立一次，
+由 DependencyContainer 持有並注入所有 BaseService 子類，
+避免每個 request 重新解碼憑證、重建 client 並丟掉已暖機的連線池。
+"""
+
+import asyncio
+import base64
+import json
+
+from google import genai
+from google.auth.transport.requests import Request as GoogleAuthRequest
+from google.oauth2 import service_account
+from openai import AsyncAzureOpenAI
+
+from utils.logger import logger
+
+GEMINI_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+DEFAULT_GEMINI_MAX_CONCURRENCY = 16
+
+
+def build_gemini_credentials(config):
+    """Decode the base64 service-account JSON in ``TECH_GEMINI_CREDENTIALS``."""
+    info = json.loads(base64.b64decode(config.get("TECH_GEMINI_CREDENTIALS")))
+    return service_account.Credentials.from_service_account_info(info).with_scopes(GEMINI_SCOPES)
+
+
+def build_gemini_client(config, credentials):
+    return genai.Client(
+        vertexai=True,
+        project=credentials.project_id,
+        location=config.get("TECH_GEMINI_LOCATION"),
+        credentials=credentials,
+    )
+
+
+def build_openai_client(config):
+    return AsyncAzureOpenAI(
+        azure_endpoint=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_AZURE_ENDPOINT"),
+        api_key=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_API_KEY"),
+        api_version=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_API_VERSION"),
+        timeout=30,
+    )
+
+
+class LLMClientRegistry:
+    """Shared Gemini / Azure OpenAI clients for one worker process.
+
+    ``gemini_client`` / ``openai_client`` 可直接傳入（測試或 benchmark 用的替身），
+    否則依 config 建立。
+    """
+
+    def __init__(self, config, gemini_client=None, openai_client=None, gemini_max_concurrency=None):
+        self.config = config
+        self.gemini_model_name = config.get("TECH_GEMINI_MODEL_NAME")
+        self.gpt41_mini_model = config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_MODEL")
+
+        # 每個 worker 同時送往 Gemini 的請求上限，避免尖峰時把 quota / 連線池打滿
+        if gemini_max_concurrency is None:
+            gemini_max_concurrency = int(config.get("TECH_GEMINI_MAX_CONCURRENCY", DEFAULT_GEMINI_MAX_CONCURRENCY))
+        self.gemini_limiter = asyncio.Semaphore(gemini_max_concurrency)
+
+        self.gemini_credentials = None
+        if gemini_client is None:
+            self.gemini_credentials = build_gemini_credentials(config)
+            gemini_client = build_gemini_client(config, self.gemini_credentials)
+        self.gemini_client = gemini_client
+        self.openai_client = openai_client or build_openai_client(config)
+
+    async def warm_up(self):
+        """預先取得 Gemini access token，讓第一個 request 不必等 OAuth 往返。"""
+        if self.gemini_credentials is None:
+            return
+        try:
+            await asyncio.to_thread(self.gemini_credentials.refresh, GoogleAuthRequest())
+        except Exception as e:
+            logger.warning(f"[LLMClientRegistry] Gemini credentials warm-up failed: {e}")
+
+    async def close(self):
+        try:
+            await self.openai_client.close()
+        except Exception as e:
+            logger.warning(f"[LLMClientRegistry] close OpenAI client failed: {e}")
@@ -0,0 +1,198 @@
+"""In-process vector index: 與外部向量搜尋 API 相同的 query / 回應格式，改在本機以 NumPy 計算。
+
+索引目錄結構（``LocalVectorIndex.build`` 產生）::
+
+    embeddings.npy   (n, dim) float32 / float16，L2 正規化，以 mmap 唯讀開啟
+    metadata.npz     每列的 kb_no / hide / site / version / key / type，以及 productLine 的布林矩陣
+    index.json       dtype、維度、site / version / productLine 字典、索引版本
+
+查詢時先以 websiteCode / version / hide 範圍 / productLine 組出布林遮罩，
+再對符合的列做矩陣內積（cosine），以 argpartition 取 top-k。
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.npz"
+INDEX_FILE = "index.json"
+BLOCK_ROWS = 65536  # float16 逐塊轉 float32 再做內積，避免一次複製整個矩陣
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _vocab(values) -> list:
+    return sorted({v for v in values if v is not None})
+
+
+class AzureOpenAIEmbedder:
+    """以 Azure OpenAI embeddings 產生 query 向量（需與建索引時使用同一個 model）。"""
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+
+    async def __call__(self, texts: list) -> np.ndarray:
+        response = await self.client.embeddings.create(model=self.model, input=texts)
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+
+class LocalVectorIndex:
+    """``search(payload)`` 接受與向量搜尋 API 相同的 payload，回傳相同格式的 dict。
+
+    ``embedder`` 為 async callable：``await embedder([text, ...]) -> (len, dim) ndarray``。
+    """
+
+    def __init__(self, embeddings: np.ndarray, metadata: dict, info: dict, embedder=None):
+        self.embeddings = embeddings
+        self.embedder = embedder
+        self.version = info.get("version", "")
+        self.sites = info["sites"]
+        self.versions = info["versions"]
+        self.product_lines = info["product_lines"]
+        self._site_index = {s: i for i, s in enumerate(self.sites)}
+        self._version_index = {v: i for i, v in enumerate(self.versions)}
+        self._pl_index = {p: i for i, p in enumerate(self.product_lines)}
+
+        self.kb_no = metadata["kb_no"]
+        self.hide = metadata["hide"]
+        self.site = metadata["site"]
+        self.faq_version = metadata["version"]
+        self.key = metadata["key"]
+        self.type = metadata["type"]
+        self.pl_matrix = metadata["pl_matrix"]
+
+    def __len__(self):
+        return len(self.kb_no)
+
+    # ---- 建立 / 開啟 ----
+    @classmethod
+    def build(cls, directory, embeddings, records: list, dtype: str = "float32", version: str = ""):
+        """``records`` 與 ``embeddings`` 同順序，每筆含 kb_no / websiteCode / productLine（逗號分隔）/
+        version / hide，可選 key / type。寫入 ``directory`` 並回傳以 mmap 開啟的索引。"""
+        if len(records) != len(embeddings):
+            raise ValueError(f"{len(records)} records but {len(embeddings)} embeddings")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        sites = _vocab(r["websiteCode"] for r in records)
+        versions = _vocab(str(r["version"]) for r in records)
+        pl_sets = [{p.strip() for p in (r.get("productLine") or "").split(",") if p.strip()} for r in records]
+        product_lines = _vocab(p for pls in pl_sets for p in pls)
+        site_index = {s: i for i, s in enumerate(sites)}
+        version_index = {v: i for i, v in enumerate(versions)}
+        pl_index = {p: i for i, p in enumerate(product_lines)}
+
+        pl_matrix = np.zeros((len(records), len(product_lines)), dtype=bool)
+        for row, pls in enumerate(pl_sets):
+            pl_matrix[row, [pl_index[p] for p in pls]] = True
+
+        np.save(directory / EMBEDDINGS_FILE, _normalize(embeddings).astype(dtype))
+        np.savez(
+            directory / METADATA_FILE,
+            kb_no=np.asarray([r["kb_no"] for r in records], dtype=np.int64),
+            hide=np.asarray([r.get("hide", 0) for r in records], dtype=np.int32),
+            site=np.asarray([site_index[r["websiteCode"]] for r in records], dtype=np.int16),
+            version=np.asarray([version_index[str(r["version"])] for r in records], dtype=np.int16),
+            key=np.asarray([r.get("key", "") for r in records], dtype=str),
+            type=np.asarray([r.get("type", "") for r in records], dtype=str),
+            pl_matrix=pl_matrix,
+        )
+        info = {
+            "version": version,
+            "dtype": dtype,
+            "dim": int(np.shape(embeddings)[1]),
+            "sites": sites,
+            "versions": versions,
+            "product_lines": product_lines,
+        }
+        tmp = directory / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(info, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, directory / INDEX_FILE)  # index.json 最後寫入，存在即代表索引完整
+        return cls.open(directory)
+
+    @classmethod
+    def open(cls, directory, embedder=None):
+        directory = Path(directory)
+        info = json.loads((directory / INDEX_FILE).read_text(encoding="utf-8"))
+        embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+        with np.load(directory / METADATA_FILE) as npz:
+            metadata = {name: npz[name] for name in npz.files}
+        return cls(embeddings, metadata, info, embedder=embedder)
+
+    # ---- 查詢 ----
+    def mask(self, payload: dict) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        site = payload.get("websiteCode")
+        if site and site != "all":
+            code = self._site_index.get(site)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.site == code
+        version = payload.get("version")
+        if version:
+            code = self._version_index.get(str(version))
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.faq_version == code
+        if payload.get("hide_min") is not None:
+            mask &= self.hide >= payload["hide_min"]
+        if payload.get("hide_max") is not None:
+            mask &= self.hide <= payload["hide_max"]
+        product_line = payload.get("productLine")
+        if product_line:
+            column = self._pl_index.get(product_line)
+            if column is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.pl_matrix[:, column]
+        return mask
+
+    def _scores(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = self.embeddings[rows[start:start + BLOCK_ROWS]]
+            scores[start:start + BLOCK_ROWS] = block.astype(np.float32, copy=False) @ query
+        return scores
+
+    def top_k(self, query: np.ndarray, payload: dict):
+        """回傳 (rows, scores)，依相似度由高到低。"""
+        rows = np.flatnonzero(self.mask(payload))
+        n = int(payload.get("n") or 1)
+        if not len(rows) or n <= 0:
+            return rows[:0], np.empty(0, dtype=np.float32)
+        scores = self._scores(rows, _normalize(query))
+        if n < len(rows):
+            top = np.argpartition(-scores, n - 1)[:n]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
+
+    def search_vector(self, query: np.ndarray, payload: dict) -> dict:
+        rows, scores = self.top_k(query, payload)
+        faqs = [
+            {
+                "kb_no": int(self.kb_no[row]),
+                "websiteCode": self.sites[self.site[row]],
+                "productLine": ",".join(p for p, on in zip(self.product_lines, self.pl_matrix[row]) if on),
+                "key": str(self.key[row]),
+                "type": str(self.type[row]),
+                "hide": int(self.hide[row]),
+                "cosineSimilarity": float(score),
+            }
+            for row, score in zip(rows, scores)
+        ]
+        return {"status": 200, "result": {"faqs": faqs}}
+
+    async def search(self, payload: dict) -> dict:
+        query = (await self.embedder([payload["keyword"]]))[0]
+        # 內積為 CPU 計算，丟到 thread 避免卡住 event loop
+        return await asyncio.to_thread(self.search_vector, query, payload)
@@ -0,0 +1,287 @@
+"""Shared read-only mapping snapshot for multi-worker deployments.
+
+把 rag_mappings / rag_hint_id_index_mapping / KB_mappings / PL_mappings / productline_name_map /
+specific_kb_mappings 寫進同一個檔案，各 worker 以 mmap 唯讀開啟：資料頁由 OS page cache 共用，
+不會因 unpickle 產生每個 worker 各一份的 Python 物件，也不會被 refcount 寫入觸發 copy-on-write。
+
+檔案只建立一次：第一個 worker 取得 ``<path>.lock``（fcntl）後建檔，寫暫存檔再 ``os.replace``；
+其他 worker 等鎖釋放後直接開啟。來源資料變動（signature 不同）時才重建。
+
+檔案結構::
+
+    b"MAPSNAP1" | uint32 header 長度 | header JSON（signature、各 section 的 kind / offset / length）
+    sections    各自 8-byte 對齊；kind 為 "kb"（KBStore）或 "json_map"（FrozenJsonMap）
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from src.integrations.kb_store import KBStore
+
+try:
+    import fcntl
+except ImportError:  # Windows 開發環境：沒有跨行程鎖，最差只是重複建檔（rename 仍是原子的）
+    fcntl = None
+
+MAGIC = b"MAPSNAP1"
+JSON_MAP_MAGIC = b"JSONMAP1"
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class FrozenJsonMap(Mapping):
+    """唯讀 ``str -> JSON value`` 對照表：key 排序後二分搜尋，value 存 JSON，取用時才解碼。
+
+    每次取值都回傳新解碼的物件（呼叫端可自由修改）；``value_type`` 可把 list 轉回 frozenset 等型別。
+    """
+
+    def __init__(self, buffer, value_type=None):
+        view = memoryview(buffer)
+        if bytes(view[:8]) != JSON_MAP_MAGIC:
+            raise ValueError("not a json map")
+        (n,) = struct.unpack_from("<Q", view, 8)
+        self._key_offsets = np.frombuffer(buffer, dtype="<u8", count=n + 1, offset=16)
+        self._value_offsets = np.frombuffer(buffer, dtype="<u8", count=n + 1, offset=16 + 8 * (n + 1))
+        self._key_start = 16 + 16 * (n + 1)
+        self._value_start = self._key_start + int(self._key_offsets[-1])
+        self._n = n
+        self._view = view
+        self._value_type = value_type
+
+    @staticmethod
+    def build(mapping: Mapping, default=None) -> bytes:
+        items = sorted((str(key).encode("utf-8"), value) for key, value in mapping.items())
+        keys = [key for key, _ in items]
+        values = [json.dumps(value, ensure_ascii=False, default=default).encode("utf-8") for _, value in items]
+        key_offsets = np.zeros(len(items) + 1, dtype="<u8")
+        value_offsets = np.zeros(len(items) + 1, dtype="<u8")
+        key_offsets[1:] = np.cumsum([len(k) for k in keys], dtype=np.uint64)
+        value_offsets[1:] = np.cumsum([len(v) for v in values], dtype=np.uint64)
+        return b"".join([
+            JSON_MAP_MAGIC, struct.pack("<Q", len(items)),
+            key_offsets.tobytes(), value_offsets.tobytes(), *keys, *values,
+        ])
+
+    def _key_bytes(self, row: int):
+        return self._view[self._key_start + int(self._key_offsets[row]):self._key_start + int(self._key_offsets[row + 1])]
+
+    def _find(self, key):
+        if not isinstance(key, str):
+            return None
+        target = key.encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid).tobytes() < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n and self._key_bytes(lo).tobytes() == target:
+            return lo
+        return None
+
+    def __getitem__(self, key):
+        row = self._find(key)
+        if row is None:
+            raise KeyError(key)
+        start = self._value_start + int(self._value_offsets[row])
+        end = self._value_start + int(self._value_offsets[row + 1])
+        value = json.loads(str(self._view[start:end], "utf-8"))
+        return self._value_type(value) if self._value_type else value
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for row in range(self._n):
+            yield str(self._key_bytes(row), "utf-8")
+
+    def __len__(self):
+        return self._n
+
+    def tobytes(self) -> bytes:
+        return bytes(self._view)
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Mapping):  # 已經是 snapshot 內的表（FrozenJsonMap 等）
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# section 名稱 -> (kind, 讀取時的 value_type)；名稱即 DependencyContainer 上的屬性名
+SECTIONS = {
+    "rag_mappings": ("json_map", None),
+    "rag_hint_id_index_mapping": ("json_map", None),
+    "KB_mappings": ("kb", None),
+    "PL_mappings": ("json_map", frozenset),
+    "productline_name_map": ("json_map", None),
+    "specific_kb_mappings": ("json_map", None),
+}
+
+
+def build_snapshot(tables: dict, signature: str = "") -> bytes:
+    header = {"signature": signature, "sections": {}}
+    blobs = []
+    for name, (kind, _) in SECTIONS.items():
+        table = tables[name]
+        if kind == "kb" and isinstance(table, KBStore) or kind == "json_map" and isinstance(table, FrozenJsonMap):
+            blobs.append((name, kind, table.tobytes()))  # 已是 section 格式（未變動的表、merge 結果）：直接複製
+        elif kind == "kb":
+            blobs.append((name, kind, KBStore.build(table)))
+        else:
+            blobs.append((name, kind, FrozenJsonMap.build(table, default=_json_default)))
+
+    # section offset 以資料區起點為基準，與 header 長度無關
+    offset = 0
+    for name, kind, blob in blobs:
+        header["sections"][name] = {"kind": kind, "offset": offset, "length": len(blob)}
+        offset = _align(offset + len(blob))
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _align(12 + len(header_bytes))
+
+    parts = [MAGIC, struct.pack("<I", len(header_bytes)), header_bytes, b"\0" * (data_start - 12 - len(header_bytes))]
+    position = 0
+    for name, kind, blob in blobs:
+        parts.append(b"\0" * (header["sections"][name]["offset"] - position))
+        parts.append(blob)
+        position = header["sections"][name]["offset"] + len(blob)
+    return b"".join(parts)
+
+
+def snapshot_version(signature: str) -> str:
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()[:12] if signature else ""
+
+
+class MappingSnapshot:
+    """開啟後以屬性取用各 section，例如 ``snapshot.rag_mappings``。"""
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if bytes(view[:8]) != MAGIC:
+            raise ValueError("not a mapping snapshot")
+        (header_len,) = struct.unpack_from("<I", view, 8)
+        header = json.loads(bytes(view[12:12 + header_len]))
+        self.signature = header["signature"]
+        self.version = snapshot_version(self.signature)
+        self.nbytes = len(view)
+        data_start = _align(12 + header_len)
+        self.tables = {}
+        for name, section in header["sections"].items():
+            start = data_start + section["offset"]
+            section_view = view[start:start + section["length"]]
+            if section["kind"] == "kb":
+                self.tables[name] = KBStore(section_view)
+            else:
+                self.tables[name] = FrozenJsonMap(section_view, value_type=SECTIONS.get(name, (None, None))[1])
+        self._buffer = buffer
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["tables"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def read_signature(path) -> str:
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != MAGIC:
+                return None
+            (header_len,) = struct.unpack("<I", f.read(4))
+            return json.loads(f.read(header_len))["signature"]
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def source_signature(paths, extra=None) -> str:
+    """來源檔的 (路徑, 大小, mtime) 加上 ``extra``（例如寫死在程式中的小表）組成的 signature。"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return json.dumps([parts, extra], ensure_ascii=False, sort_keys=True, default=_json_default)
+
+
+@contextmanager
+def _build_lock(path: Path):
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_atomic(path: Path, data: bytes):
+    """寫暫存檔、fsync 後 rename；中途失敗不會留下截斷的檔案，已開啟舊檔的 mmap 也不受影響。"""
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def write_snapshot(path, tables: dict, signature: str) -> MappingSnapshot:
+    """以 ``tables`` 覆寫 snapshot（重新載入用），回傳新開啟的 snapshot。"""
+    path = Path(path)
+    data = build_snapshot(tables, signature)
+    with _build_lock(path):
+        write_atomic(path, data)
+        return MappingSnapshot.open(path)
+
+
+def load_or_build(path, signature: str, build_tables) -> MappingSnapshot:
+    """確保 ``path`` 的 snapshot 與 ``signature`` 一致（必要時呼叫 ``build_tables()`` 重建），並以 mmap 開啟。"""
+    path = Path(path)
+    with _build_lock(path):
+        if read_signature(path) != signature:
+            write_atomic(path, build_snapshot(build_tables(), signature))
+        return MappingSnapshot.open(path)
+
+
+@dataclass(frozen=True)
+class MappingTables:
+    """目前生效的一組 mapping 表。更新時建立新的 MappingTables 整組替換（單一參照交換），
+    request 開始時取一次參照即可在整個處理過程看到一致的版本。"""
+
+    version: str = ""
+    signature: str = ""
+    rag_mappings: Mapping = field(default_factory=dict)
+    rag_hint_id_index_mapping: Mapping = field(default_factory=dict)
+    KB_mappings: Mapping = field(default_factory=dict)
+    PL_mappings: Mapping = field(default_factory=dict)
+    productline_name_map: Mapping = field(default_factory=dict)
+    specific_kb_mappings: Mapping = field(default_factory=dict)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: MappingSnapshot) -> "MappingTables":
+        return cls(version=snapshot.version, signature=snapshot.signature, **snapshot.tables)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in SECTIONS}
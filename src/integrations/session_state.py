@@ -0,0 +1,95 @@
+"""Per-session 對話狀態（write-through）：每輪開始前一次查詢取得歷史輸入、user_info、bot_scope、
+上輪 extract.output 與最新 hint，不必各自查 Cosmos。
+
+狀態在 ``insert_data`` / ``insert_hint_data`` 寫入時同步更新；查無（新 worker、被淘汰、過期）時
+由呼叫端回 Cosmos 讀取後 ``put``。只更新已載入的 session，不會以片段資料建立狀態。
+各 worker 各自一份：多 worker 且未做 session affinity 時會讀到舊狀態，因此 CosmosConfig 預設停用，
+只在有 session affinity（或單一 worker）時以 TECH_SESSION_STATE_SIZE 開啟。
+"""
+
+import copy
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class SessionState:
+    user_inputs: tuple = ()
+    user_info: Optional[dict] = None
+    bot_scope: Optional[str] = None
+    extract_output: Optional[dict] = None
+    last_hint: Optional[dict] = None
+
+    @classmethod
+    def from_history(cls, results: list, last_hint: Optional[dict]) -> "SessionState":
+        """由依 _ts 排序、已投影（見 cosmos_process.HISTORY_QUERY）的對話紀錄建立"""
+        if not results:
+            return cls(last_hint=last_hint)
+        last = results[-1]
+        return cls(
+            user_inputs=tuple(item.get("user_input") for item in results),
+            user_info=last.get("user_info"),
+            bot_scope=last.get("bot_scope"),
+            extract_output=last.get("extract_output"),
+            last_hint=last_hint,
+        )
+
+    def history(self, user_input: str):
+        """與 create_GPT_messages 相同格式：(messages, chat_count, user_info, last_bot_scope, last_extract_output)"""
+        messages = [*self.user_inputs, user_input]
+        if not self.user_inputs:
+            return messages, 0, None, None, None
+        return (
+            messages,
+            len(self.user_inputs),
+            copy.deepcopy(self.user_info),
+            self.bot_scope,
+            copy.deepcopy(self.extract_output),
+        )
+
+
+def hint_view(data: dict) -> dict:
+    """hint 文件中 get_latest_hint 會讀取的欄位"""
+    return {key: data.get(key) for key in ("userInput", "searchInfo", "intentHints", "hintType", "chatId")}
+
+
+class SessionStateStore:
+    """LRU + TTL（閒置的 session 不再寫入即會過期）的 session 狀態。"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 1800.0, window: int = 20):
+        self.cache = TTLCache(name="session_state", maxsize=maxsize, ttl=ttl)
+        self.window = window  # 與歷史查詢相同，只保留最近 window 輪
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        return self.cache.get(session_id) if session_id else None
+
+    def put(self, session_id: str, state: SessionState):
+        if session_id:
+            self.cache.set(session_id, state)
+
+    def discard(self, session_id: str):
+        self.cache.pop(session_id)
+
+    def record_turn(self, data: dict):
+        """insert_data 寫入的對話紀錄"""
+        state = self.cache.peek(data.get("session_id"))
+        if state is None:
+            return
+        self.cache.set(data["session_id"], replace(
+            state,
+            user_inputs=(*state.user_inputs, data.get("user_input"))[-self.window:],
+            user_info=data.get("user_info"),
+            bot_scope=(data.get("process_info") or {}).get("bot_scope"),
+            extract_output=(data.get("extract") or {}).get("output"),
+        ))
+
+    def record_hint(self, data: dict):
+        """insert_hint_data 寫入的 hint"""
+        state = self.cache.peek(data.get("sessionId"))
+        if state is not None:
+            self.cache.set(data["sessionId"], replace(state, last_hint=hint_view(data)))
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -0,0 +1,71 @@
+import asyncio
+
+
+class VectorSearchBatcher:
+    """把短時間窗內的多筆向量搜尋 query 合併成一次 list payload 的 POST，再依序拆回各呼叫端。
+
+    ``post_batch(payloads) -> response`` 負責實際送出；端點接受 ``[query, ...]``，
+    回應 ``{"status": 200, "result": [per-query result, ...]}``（與 query 同順序）。
+    每個呼叫端拿回的格式與單筆 POST 相同：``{"status": ..., "result": per-query result}``。
+    """
+
+    def __init__(self, post_batch, window: float = 0.003, max_batch: int = 16):
+        self.post_batch = post_batch
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []  # [(payload, future)]
+        self._timer = None
+        self._inflight = set()
+        self.calls = 0
+        self.requests = 0
+
+    async def search(self, payload: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch):
+        self.calls += 1
+        try:
+            response_json = await self.post_batch([payload for payload, _ in batch])
+            results = self._split(response_json, len(batch))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        status = response_json.get("status")
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result({"status": status, "result": result})
+
+    @staticmethod
+    def _split(response_json, size) -> list:
+        results = (response_json or {}).get("result")
+        if isinstance(results, dict) and size == 1:
+            results = [results]  # 單筆 list payload 可能直接回 dict
+        if not isinstance(results, list) or len(results) != size:
+            raise ValueError(f"expected {size} vector search results, got {results!r:.200}")
+        return results
+
+    async def close(self):
+        self._flush_now()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
@@ -0,0 +1,177 @@
+"""Bounded write-behind queue：request 只負責排入佇列，背景 worker 依 kind 批次寫入。
+
+- 佇列有上限：滿了時可丟棄的項目（audit）直接丟棄，其餘項目最多等待 ``put_timeout`` 秒（backpressure），
+  逾時才丟棄並記錄
+- 寫入失敗以指數退避重試 ``max_retries`` 次，仍失敗則丟棄並呼叫 ``on_drop``；
+  ``write_batch`` 拋出 ``PartialWriteError`` 時只重試其中失敗的項目
+- ``close`` 時先把佇列寫完（最多 ``drain_timeout`` 秒）再停止 worker
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+
+from utils.logger import logger
+from utils.metrics import REGISTRY
+
+write_queue_depth = REGISTRY.gauge(
+    "tech_agent_write_queue_depth",
+    "Items waiting in the write-behind queue.",
+    ("queue",),
+)
+write_latency_seconds = REGISTRY.histogram(
+    "tech_agent_write_latency_seconds",
+    "Time from enqueue until the item was written.",
+    ("queue", "kind"),
+)
+write_batches_total = REGISTRY.counter(
+    "tech_agent_write_batches_total",
+    "Batched writes by kind and result (succeeded / retried / failed).",
+    ("queue", "kind", "result"),
+)
+write_dropped_total = REGISTRY.counter(
+    "tech_agent_write_dropped_total",
+    "Items dropped by the write-behind queue (full / timeout / failed).",
+    ("queue", "kind", "reason"),
+)
+
+
+class PartialWriteError(Exception):
+    """批次中部分項目寫入成功：``failed`` 為需要重試的項目（同一個物件）。"""
+
+    def __init__(self, failed: list, cause: Exception = None):
+        super().__init__(f"{len(failed)} item(s) failed: {cause}")
+        self.failed = failed
+        self.cause = cause
+
+
+class WriteBehindQueue:
+    """``write_batch(kind, items)`` 為 async callable，同一批內的項目 kind 相同。"""
+
+    def __init__(
+        self,
+        name: str,
+        write_batch,
+        max_size: int = 2000,
+        batch_size: int = 50,
+        flush_interval: float = 0.05,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        put_timeout: float = 1.0,
+        on_drop=None,
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.put_timeout = put_timeout
+        self.on_drop = on_drop
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        self._closing = False
+
+    def __len__(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self):
+        # 第一次 put 時才建立（需在 event loop 內）；event loop 換了（測試中多次 asyncio.run）就重建
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._worker = None
+            self._loop = loop
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, kind: str, item, sheddable: bool = False) -> bool:
+        """排入佇列；回傳 False 代表已丟棄。"""
+        if self._closing:
+            self._drop(kind, [item], "closing")
+            return False
+        self._ensure_worker()
+        entry = (kind, item, time.perf_counter())
+        try:
+            if sheddable:
+                self._queue.put_nowait(entry)
+            else:
+                await asyncio.wait_for(self._queue.put(entry), self.put_timeout)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            self._drop(kind, [item], "full" if sheddable else "timeout")
+            return False
+        write_queue_depth.set(self._queue.qsize(), queue=self.name)
+        return True
+
+    def _drop(self, kind, items, reason):
+        write_dropped_total.inc(len(items), queue=self.name, kind=kind, reason=reason)
+        logger.warning(f"[WriteBehind] {self.name}: dropped {len(items)} {kind} item(s) ({reason})")
+        if self.on_drop is not None:
+            try:
+                self.on_drop(kind, items)
+            except Exception as e:  # 不可讓 worker 因此結束
+                logger.error(f"[WriteBehind] {self.name}: on_drop failed for {kind}: {e}")
+
+    async def _next_batch(self) -> list:
+        """等到第一筆後，再等 flush_interval 讓同一波寫入湊成一批（已滿一批則不等）"""
+        batch = [await self._queue.get()]
+        if self._queue.qsize() < self.batch_size - 1 and not self._closing:
+            await asyncio.sleep(self.flush_interval)
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                by_kind = defaultdict(list)
+                for kind, item, enqueued_at in batch:
+                    by_kind[kind].append((item, enqueued_at))
+                await asyncio.gather(*(self._write(kind, entries) for kind, entries in by_kind.items()))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                write_queue_depth.set(self._queue.qsize(), queue=self.name)
+
+    async def _write(self, kind, entries):
+        for attempt in range(self.max_retries + 1):
+            items = [item for item, _ in entries]
+            try:
+                await self.write_batch(kind, items)
+            except Exception as e:
+                if isinstance(e, PartialWriteError):
+                    failed = {id(item) for item in e.failed}
+                    self._observe_written(kind, [entry for entry in entries if id(entry[0]) not in failed])
+                    entries = [entry for entry in entries if id(entry[0]) in failed]
+                    items = [item for item, _ in entries]
+                if attempt == self.max_retries:
+                    write_batches_total.inc(queue=self.name, kind=kind, result="failed")
+                    logger.error(f"[WriteBehind] {self.name}: {kind} batch of {len(items)} failed: {e}")
+                    self._drop(kind, items, "failed")
+                    return
+                write_batches_total.inc(queue=self.name, kind=kind, result="retried")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+            else:
+                write_batches_total.inc(queue=self.name, kind=kind, result="succeeded")
+                self._observe_written(kind, entries)
+                return
+
+    def _observe_written(self, kind, entries):
+        now = time.perf_counter()
+        for _, enqueued_at in entries:
+            write_latency_seconds.observe(now - enqueued_at, queue=self.name, kind=kind)
+
+    async def close(self, drain_timeout: float = 10.0):
+        self._closing = True
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"[WriteBehind] {self.name}: {self._queue.qsize()} item(s) not written before shutdown")
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
@@ -1,5 +1,7 @@
 # src/api/admin_routes.py
 
+import asyncio
+
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from src.services.update_service import UpdateService
@@ -8,15 +10,17 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/update_technical_rag")
-async def update_technical_rag_endpoint(request: Request):
+async def update_technical_rag_endpoint(request: Request, incremental: bool = False):
     """
     更新技術 RAG 資料
-    從資料庫重新載入 sample_question 並更新 mappings
+    背景從資料庫重新載入 sample_question，驗證後發布新版本 mappings
+    立即回傳 job id，進度請查 /admin/reload_jobs/{job_id}
+    incremental=true 時只取上次水位（_ts）之後變動的文件
     """
     containers = request.app.state.container
     update_service = UpdateService(containers)
-    result = await update_service.update_technical_rag()
-    return JSONResponse(content=result)
+    job = update_service.submit_reload(["technical_rag"], incremental=incremental)
+    return JSONResponse(content=job, status_code=202)
 
 
 @router.get("/update_botname")
@@ -31,15 +35,53 @@ def update_website_botname_endpoint(request: Request):
     return JSONResponse(content=result)
 
 
+@router.get("/update_intent_kw")
+async def update_intent_kw_endpoint(request: Request):
+    """
+    更新高頻詞意圖字典
+    從 intent_kw 重新載入並重建 keyword 比對自動機
+    """
+    containers = request.app.state.container
+    result = await asyncio.to_thread(containers.sd.refresh_intent_dict)
+    return JSONResponse(content=result)
+
+
 @router.get("/update_KB")
-def update_KB_endpoint(request: Request):
+async def update_KB_endpoint(request: Request, incremental: bool = False):
     """
     更新知識庫資料
-    從資料庫重新載入 ApChatbotKnowledge
+    背景從資料庫重新載入 ApChatbotKnowledge，驗證後發布新版本 mappings
+    立即回傳 job id，進度請查 /admin/reload_jobs/{job_id}
+    incremental=true 時只取上次水位（_ts）之後變動的文件
     """
     containers = request.app.state.container
     update_service = UpdateService(containers)
-    result = update_service.update_KB()
+    job = update_service.submit_reload(["KB"], incremental=incremental)
+    return JSONResponse(content=job, status_code=202)
+
+
+@router.get("/reload_jobs/{job_id}")
+def reload_job_status_endpoint(request: Request, job_id: str):
+    """
+    查詢 mapping 重新載入 job 狀態（pending / running / succeeded / failed）
+    job 狀態只存在受理該請求的 worker
+    """
+    job = request.app.state.container.reload_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(content={"message": f"job {job_id} not found"}, status_code=404)
+    return JSONResponse(content=job)
+
+
+@router.get("/mappings")
+def mappings_version_endpoint(request: Request):
+    """
+    查看本 worker 目前生效的 mapping 版本與各表筆數
+    """
+    mappings = request.app.state.container.mappings
+    result = {
+        "version": mappings.version,
+        "sizes": {name: len(table) for name, table in mappings.as_dict().items()},
+    }
     return JSONResponse(content=result)
 
 
@@ -53,3 +95,32 @@ def update_specific_KB_endpoint(request: Request):
     update_service = UpdateService(containers)
     result = update_service.update_specific_KB()
     return JSONResponse(content=result)
+
+
+@router.get("/cache_stats")
+def cache_stats_endpoint(request: Request):
+    """
+    查看 in-process 快取命中率
+    各 worker 各自統計，Prometheus 格式請見 /metrics
+    """
+    containers = request.app.state.container
+    result = {
+        "translation": containers.translation_cache.stats(),
+        "vector_search": containers.redis_config.cache_stats(),
+        "session_state": containers.cosmos_settings.session_state.stats(),
+    }
+    return JSONResponse(content=result)
+
+
+@router.get("/invalidate_vector_cache")
+def invalidate_vector_cache_endpoint(request: Request, index_version: str = None):
+    """
+    清除向量搜尋結果快取
+    向量索引重建後帶入新的 index_version；未帶則只清空本 worker 的快取
+    """
+    redis_config = request.app.state.container.redis_config
+    if index_version is None:
+        redis_config.invalidate_cache()
+    else:
+        redis_config.index_version = index_version
+    return JSONResponse(content={"index_version": redis_config.index_version})
@@ -5,36 +5,35 @@ Created on Mon Jan 22 17:40:36 2024
 @author: Billy_Hsu
 """
 # flake8: noqa: E501
-import base64
 import time
 import asyncio
-from openai import AsyncAzureOpenAI
 import json
 import re
-from google import genai
 from google.genai.types import Content, Part, GenerateContentConfig
-from google.oauth2 import service_account
 from pydantic import BaseModel
+from src.integrations.llm_clients import LLMClientRegistry
+from utils.streaming import coalesce_text
 
 class response_struct(BaseModel):
     kb_no: str
     answer: str
 
 class BaseService:
-    def __init__(self, config=None):
+    def __init__(self, config=None, clients=None):
         # Use provided config or fallback to environment variables
         if config is None:
             config = config
 
         self.config = config
 
-        self.model_gpt41_mini = config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_MODEL")
-        self.openai_client_gpt41_mini = AsyncAzureOpenAI(
-            azure_endpoint=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_AZURE_ENDPOINT"),
-            api_key=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_API_KEY"),
-            api_version=config.get("TECH_OPENAI_GPT41MINI_PAYGO_EU_API_VERSION"),
-            timeout=30,
-        )
+        # 共用 client：由 DependencyContainer 的 LLMClientRegistry 注入；
+        # 沒傳入時才自行建立（單獨使用 / 舊呼叫方式）
+        if clients is None:
+            clients = LLMClientRegistry(config)
+        self.clients = clients
+
+        self.model_gpt41_mini = clients.gpt41_mini_model
+        self.openai_client_gpt41_mini = clients.openai_client
       
         self.system_messages = [
             {
@@ -56,20 +55,20 @@ You Must follow::
             }
         ]
 
-        # GCP Gemini (Vertex AI)
-        # CREDS_PATH = config_path("TECH_GEMINI_CREDENTIALS_JSON")
-        # self.gemini_credentials = service_account.Credentials.from_service_account_file(
-        #     CREDS_PATH,
-        #     scopes=["https://www.googleapis.com/auth/cloud-platform"],
-        # )
-        SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
-        info = json.loads(base64.b64decode(self.config.get("TECH_GEMINI_CREDENTIALS")))
-        self.gemini_credentials = service_account.Credentials.from_service_account_info(info).with_scopes(SCOPES)
-
-        # 建立 GenAI client
-        self.client = genai.Client(vertexai=True, project=self.gemini_credentials.project_id, location=config.get("TECH_GEMINI_LOCATION"), credentials=self.gemini_credentials)
-        self.model_name = config.get("TECH_GEMINI_MODEL_NAME")
-    
+        # GCP Gemini (Vertex AI)，憑證與 client 見 LLMClientRegistry
+        self.gemini_credentials = clients.gemini_credentials
+        self.client = clients.gemini_client
+        self.model_name = clients.gemini_model_name
+        self.gemini_limiter = clients.gemini_limiter
+
+    async def _gemini_generate_content(self, contents, config):
+        """走 client.aio 的非同步呼叫，並受 worker 層級的併發上限控制，不阻塞 event loop。"""
+        async with self.gemini_limiter:
+            return await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=config,
+            )
 
     # 現在用這個gemini
     async def reply_gemini(self, user_input: str, max_retries: int = 3, retry_delay: float = 2.0):
@@ -79,8 +78,7 @@ You Must follow::
         for attempt in range(1, max_retries + 1):
             try:
                 start_time = time.time()
-                response = self.client.models.generate_content(
-                    model=self.model_name,
+                response = await self._gemini_generate_content(
                     contents=[Content(role="user", parts=[Part(text=user_input)])],
                     config={
                         "response_mime_type": "application/json",
@@ -123,8 +121,7 @@ You Must follow::
         for attempt in range(1, max_retries + 1):
             try:
                 start_time = time.time()
-                response = self.client.models.generate_content(
-                    model=self.model_name,
+                response = await self._gemini_generate_content(
                     contents=[
                         Content(role="user", parts=[Part(text=user_input)])
                     ],
@@ -168,48 +165,59 @@ You Must follow::
                     }
                 await asyncio.sleep(retry_delay)
 
+    async def _gemini_text_chunks(self, user_input: str, system_instruction: str):
+        """逐一取出 Gemini streaming 回覆的文字（client.aio，不阻塞 event loop）"""
+        async with self.gemini_limiter:
+            response = await self.client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=[Content(role="user", parts=[Part(text=user_input)])],
+                config=GenerateContentConfig(
+                    system_instruction=system_instruction,
+                ),
+            )
+            async for chunk in response:
+                text = None
+
+                # 嘗試多種方式取得 text
+                if hasattr(chunk, 'text') and chunk.text:
+                    text = chunk.text
+                elif hasattr(chunk, 'candidates') and chunk.candidates:
+                    try:
+                        text = chunk.candidates[0].content.parts[0].text
+                    except (IndexError, AttributeError):
+                        pass
+
+                if text:
+                    yield text
+
     async def reply_gemini_text_stream(
         self, user_input: str, system_instruction: str,
         max_retries: int = 3, retry_delay: float = 2.0,
-        char_by_char: bool = True  # 新增參數：是否逐字輸出
+        char_by_char: bool = False,  # 舊行為：逐字輸出
+        flush_chars: int = 40,
+        flush_interval: float = 0.03,
     ):
-        """Streaming version for text generation (not structured JSON)"""
+        """Streaming version for text generation (not structured JSON).
+
+        預設將 chunk 依 ``flush_chars`` 字元或 ``flush_interval`` 秒合併後輸出，
+        減少下游事件數與物件配置。
+        """
+        def _split(text):
+            return list(text) if char_by_char else [text]
+
         for attempt in range(1, max_retries + 1):
             try:
-                # Gemini SDK 的 generate_content_stream 是同步的 iterator
-                response = self.client.models.generate_content_stream(
-                    model=self.model_name,
-                    contents=[Content(role="user", parts=[Part(text=user_input)])],
-                    config=GenerateContentConfig(
-                        system_instruction=system_instruction,
-                    ),
-                )
-
-                # 使用同步的 for loop，但包在 async function 中
                 chunk_count = 0
-                for chunk in response:
+                chunks = self._gemini_text_chunks(user_input, system_instruction)
+                if not char_by_char:
+                    chunks = coalesce_text(chunks, max_chars=flush_chars, max_wait=flush_interval)
+
+                async for text in chunks:
                     chunk_count += 1
-                    text = None
-                    
-                    # 嘗試多種方式取得 text
-                    if hasattr(chunk, 'text') and chunk.text:
-                        text = chunk.text
-                    elif hasattr(chunk, 'candidates') and chunk.candidates:
-                        try:
-                            text = chunk.candidates[0].content.parts[0].text
-                        except (IndexError, AttributeError):
-                            pass
-                    
-                    if text:
-                        if char_by_char:
-                            # 逐字 yield
-                            for char in text:
-                                yield char
-                        else:
-                            # 直接 yield chunk
-                            yield text
-
-                print(f"[Gemini Stream] 成功完成，共收到 {chunk_count} 個 chunks")
+                    for piece in _split(text):
+                        yield piece
+
+                print(f"[Gemini Stream] 成功完成，共輸出 {chunk_count} 個 chunks")
                 return  # Success, exit retry loop
 
             except Exception as e:
@@ -223,19 +231,11 @@ You Must follow::
                     try:
                         fallback = await self.reply_gemini_text(user_input, system_instruction, max_retries=1)
                         response_text = fallback.get('response', '⚠️ Gemini 無法回應，請稍後再試。')
-                        if char_by_char:
-                            for char in response_text:
-                                yield char
-                        else:
-                            yield response_text
                     except Exception as fallback_error:
                         print(f"[Gemini Text Stream] 降級也失敗：{fallback_error}")
-                        error_msg = "⚠️ Gemini 無法回應，請稍後再試。"
-                        if char_by_char:
-                            for char in error_msg:
-                                yield char
-                        else:
-                            yield error_msg
+                        response_text = "⚠️ Gemini 無法回應，請稍後再試。"
+                    for piece in _split(response_text):
+                        yield piece
                     return
                 await asyncio.sleep(retry_delay)
 
@@ -247,8 +247,7 @@ You Must follow::
         for attempt in range(1, max_retries + 1):
             try:
                 start_time = time.time()
-                response = self.client.models.generate_content(
-                    model=self.model_name,
+                response = await self._gemini_generate_content(
                     contents=[Content(role="user", parts=[Part(text=user_input)])],
                     config=GenerateContentConfig(
                         system_instruction=system_instruction,
@@ -13,8 +13,8 @@ import json
 
 class ContentPolicyCheck(BaseService):  # BaseService
 
-    def __init__(self,config):
-        super().__init__(config)
+    def __init__(self,config, clients=None):
+        super().__init__(config, clients)
 
     @async_timer.timeit
     async def check_content_policy(self, user_input):
@@ -0,0 +1,77 @@
+# src/services/reload_jobs.py
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from utils.logger import logger
+from utils.metrics import REGISTRY
+
+mapping_reload_total = REGISTRY.counter(
+    "tech_agent_mapping_reload_total",
+    "Background mapping reload jobs by kind and result (succeeded / failed).",
+    ("kind", "result"),
+)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ReloadJobs:
+    """背景重新載入工作：admin endpoint 送出後立即回傳 job id，工作依序在背景執行（同時只跑一個）。
+
+    ``run`` 為 coroutine function，回傳的 dict 會併入 job 狀態（例如 version）。
+    只保留最近 ``max_history`` 筆 job 狀態。
+    """
+
+    def __init__(self, max_history: int = 50):
+        self.max_history = max_history
+        self.jobs = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    def submit(self, kind: str, run) -> dict:
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "status": "pending",
+            "submitted_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        self.jobs[job["job_id"]] = job
+        while len(self.jobs) > self.max_history:
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job, run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(job)
+
+    async def _run(self, job, run):
+        async with self._lock:
+            job.update(status="running", started_at=_now())
+            try:
+                result = await run()
+            except Exception as e:
+                logger.error(f"[Reload] job {job['job_id']} ({job['kind']}) failed: {e}", exc_info=True)
+                job.update(status="failed", error=str(e))
+            else:
+                job.update(result or {})
+                job["status"] = "succeeded"
+            finally:
+                job["finished_at"] = _now()
+                mapping_reload_total.inc(kind=job["kind"], result=job["status"])
+
+    def get(self, job_id: str):
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -8,8 +8,8 @@ from utils.warper import async_timer
 
 class SentenceGroupClassification(BaseService):  # BaseService
 
-    def __init__(self, config):
-        super().__init__(config)
+    def __init__(self, config, clients=None):
+        super().__init__(config, clients)
 
     @async_timer.timeit
     async def sentence_group_classification(self, his_inputs):
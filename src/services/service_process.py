@@ -5,19 +5,22 @@ import logging
 import time
 from pathlib import Path
 from src.core.technical_support_async import *
+from src.core.lookup_tables import load_lookup
 
-# 使用絕對路徑，基於專案根目錄
-_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-_DATA_PATH = _PROJECT_ROOT / "data" / "ts_rag_open_remarks_mappings.xlsx"
-
-ts_rag_open_remarks_mappings = pd.read_excel(str(_DATA_PATH))
-ts_rag_open_remarks_mappings = ts_rag_open_remarks_mappings.set_index("lang")["opening_remarks"].to_dict()
+# 預編譯的 JSON（data/compiled），import 時不經過 pandas / openpyxl
+ts_rag_open_remarks_mappings = load_lookup("ts_rag_open_remarks_mappings")
 
 class ServiceProcess:
 
-    def __init__(self, system_code, container):
-        self.ts_rag = TSRAG(config=container.cfg)
-        self.ts_pl = TSProductLine(config=container.cfg, productline_name_map=container.productline_name_map)
+    def __init__(self, system_code, container, mappings=None):
+        # 共用 container 內的 LLM clients，不在每個 request 重建
+        self.mappings = mappings or container.mappings
+        self.ts_rag = TSRAG(config=container.cfg, clients=container.llm_clients)
+        self.ts_pl = TSProductLine(
+            config=container.cfg,
+            productline_name_map=self.mappings.productline_name_map,
+            clients=container.llm_clients,
+        )
         self.redis_config = container.redis_config
         self.system_code = system_code
         self.container = container
@@ -49,15 +52,15 @@ class ServiceProcess:
                 if i == 0 and kb == top1_hint_search_result["faq"]:
                     key = str(top1_hint_search_result["hints_id"]) + "_" + site
                     index_suffix = (
-                        "2" if self.container.rag_hint_id_index_mapping.get(key)["index"] == 1 else "1"
+                        "2" if self.mappings.rag_hint_id_index_mapping.get(key)["index"] == 1 else "1"
                     )
                 else:
                     index_suffix = "1"
 
                 # 若對應不到hint則跳過
                 rag_key = f"{kb}_{site}_{index_suffix}"
-                if rag_key in self.container.rag_mappings:
-                    relative_questions.append(self.container.rag_mappings.get(rag_key).copy())
+                if rag_key in self.mappings.rag_mappings:
+                    relative_questions.append(self.mappings.rag_mappings.get(rag_key).copy())
 
             """ deal with the link between diffenet site"""
             for i in range(len(relative_questions)):
@@ -72,9 +75,9 @@ class ServiceProcess:
         ''' Open Remarks By Language '''
         open_remarks = ts_rag_open_remarks_mappings.get(lang)
         """ top 1 kb content, summary """
-        content = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("content")
-        summary = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("summary")
-        title = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("title")
+        content = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("content")
+        summary = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("summary")
+        title = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("title")
         ASUS_link = f"https://www.asus.com/{site}/support/FAQ/{top1_kb}"
         ROG_link = f"https://rog.asus.com/{site}/support/FAQ/{top1_kb}"
 
@@ -133,15 +136,15 @@ class ServiceProcess:
                 if i == 0 and kb == top1_hint_search_result["faq"]:
                     key = str(top1_hint_search_result["hints_id"]) + "_" + site
                     index_suffix = (
-                        "2" if self.container.rag_hint_id_index_mapping.get(key)["index"] == 1 else "1"
+                        "2" if self.mappings.rag_hint_id_index_mapping.get(key)["index"] == 1 else "1"
                     )
                 else:
                     index_suffix = "1"
 
                 # 若對應不到hint則跳過
                 rag_key = f"{kb}_{site}_{index_suffix}"
-                if rag_key in self.container.rag_mappings:
-                    relative_questions.append(self.container.rag_mappings.get(rag_key).copy())
+                if rag_key in self.mappings.rag_mappings:
+                    relative_questions.append(self.mappings.rag_mappings.get(rag_key).copy())
 
             """ deal with the link between diffenet site"""
             for i in range(len(relative_questions)):
@@ -156,15 +159,15 @@ class ServiceProcess:
         ''' Open Remarks By Language '''
         open_remarks = ts_rag_open_remarks_mappings.get(lang)
         """ top 1 kb content, summary """
-        content = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("content")
-        summary = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("summary")
-        title = self.container.KB_mappings.get(str(top1_kb) + "_" + lang).get("title")
+        content = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("content")
+        summary = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("summary")
+        title = self.mappings.KB_mappings.get(str(top1_kb) + "_" + lang).get("title")
         ASUS_link = f"https://www.asus.com/{site}/support/FAQ/{top1_kb}"
         ROG_link = f"https://rog.asus.com/{site}/support/FAQ/{top1_kb}"
 
-        last_content = self.container.KB_mappings.get(str(last_kb) + "_" + lang).get("content")
-        last_summary = self.container.KB_mappings.get(str(last_kb) + "_" + lang).get("summary")
-        last_title = self.container.KB_mappings.get(str(last_kb) + "_" + lang).get("title")
+        last_content = self.mappings.KB_mappings.get(str(last_kb) + "_" + lang).get("content")
+        last_summary = self.mappings.KB_mappings.get(str(last_kb) + "_" + lang).get("summary")
+        last_title = self.mappings.KB_mappings.get(str(last_kb) + "_" + lang).get("title")
 
         tecnical_response, response_info = await self.ts_rag.follow_up_rag(
             top1_kb=top1_kb,
@@ -285,6 +288,8 @@ class ServiceProcess:
             productLine="notebook",
             top_n=10
         )
+        import pandas as pd  # 僅此測試流程使用，不放在 import 路徑上
+
         df_top_kb = pd.DataFrame(top_kb_raw)
         df_top_kb = df_top_kb[pd.to_numeric(df_top_kb['cosineSimilarity'], errors='coerce') >= 0.6].reset_index(drop=True)
         top_kb = df_top_kb[['faq', 'cosineSimilarity']].to_dict(orient="records")
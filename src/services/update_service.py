@@ -1,6 +1,77 @@
 # src/services/update_service.py
 
+import asyncio
+import dataclasses
+import json
+import os
 import pickle
+from pathlib import Path
+
+from src.core.config_loader import getenv
+from src.integrations import mapping_snapshot
+from src.integrations.kb_store import KBStore
+from src.integrations.mapping_snapshot import MappingTables
+
+KB_STORE_PATH = getenv("TECH_KB_STORE_PATH", "config/kb_store.bin")
+KB_PICKLE_PATH = "config/kb_mappings.pkl"
+RAG_MAPPINGS_PATH = "config/rag_mappings.pkl"
+RAG_INDEX_PATH = "config/rag_hint_id_index_mapping.pkl"
+MAPPING_SNAPSHOT_PATH = getenv("TECH_MAPPING_SNAPSHOT_PATH", "config/mapping_snapshot.bin")
+# 增量更新的 _ts 水位（各來源 container 已套用到的最大 _ts）
+WATERMARK_PATH = getenv("TECH_MAPPING_WATERMARK_PATH", "config/mapping_watermarks.json")
+SOURCE_CONTAINERS = {"technical_rag": "sample_question", "KB": "ApChatbotKnowledge"}
+# 重新載入時，新表筆數低於舊表的 (1 - 此比例) 視為查詢不完整，不發布
+RELOAD_MAX_SHRINK = float(getenv("TECH_MAPPING_RELOAD_MAX_SHRINK", "0.5"))
+
+REQUIRED_FIELDS = {
+    "KB_mappings": ("title", "summary", "content"),
+    "rag_mappings": ("question", "rag_response", "title", "ASUS_link", "ROG_link"),
+    "rag_hint_id_index_mapping": ("index", "rag"),
+}
+
+
+def dump_pickle_atomic(path, obj):
+    mapping_snapshot.write_atomic(Path(path), pickle.dumps(obj))
+
+
+def load_watermarks() -> dict:
+    try:
+        with open(WATERMARK_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_watermarks(watermarks: dict):
+    mapping_snapshot.write_atomic(Path(WATERMARK_PATH), json.dumps(watermarks, indent=2).encode("utf-8"))
+
+
+def snapshot_sources() -> list:
+    kb_source = KB_STORE_PATH if os.path.exists(KB_STORE_PATH) else KB_PICKLE_PATH
+    return [RAG_MAPPINGS_PATH, RAG_INDEX_PATH, kb_source]
+
+
+def validate_tables(new_tables: dict, current: MappingTables, max_shrink: float = RELOAD_MAX_SHRINK, changes=None):
+    """發布前檢查：不可為空、筆數不可驟減、每筆需有必要欄位。不通過拋 ValueError。
+
+    ``changes``（name -> 增量合併進來的項目）有值時只逐筆檢查這些項目，其餘沿用已驗證過的目前版本。"""
+    changes = changes or {}
+    for name, table in new_tables.items():
+        if not len(table):
+            raise ValueError(f"{name} is empty")
+        previous = len(getattr(current, name))
+        if previous and len(table) < previous * (1 - max_shrink):
+            raise ValueError(f"{name} shrank from {previous} to {len(table)} entries")
+        fields = REQUIRED_FIELDS.get(name, ())
+        for key, value in changes.get(name, table).items():
+            missing = [f for f in fields if f not in value]
+            if missing:
+                raise ValueError(f"{name}[{key!r}] missing fields {missing}")
+
+
+def changed_entries(table: dict, current) -> dict:
+    """增量合併用：只留下與目前版本不同的項目（邊界秒重複讀到的文件不會觸發重新發布）"""
+    return {key: value for key, value in table.items() if current.get(key) != value}
 
 
 class UpdateService:
@@ -8,13 +79,22 @@ class UpdateService:
     
     def __init__(self, containers):
         self.containers = containers
-        
-    async def update_technical_rag(self):
-        """更新技術 RAG 資料"""
-        container_name = "sample_question"
-        container = self.containers.lookup_db.get_container_client(container_name)
-        query = "SELECT * FROM c"
-        results = container.query_items(query, enable_cross_partition_query=True)
+
+    def query_source(self, kind, since=None) -> list:
+        """讀取來源 container；``since`` 有值時只取 ``_ts >= since`` 的文件（含邊界秒，重複套用無害）"""
+        container = self.containers.lookup_db.get_container_client(SOURCE_CONTAINERS[kind])
+        if since is None:
+            query = "SELECT * FROM c"
+            return list(container.query_items(query, enable_cross_partition_query=True))
+        query = "SELECT * FROM c WHERE c._ts >= @since"
+        return list(container.query_items(
+            query, parameters=[{"name": "@since", "value": since}], enable_cross_partition_query=True
+        ))
+
+    def fetch_technical_rag(self, results=None):
+        """從 sample_question 讀出 (rag_mappings, rag_hint_id_index_mapping)"""
+        if results is None:
+            results = self.query_source("technical_rag")
 
         new_rag_mappings, new_rag_hint_id_index_mapping = {}, {}
         ASUS_link = "https://www.asus.com/{}/support/FAQ/{}"
@@ -36,14 +116,20 @@ class UpdateService:
                 "rag": item.get("rag")
             }
 
-        self.containers.rag_mappings = new_rag_mappings
-        self.containers.rag_hint_id_index_mapping = new_rag_hint_id_index_mapping
+        return new_rag_mappings, new_rag_hint_id_index_mapping
 
-        # 儲存到檔案
-        with open("config/rag_hint_id_index_mapping.pkl", "wb") as file:
-            pickle.dump(self.containers.rag_hint_id_index_mapping, file)
-        with open("config/rag_mappings.pkl", "wb") as file:
-            pickle.dump(self.containers.rag_mappings, file)
+    async def update_technical_rag(self):
+        """更新技術 RAG 資料（啟動時 pickle 讀取失敗的備援；線上更新請走 reload job）"""
+        new_rag_mappings, new_rag_hint_id_index_mapping = await asyncio.to_thread(self.fetch_technical_rag)
+        self.containers.mappings = dataclasses.replace(
+            self.containers.mappings,
+            rag_mappings=new_rag_mappings,
+            rag_hint_id_index_mapping=new_rag_hint_id_index_mapping,
+        )
+
+        # 儲存到檔案（寫暫存檔再 rename，避免中途失敗留下截斷的 pickle）
+        dump_pickle_atomic(RAG_INDEX_PATH, new_rag_hint_id_index_mapping)
+        dump_pickle_atomic(RAG_MAPPINGS_PATH, new_rag_mappings)
 
         return {"message": "rag_mappings update success"}
 
@@ -66,19 +152,18 @@ class UpdateService:
         #     new_productline_name_map[item.get("websiteCode")][item.get("productLine")] = item.get("productLine_name")
 
         # self.containers.PL_mappings = new_PL_mappings
-        self.containers.PL_mappings = {'ar': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'au': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc'}, 'bd': {'notebook', 'phone', 'pad', 'nuc'}, 'be-fr': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory'}, 'be-nl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'nuc', 'lcd', 'motherboard'}, 'br': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'chromebook', 'lcd', 'nuc', 'motherboard'}, 'ca-en': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'ca-fr': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'ch-de': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'desktop', 'motherboard'}, 'ch-en': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'desktop', 'motherboard'}, 'ch-fr': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'motherboard'}, 'cl': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'co': {'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'motherboard'}, 'co ': {'chromebook', 'aio'}, 'cz': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'motherboard'}, 'de': {'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'accessory', 'desktop', 'motherboard'}, 'dk': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'eg': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'es': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'desktop', 'motherboard'}, 'fi': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'fr': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'motherboard'}, 'global': {'graphics', 'aio_chrome', 'wearable', 'notebook', 'gaming_nb', 'phone', 'gaming_handhelds', 'wireless', 'nuc', 'lcd', 'pad', 'desktop', 'motherboard'}, 'hk': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc'}, 'hu': {'graphics', 'notebook', 'phone', 'wireless', 'nuc', 'pad', 'accessory', 'motherboard'}, 'id': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'desktop', 'motherboard'}, 'il': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'proart_nb', 'motherboard'}, 'in': {'notebook', 'gaming_nb', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'it': {'aio', 'graphics', 'notebook', 'mini_pc', 'gaming_handhelds', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'motherboard'}, 'jp': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'desktop'}, 'kh': {'notebook', 'phone', 'nuc', 'desktop', 'motherboard'}, 'kr': {'notebook', 'gaming_handhelds', 'chromebook', 'nuc', 'pad'}, 'latin': {'notebook', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'lk': {'graphics', 'notebook', 'chromebook', 'lcd', 'motherboard'}, 'me-ar': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'me-en': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'mx': {'notebook', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'my': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc'}, 'nl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'motherboard'}, 'no': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'nz': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc'}, 'pe': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'ph': {'graphics', 'notebook', 'phone', 'chromebook', 'nuc', 'desktop', 'motherboard'}, 'pl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'motherboard'}, 'pt': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'desktop', 'motherboard'}, 'ro': {'aio_chrome', 'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'sa-en': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'se': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'sg': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc'}, 'sk': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'motherboard'}, 'th': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'motherboard'}, 'tr': {'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'accessory', 'desktop', 'motherboard'}, 'tw': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'zenbo', 'pad', 'desktop', 'motherboard'}, 'ua-ua': {'aio', 'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'proart', 'accessory', 'desktop_lcd', 'motherboard'}, 'uk': {'aio_chrome', 'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'accessory', 'desktop_lcd', 'motherboard'}, 'us': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'vn': {'graphics', 'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'desktop', 'motherboard'}, 'za': {'aio_chrome', 'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}}
+        new_PL_mappings = {'ar': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'au': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc'}, 'bd': {'notebook', 'phone', 'pad', 'nuc'}, 'be-fr': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory'}, 'be-nl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'nuc', 'lcd', 'motherboard'}, 'br': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'chromebook', 'lcd', 'nuc', 'motherboard'}, 'ca-en': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'ca-fr': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'ch-de': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'desktop', 'motherboard'}, 'ch-en': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'desktop', 'motherboard'}, 'ch-fr': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'motherboard'}, 'cl': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'co': {'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'motherboard'}, 'co ': {'chromebook', 'aio'}, 'cz': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'motherboard'}, 'de': {'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'accessory', 'desktop', 'motherboard'}, 'dk': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'eg': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'es': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'desktop', 'motherboard'}, 'fi': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'fr': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'motherboard'}, 'global': {'graphics', 'aio_chrome', 'wearable', 'notebook', 'gaming_nb', 'phone', 'gaming_handhelds', 'wireless', 'nuc', 'lcd', 'pad', 'desktop', 'motherboard'}, 'hk': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc'}, 'hu': {'graphics', 'notebook', 'phone', 'wireless', 'nuc', 'pad', 'accessory', 'motherboard'}, 'id': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'desktop', 'motherboard'}, 'il': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'proart_nb', 'motherboard'}, 'in': {'notebook', 'gaming_nb', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'it': {'aio', 'graphics', 'notebook', 'mini_pc', 'gaming_handhelds', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'motherboard'}, 'jp': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'desktop'}, 'kh': {'notebook', 'phone', 'nuc', 'desktop', 'motherboard'}, 'kr': {'notebook', 'gaming_handhelds', 'chromebook', 'nuc', 'pad'}, 'latin': {'notebook', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'lk': {'graphics', 'notebook', 'chromebook', 'lcd', 'motherboard'}, 'me-ar': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'me-en': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'mx': {'notebook', 'phone', 'chromebook', 'nuc', 'proart', 'motherboard'}, 'my': {'notebook', 'phone', 'wireless', 'chromebook', 'nuc'}, 'nl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'motherboard'}, 'no': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'nz': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc'}, 'pe': {'notebook', 'phone', 'chromebook', 'proart', 'motherboard'}, 'ph': {'graphics', 'notebook', 'phone', 'chromebook', 'nuc', 'desktop', 'motherboard'}, 'pl': {'graphics', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'accessory', 'desktop', 'motherboard'}, 'pt': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'proart', 'pad', 'accessory', 'desktop', 'motherboard'}, 'ro': {'aio_chrome', 'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'sa-en': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}, 'se': {'graphics', 'notebook', 'desktoo_lcd', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'accessory', 'motherboard'}, 'sg': {'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc'}, 'sk': {'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'lcd', 'nuc', 'pad', 'motherboard'}, 'th': {'notebook', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'motherboard'}, 'tr': {'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'accessory', 'desktop', 'motherboard'}, 'tw': {'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'lcd', 'nuc', 'zenbo', 'pad', 'desktop', 'motherboard'}, 'ua-ua': {'aio', 'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'proart', 'accessory', 'desktop_lcd', 'motherboard'}, 'uk': {'aio_chrome', 'graphics', 'wearable', 'notebook', 'phone', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'accessory', 'desktop_lcd', 'motherboard'}, 'us': {'graphics', 'notebook', 'proart_lcd', 'gaming_handhelds', 'wireless', 'chromebook', 'nuc', 'pad', 'desktop', 'proart_nb', 'motherboard'}, 'vn': {'graphics', 'notebook', 'phone', 'wireless', 'nuc', 'lcd', 'desktop', 'motherboard'}, 'za': {'aio_chrome', 'graphics', 'notebook', 'phone', 'wireless', 'chromebook', 'nuc', 'pad', 'accessory', 'desktop_lcd', 'motherboard'}}
         # self.containers.productline_name_map = new_productline_name_map
-        self.containers.productline_name_map = {'ar': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'au': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'lcd': 'Display', 'notebook': 'Notebook', 'nuc': 'NUC', 'wireless': 'Networking'}, 'bd': {'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone'}, 'be-fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'be-nl': {'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Grafische kaart ', 'lcd': 'LCD', 'motherboard': 'Moederbord', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone'}, 'br': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Video card', 'lcd': 'LCD', 'motherboard': 'Main Board ', 'notebook': 'Laptop', 'nuc': 'NUC', 'phone': 'ZenPhone'}, 'ca-en': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'ca-fr': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'ch-de': {'chromebook': 'Chromebook', 'desktop': 'DT', 'gaming_handhelds': 'Gaming Handhelds', 'lcd': 'LCD Monitore', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Smartphones', 'wearable': 'Smartwatch', 'wireless': 'Netzwerkprodukte'}, 'ch-en': {'chromebook': 'Chromebook', 'desktop': 'DT', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone', 'wireless': 'Wireless/Router'}, 'ch-fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'cl': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'co': {'lcd': 'Monitores', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'wireless': 'Routers'}, 'co ': {'aio': 'AIO/Desktop', 'chromebook': 'Chromebook'}, 'cz': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'graphics': 'VGA', 'lcd': 'LCD a PC komponenty', 'motherboard': 'Motherboard', 'notebook': 'Notebooky', 'nuc': 'NUC ', 'pad': 'Tablety', 'phone': 'PadFone/ZenFone', 'proart': 'ProArt', 'wireless': 'Wireless'}, 'de': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'lcd': 'LCD Monitore', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Smartphones', 'wearable': 'Smartwatch', 'wireless': 'Netzwerkprodukte'}, 'dk': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless'}, 'eg': {'accessory': 'Accessory', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'es': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT/AIO/EB', 'gaming_handhelds': 'Consola de videojuegos', 'lcd': 'LCD', 'motherboard': 'MB/VGA', 'notebook': 'Portátil', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone', 'proart': 'ProArt Series', 'wireless': 'WLAN'}, 'fi': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'global': {'aio_chrome': 'AIO/Chromebox', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'gaming_nb': 'Gaming Notebook', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'lcd': 'Display', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Pad', 'phone': 'Phone', 'wearable': 'Wearable', 'wireless': 'Networking'}, 'hk': {'chromebook': 'Chromebook', 'notebook': '筆記型電腦', 'nuc': 'NUC 電腦', 'phone': 'Zenfone 和 ROG Phone', 'wireless': 'Wireless'}, 'hu': {'accessory': 'Accessory', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Mobile', 'wireless': 'Wireless'}, 'id': {'chromebook': 'Chromebook', 'desktop': 'DESKTOP/All in One PC', 'gaming_handhelds': 'Gaming handhelds', 'graphics': 'VGA', 'lcd': 'LCD Monitor', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'Smart Phone', 'proart': 'ProArt Series', 'wireless': 'Wireless'}, 'il': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'AIO/DT', 'graphics': 'Graphic Card', 'lcd': 'LCD', 'motherboard': 'Motherboard', 'notebook': 'NB', 'nuc': 'NUC ', 'phone': 'Phone', 'wireless': 'Wireless', 'proart_nb': 'NB ProArt'}, 'in': {'chromebook': 'Chromebook', 'gaming_nb': 'Gaming Notebook', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Phone', 'proart': 'ProArt Series'}, 'it': {'accessory': 'Accessory', 'aio': 'ALL IN ONE - MINI PC', 'chromebook': 'Chromebook', 'desktop': 'DESKTOP', 'gaming_handhelds': 'GAMING HANDHELDS - ROG ALLY', 'graphics': 'VGA', 'lcd': 'LCD - PROJECTORS', 'mini_pc': 'COMPONENTS - VIVOPC', 'motherboard': 'Motherboard', 'notebook': 'NOTEBOOK', 'nuc': 'NUC ', 'phone': 'TABLET - SMARTPHONE', 'wireless': 'NETWORKING - WIFI - HIFI'}, 'jp': {'chromebook': 'Chromebook', 'desktop': 'AIO/DT', 'gaming_handhelds': 'ポータブルゲーム機', 'lcd': 'ディスプレイ', 'notebook': 'ノートパソコン', 'nuc': 'NUC ', 'pad': 'タブレット', 'phone': 'スマートフォン', 'proart': 'ProArt Series', 'wireless': '無線ルーター'}, 'kh': {'desktop': 'Desktop PC', 'motherboard': 'Mother board', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'ZENFONE'}, 'kr': {'chromebook': 'Chromebook', 'gaming_handhelds': '게이밍 핸드헬드', 'notebook': '노트북', 'nuc': 'NUC ', 'pad': '패드'}, 'latin': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'lk': {'chromebook': 'Commercial notebook', 'graphics': 'Graphic card', 'lcd': 'LCD Monitor', 'motherboard': 'Mother board', 'notebook': 'Notebook series'}, 'me-ar': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'me-en': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'mx': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'my': {'chromebook': 'Chromebook', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Premium Phone', 'wireless': 'Networking'}, 'nl': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Grafische kaart ', 'lcd': 'LCD', 'motherboard': 'Moederbord', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'no': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'nz': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'lcd': 'Display', 'notebook': 'Notebook', 'nuc': 'NUC', 'wireless': 'Networking'}, 'pe': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'ph': {'chromebook': 'Chromebook', 'desktop': 'Desktop PC', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Laptops', 'nuc': 'NUC', 'phone': 'Zenfones'}, 'pl': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'AIO/Desktop', 'gaming_handhelds': 'Konsola', 'graphics': 'VGA', 'lcd': 'Monitor LCD', 'motherboard': 'Motherboard', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'Zenfone', 'wireless': 'Wireless'}, 'pt': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT/AIO/EB', 'gaming_handhelds': 'Console de jogos', 'lcd': 'LCD', 'motherboard': 'MB/VGA', 'notebook': 'NB/EPC', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone', 'proart': 'ProArt Series', 'wireless': 'WLAN'}, 'ro': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'gaming_handhelds': 'Console Portabile', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'pad': 'Pad', 'phone': 'Mobile', 'wearable': 'Wearable', 'wireless': 'Wireless'}, 'sa-en': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'se': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'sg': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Phone', 'wireless': 'Networking'}, 'sk': {'chromebook': 'Chromebook', 'graphics': 'VGA', 'lcd': 'LCD a PC komponenty', 'motherboard': 'Motherboard', 'notebook': 'Notebooky', 'nuc': 'NUC ', 'pad': 'Tablety', 'phone': 'PadFone/ZenFone', 'wireless': 'Wireless'}, 'th': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'Motherboards', 'notebook': 'Notebook series', 'nuc': 'NUC ', 'wireless': 'Wireless'}, 'tr': {'accessory': 'Accessory', 'desktop': 'Masaustu & AIO', 'lcd': 'LCD & Monitör', 'motherboard': 'MOBO & GPU', 'notebook': 'Dizüstü & Ultrabook', 'nuc': 'NUC ', 'phone': 'Tablet & Mobil', 'wireless': 'Ağ Ürünleri'}, 'tw': {'chromebook': 'Chromebook', 'desktop': '桌上型電腦', 'gaming_handhelds': '電競掌機', 'lcd': '顯示器/投影機', 'motherboard': '主機板/顯示卡/週邊配件', 'notebook': '筆記型電腦', 'nuc': 'NUC電腦/NUC主機板', 'pad': '平板電腦', 'phone': '智慧型手機', 'wearable': '穿戴裝置', 'wireless': '無線分享器', 'zenbo': 'Zenbo / Zenbo Junior'}, 'ua-ua': {'accessory': 'Аксесуар', 'aio': 'Моноблоки', 'chromebook': 'Chromebook', 'desktop_lcd': 'Десктопи/Монітори (підтримка материнських плат та відеокарт здійснюється через офіційний сайт ASUS)', 'graphics': 'VGA', 'motherboard': 'Материнська плата', 'notebook': 'Ноутбуки', 'nuc': 'NUC ', 'phone': 'Смартфони', 'proart': 'Пристрої серії ProArt', 'wireless': 'Бездротовий'}, 'uk': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'Phone', 'wearable': 'Wearable', 'wireless': 'Wireless'}, 'us': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'vn': {'desktop': 'DESKTOP', 'graphics': 'VGA', 'lcd': 'LCD', 'motherboard': 'Motherboard', 'notebook': 'NB', 'nuc': 'Mini PC NUC', 'phone': 'ZENFONE', 'wireless': 'Wireless'}, 'za': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Mobile', 'wireless': 'Wireless'}}
+        new_productline_name_map = {'ar': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'au': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'lcd': 'Display', 'notebook': 'Notebook', 'nuc': 'NUC', 'wireless': 'Networking'}, 'bd': {'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone'}, 'be-fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'be-nl': {'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Grafische kaart ', 'lcd': 'LCD', 'motherboard': 'Moederbord', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone'}, 'br': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Video card', 'lcd': 'LCD', 'motherboard': 'Main Board ', 'notebook': 'Laptop', 'nuc': 'NUC', 'phone': 'ZenPhone'}, 'ca-en': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'ca-fr': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'ch-de': {'chromebook': 'Chromebook', 'desktop': 'DT', 'gaming_handhelds': 'Gaming Handhelds', 'lcd': 'LCD Monitore', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Smartphones', 'wearable': 'Smartwatch', 'wireless': 'Netzwerkprodukte'}, 'ch-en': {'chromebook': 'Chromebook', 'desktop': 'DT', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone', 'wireless': 'Wireless/Router'}, 'ch-fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'cl': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'co': {'lcd': 'Monitores', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'wireless': 'Routers'}, 'co ': {'aio': 'AIO/Desktop', 'chromebook': 'Chromebook'}, 'cz': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'graphics': 'VGA', 'lcd': 'LCD a PC komponenty', 'motherboard': 'Motherboard', 'notebook': 'Notebooky', 'nuc': 'NUC ', 'pad': 'Tablety', 'phone': 'PadFone/ZenFone', 'proart': 'ProArt', 'wireless': 'Wireless'}, 'de': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'lcd': 'LCD Monitore', 'motherboard': 'Mainboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Smartphones', 'wearable': 'Smartwatch', 'wireless': 'Netzwerkprodukte'}, 'dk': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless'}, 'eg': {'accessory': 'Accessory', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'es': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT/AIO/EB', 'gaming_handhelds': 'Consola de videojuegos', 'lcd': 'LCD', 'motherboard': 'MB/VGA', 'notebook': 'Portátil', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone', 'proart': 'ProArt Series', 'wireless': 'WLAN'}, 'fi': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'fr': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'global': {'aio_chrome': 'AIO/Chromebox', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'gaming_nb': 'Gaming Notebook', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'lcd': 'Display', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Pad', 'phone': 'Phone', 'wearable': 'Wearable', 'wireless': 'Networking'}, 'hk': {'chromebook': 'Chromebook', 'notebook': '筆記型電腦', 'nuc': 'NUC 電腦', 'phone': 'Zenfone 和 ROG Phone', 'wireless': 'Wireless'}, 'hu': {'accessory': 'Accessory', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Tablet', 'phone': 'Mobile', 'wireless': 'Wireless'}, 'id': {'chromebook': 'Chromebook', 'desktop': 'DESKTOP/All in One PC', 'gaming_handhelds': 'Gaming handhelds', 'graphics': 'VGA', 'lcd': 'LCD Monitor', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'Smart Phone', 'proart': 'ProArt Series', 'wireless': 'Wireless'}, 'il': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'AIO/DT', 'graphics': 'Graphic Card', 'lcd': 'LCD', 'motherboard': 'Motherboard', 'notebook': 'NB', 'nuc': 'NUC ', 'phone': 'Phone', 'wireless': 'Wireless', 'proart_nb': 'NB ProArt'}, 'in': {'chromebook': 'Chromebook', 'gaming_nb': 'Gaming Notebook', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Phone', 'proart': 'ProArt Series'}, 'it': {'accessory': 'Accessory', 'aio': 'ALL IN ONE - MINI PC', 'chromebook': 'Chromebook', 'desktop': 'DESKTOP', 'gaming_handhelds': 'GAMING HANDHELDS - ROG ALLY', 'graphics': 'VGA', 'lcd': 'LCD - PROJECTORS', 'mini_pc': 'COMPONENTS - VIVOPC', 'motherboard': 'Motherboard', 'notebook': 'NOTEBOOK', 'nuc': 'NUC ', 'phone': 'TABLET - SMARTPHONE', 'wireless': 'NETWORKING - WIFI - HIFI'}, 'jp': {'chromebook': 'Chromebook', 'desktop': 'AIO/DT', 'gaming_handhelds': 'ポータブルゲーム機', 'lcd': 'ディスプレイ', 'notebook': 'ノートパソコン', 'nuc': 'NUC ', 'pad': 'タブレット', 'phone': 'スマートフォン', 'proart': 'ProArt Series', 'wireless': '無線ルーター'}, 'kh': {'desktop': 'Desktop PC', 'motherboard': 'Mother board', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'ZENFONE'}, 'kr': {'chromebook': 'Chromebook', 'gaming_handhelds': '게이밍 핸드헬드', 'notebook': '노트북', 'nuc': 'NUC ', 'pad': '패드'}, 'latin': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'lk': {'chromebook': 'Commercial notebook', 'graphics': 'Graphic card', 'lcd': 'LCD Monitor', 'motherboard': 'Mother board', 'notebook': 'Notebook series'}, 'me-ar': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'me-en': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'mx': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'my': {'chromebook': 'Chromebook', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Premium Phone', 'wireless': 'Networking'}, 'nl': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'Grafische kaart ', 'lcd': 'LCD', 'motherboard': 'Moederbord', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'ZenFone', 'wireless': 'Wireless'}, 'no': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'nz': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'lcd': 'Display', 'notebook': 'Notebook', 'nuc': 'NUC', 'wireless': 'Networking'}, 'pe': {'chromebook': 'Chromebook', 'motherboard': 'Main Board / Video card', 'notebook': 'Laptop', 'phone': 'ZenPhone', 'proart': 'ProArt'}, 'ph': {'chromebook': 'Chromebook', 'desktop': 'Desktop PC', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Laptops', 'nuc': 'NUC', 'phone': 'Zenfones'}, 'pl': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'AIO/Desktop', 'gaming_handhelds': 'Konsola', 'graphics': 'VGA', 'lcd': 'Monitor LCD', 'motherboard': 'Motherboard', 'notebook': 'Laptop', 'nuc': 'NUC ', 'phone': 'Zenfone', 'wireless': 'Wireless'}, 'pt': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop': 'DT/AIO/EB', 'gaming_handhelds': 'Console de jogos', 'lcd': 'LCD', 'motherboard': 'MB/VGA', 'notebook': 'NB/EPC', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone', 'proart': 'ProArt Series', 'wireless': 'WLAN'}, 'ro': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'gaming_handhelds': 'Console Portabile', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'pad': 'Pad', 'phone': 'Mobile', 'wearable': 'Wearable', 'wireless': 'Wireless'}, 'sa-en': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'MB/VGA/Projector/ODD/Oplay', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Phone/PhonePad', 'wearable': 'Wearable', 'wireless': 'Wireless/Router'}, 'se': {'accessory': 'Accessory', 'chromebook': 'Chromebook', 'desktoo_lcd': 'DT/LCD/AIO/Chromebox', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'phone': 'Phone/Phonepad', 'wireless': 'Wireless/Network'}, 'sg': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming handhelds', 'notebook': 'Notebook', 'nuc': 'NUC', 'phone': 'Phone', 'wireless': 'Networking'}, 'sk': {'chromebook': 'Chromebook', 'graphics': 'VGA', 'lcd': 'LCD a PC komponenty', 'motherboard': 'Motherboard', 'notebook': 'Notebooky', 'nuc': 'NUC ', 'pad': 'Tablety', 'phone': 'PadFone/ZenFone', 'wireless': 'Wireless'}, 'th': {'chromebook': 'Chromebook', 'gaming_handhelds': 'Gaming Handhelds', 'motherboard': 'Motherboards', 'notebook': 'Notebook series', 'nuc': 'NUC ', 'wireless': 'Wireless'}, 'tr': {'accessory': 'Accessory', 'desktop': 'Masaustu & AIO', 'lcd': 'LCD & Monitör', 'motherboard': 'MOBO & GPU', 'notebook': 'Dizüstü & Ultrabook', 'nuc': 'NUC ', 'phone': 'Tablet & Mobil', 'wireless': 'Ağ Ürünleri'}, 'tw': {'chromebook': 'Chromebook', 'desktop': '桌上型電腦', 'gaming_handhelds': '電競掌機', 'lcd': '顯示器/投影機', 'motherboard': '主機板/顯示卡/週邊配件', 'notebook': '筆記型電腦', 'nuc': 'NUC電腦/NUC主機板', 'pad': '平板電腦', 'phone': '智慧型手機', 'wearable': '穿戴裝置', 'wireless': '無線分享器', 'zenbo': 'Zenbo / Zenbo Junior'}, 'ua-ua': {'accessory': 'Аксесуар', 'aio': 'Моноблоки', 'chromebook': 'Chromebook', 'desktop_lcd': 'Десктопи/Монітори (підтримка материнських плат та відеокарт здійснюється через офіційний сайт ASUS)', 'graphics': 'VGA', 'motherboard': 'Материнська плата', 'notebook': 'Ноутбуки', 'nuc': 'NUC ', 'phone': 'Смартфони', 'proart': 'Пристрої серії ProArt', 'wireless': 'Бездротовий'}, 'uk': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'gaming_handhelds': 'Gaming Handhelds', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'phone': 'Phone', 'wearable': 'Wearable', 'wireless': 'Wireless'}, 'us': {'chromebook': 'Chromebook', 'desktop': 'Chrome, Desktop, AIO PC, Mini PC,  Robot', 'gaming_handhelds': 'Gaming Handheld', 'graphics': 'Graphics Card, Display, Accessory, Other Components', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC', 'pad': 'Tablet, Mobile Phone, and Wearable', 'proart_lcd': 'ProArt Display', 'proart_nb': 'ProArt Studiobook and ProArt Mini PC', 'wireless': 'Networking'}, 'vn': {'desktop': 'DESKTOP', 'graphics': 'VGA', 'lcd': 'LCD', 'motherboard': 'Motherboard', 'notebook': 'NB', 'nuc': 'Mini PC NUC', 'phone': 'ZENFONE', 'wireless': 'Wireless'}, 'za': {'accessory': 'Accessory', 'aio_chrome': 'AIO/Chromebox', 'chromebook': 'Chromebook', 'desktop_lcd': 'Desktop/LCD', 'graphics': 'VGA', 'motherboard': 'Motherboard', 'notebook': 'Notebook', 'nuc': 'NUC ', 'pad': 'Pad', 'phone': 'Mobile', 'wireless': 'Wireless'}}
+        # 兩張表一次替換，request 不會看到新 PL_mappings 配舊名稱對照
+        self.containers.load_pl_mappings(new_PL_mappings, new_productline_name_map)
         
         return {"message": "PL_mappings update success"}
 
-    def update_KB(self):
-        """更新知識庫資料"""
-        container_name = "ApChatbotKnowledge"
-        container = self.containers.lookup_db.get_container_client(container_name)
-
-        query = """SELECT * FROM c"""
-        results = container.query_items(query, enable_cross_partition_query=True)
+    def fetch_KB(self, results=None):
+        """從 ApChatbotKnowledge 讀出 KB_mappings"""
+        if results is None:
+            results = self.query_source("KB")
 
         new_KB_mappings = {
             f"{item.get('kb_no')}_{item.get('lang')}": {
@@ -89,11 +174,13 @@ class UpdateService:
             for item in results
         }
 
-        self.containers.KB_mappings = new_KB_mappings
-        
-        # 儲存到檔案
-        with open("config/kb_mappings.pkl", "wb") as file:
-            pickle.dump(self.containers.KB_mappings, file)
+        return new_KB_mappings
+
+    def update_KB(self):
+        """更新知識庫資料（啟動時讀檔失敗的備援；線上更新請走 reload job）"""
+        # 寫成 mmap KB store 後改由檔案提供（不在記憶體保留整份 dict）
+        KBStore.write(KB_STORE_PATH, self.fetch_KB())
+        self.containers.KB_mappings = KBStore.open(KB_STORE_PATH)
         
         return {"message": "KB_mappings update success"}
 
@@ -118,3 +205,113 @@ class UpdateService:
         self.containers.specific_kb_mappings = {'1015071_desktop': {'id': '0', 'correct_kb_no': 1047955}, '1047955_gaming_handhelds': {'id': '1', 'correct_kb_no': 1015071}, '1047955_notebook': {'id': '2', 'correct_kb_no': 1015071}, '1015072_desktop': {'id': '3', 'correct_kb_no': 1047158}, '1015072_motherboard': {'id': '4', 'correct_kb_no': 1047158}, '1047158_gaming_handhelds': {'id': '5', 'correct_kb_no': 1015072}, '1047158_notebook': {'id': '6', 'correct_kb_no': 1015072}, '1015073_desktop': {'id': '7', 'correct_kb_no': 1015740}, '1015740_gaming_handhelds': {'id': '8', 'correct_kb_no': 1015073}, '1015740_notebook': {'id': '9', 'correct_kb_no': 1015073}}
         
         return {"message": "Specific_KB_mappings update success"}
+
+    # ---- 共用 mapping snapshot ----
+    def snapshot_signature(self) -> str:
+        return mapping_snapshot.source_signature(
+            snapshot_sources(),
+            extra=[self.containers.PL_mappings, self.containers.productline_name_map, self.containers.specific_kb_mappings],
+        )
+
+    def _tables_from_sources(self) -> dict:
+        with open(RAG_MAPPINGS_PATH, "rb") as f1, open(RAG_INDEX_PATH, "rb") as f2:
+            rag_mappings, rag_hint_id_index_mapping = pickle.load(f1), pickle.load(f2)
+        if os.path.exists(KB_STORE_PATH):
+            kb_mappings = KBStore.open(KB_STORE_PATH)
+        else:
+            with open(KB_PICKLE_PATH, "rb") as f:
+                kb_mappings = pickle.load(f)
+        return {
+            "rag_mappings": rag_mappings,
+            "rag_hint_id_index_mapping": rag_hint_id_index_mapping,
+            "KB_mappings": kb_mappings,
+            "PL_mappings": self.containers.PL_mappings,
+            "productline_name_map": self.containers.productline_name_map,
+            "specific_kb_mappings": self.containers.specific_kb_mappings,
+        }
+
+    def attach_mapping_snapshot(self) -> MappingTables:
+        """多 worker 共用的唯讀 snapshot：第一個 worker 建檔，其餘 worker 直接 mmap 開啟（同步，請在 thread 執行）"""
+        # PL / specific KB 目前寫死在 UpdateService，先取得再一起放進 snapshot
+        self.update_website_botname()
+        self.update_specific_KB()
+        snapshot = mapping_snapshot.load_or_build(
+            MAPPING_SNAPSHOT_PATH, self.snapshot_signature(), self._tables_from_sources
+        )
+        return MappingTables.from_snapshot(snapshot)
+
+    def build_reloaded_mappings(self, kinds, incremental: bool = False):
+        """重新載入（同步，請在 thread 執行）：
+        1. 由資料庫重建指定的表（incremental 時只取水位之後變動的文件，合併進目前版本）
+        2. 驗證  3. 來源檔與 snapshot 皆寫暫存檔再 rename
+        回傳 (新 MappingTables 或 None（內容無變動）, 新水位, 各來源變動筆數)，由呼叫端發布。
+
+        增量模式以 _ts 判斷，看不到硬刪除；刪除文件後請跑一次完整重新載入。"""
+        current = self.containers.mappings
+        watermarks = load_watermarks()
+        new_watermarks, changed, new_tables, deltas = dict(watermarks), {}, {}, {}
+        for kind in kinds:
+            since = watermarks.get(kind) if incremental else None
+            items = self.query_source(kind, since)
+            if items:
+                new_watermarks[kind] = max([watermarks.get(kind, 0)] + [item.get("_ts", 0) for item in items])
+
+            if kind == "technical_rag":
+                rag_mappings, rag_hint_id_index_mapping = self.fetch_technical_rag(items)
+                if since is not None:
+                    rag_mappings = changed_entries(rag_mappings, current.rag_mappings)
+                    rag_hint_id_index_mapping = changed_entries(rag_hint_id_index_mapping, current.rag_hint_id_index_mapping)
+                    changed[kind] = len(rag_mappings) + len(rag_hint_id_index_mapping)
+                    if not changed[kind]:
+                        continue
+                    rag_mappings = {**current.rag_mappings, **rag_mappings}
+                    rag_hint_id_index_mapping = {**current.rag_hint_id_index_mapping, **rag_hint_id_index_mapping}
+                else:
+                    changed[kind] = len(rag_mappings)
+                new_tables["rag_mappings"] = rag_mappings
+                new_tables["rag_hint_id_index_mapping"] = rag_hint_id_index_mapping
+            elif kind == "KB":
+                kb_mappings = self.fetch_KB(items)
+                if since is not None:
+                    kb_mappings = changed_entries(kb_mappings, current.KB_mappings)
+                    changed[kind] = len(kb_mappings)
+                    if not changed[kind]:
+                        continue
+                    # 目前版本的 store 與變動項目串流合併：未變動的 KB 直接複製已編碼的 bytes，不逐筆載入
+                    deltas["KB_mappings"] = kb_mappings
+                    kb_mappings = KBStore(KBStore.merge(current.KB_mappings, kb_mappings))
+                else:
+                    changed[kind] = len(kb_mappings)
+                new_tables["KB_mappings"] = kb_mappings
+
+        if not new_tables:
+            return None, new_watermarks, changed
+        validate_tables(new_tables, current, changes=deltas)
+
+        if "rag_mappings" in new_tables:
+            dump_pickle_atomic(RAG_MAPPINGS_PATH, new_tables["rag_mappings"])
+            dump_pickle_atomic(RAG_INDEX_PATH, new_tables["rag_hint_id_index_mapping"])
+        if "KB_mappings" in new_tables:
+            KBStore.write(KB_STORE_PATH, new_tables["KB_mappings"])
+
+        tables = {**current.as_dict(), **new_tables}
+        snapshot = mapping_snapshot.write_snapshot(MAPPING_SNAPSHOT_PATH, tables, self.snapshot_signature())
+        return MappingTables.from_snapshot(snapshot), new_watermarks, changed
+
+    async def reload_mappings(self, kinds, incremental: bool = False) -> dict:
+        """背景 reload job 本體：建表與寫檔都在 thread，發布只是一次參照交換；發布成功後才推進水位"""
+        tables, watermarks, changed = await asyncio.to_thread(self.build_reloaded_mappings, kinds, incremental)
+        if tables is not None:
+            self.containers.publish_mappings(tables)
+        await asyncio.to_thread(save_watermarks, watermarks)
+        tables = tables or self.containers.mappings
+        return {
+            "version": tables.version,
+            "changed": changed,
+            "sizes": {name: len(table) for name, table in tables.as_dict().items()},
+        }
+
+    def submit_reload(self, kinds, incremental: bool = False) -> dict:
+        kinds = tuple(kinds)
+        kind = "+".join(kinds) + (":delta" if incremental else "")
+        return self.containers.reload_jobs.submit(kind, lambda: self.reload_mappings(kinds, incremental))
@@ -3,10 +3,14 @@ Pytest 設定檔
 提供共用的 fixtures 和測試配置
 """
 
+import os
 import pytest
 import sys
 from pathlib import Path
 
+# 測試不寫 tech_agent.log（需在 import utils.logger 之前設定）
+os.environ.setdefault("TECH_LOG_PATH", "")
+
 # 確保專案根目錄在 Python 路徑中
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -0,0 +1,85 @@
+"""
+非同步 Google Translate 測試
+以本地 aiohttp 伺服器模擬 Cloud Translation v2，確認併發請求會合併成一次多字串呼叫
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from shared_lib.sharedlib.async_translate import AsyncGoogleTranslateClient, TranslateBatcher
+
+
+async def start_fake_translate_api(calls):
+    async def handler(request):
+        body = await request.json()
+        calls.append(body)
+        assert request.headers["Authorization"] == "Bearer fake-token"
+        return web.json_response({
+            "data": {"translations": [{"translatedText": f"{body['target']}:{q}"} for q in body["q"]]}
+        })
+
+    app = web.Application()
+    app.router.add_post("/translate", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/translate"
+
+
+def test_concurrent_requests_merged_into_one_call():
+    calls = []
+
+    async def run():
+        runner, url = await start_fake_translate_api(calls)
+        credentials = SimpleNamespace(valid=True, token="fake-token")
+        batcher = TranslateBatcher(AsyncGoogleTranslateClient(credentials, url=url), window=0.01)
+        try:
+            return await asyncio.gather(
+                batcher.translate("無法開機", "en"),
+                batcher.translate("藍屏", "en"),
+                batcher.translate("無法開機", "en"),
+            )
+        finally:
+            await batcher.close()
+            await runner.cleanup()
+
+    results = asyncio.run(run())
+
+    assert results == ["en:無法開機", "en:藍屏", "en:無法開機"]
+    assert len(calls) == 1
+    assert calls[0]["q"] == ["無法開機", "藍屏"]  # 相同字串只送一次
+
+
+class FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def translate_batch(self, texts, target):
+        self.calls += 1
+        raise RuntimeError("quota exceeded")
+
+    async def close(self):
+        pass
+
+
+def test_batch_error_propagates_and_max_batch_flushes():
+    client = FailingClient()
+
+    async def run():
+        batcher = TranslateBatcher(client, window=10, max_batch=2)  # 只靠 max_batch 觸發送出
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.translate("a", "en"), batcher.translate("b", "en"), return_exceptions=True),
+            1,
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert client.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,53 @@
+"""
+TTLCache 測試
+LRU 淘汰、TTL 過期、正規化 key 與命中統計
+"""
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import TTLCache, normalize_text
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("無法開機", "無法開機"),
+    ("  無法　開機 ", "無法 開機"),  # 全形空白、頭尾空白
+    ("Blue  Screen", "blue screen"),
+    ("ＢＳＯＤ", "bsod"),  # 全形英數
+])
+def test_normalize_text(raw, expected):
+    assert normalize_text(raw) == expected
+
+
+def test_lru_eviction_and_stats():
+    cache = TTLCache("test_lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a 變成最近使用
+    cache.set("c", 3)  # 淘汰 b
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "size": 2, "maxsize": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_ratio": 0.6667,
+    }
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache("test_ttl", maxsize=10, ttl=5)
+    cache.set("藍屏", "blue screen")
+
+    now[0] += 4
+    assert cache.get("藍屏") == "blue screen"
+    now[0] += 2
+    assert cache.get("藍屏") is None
+    assert cache.evictions == 1
+
+
+def test_disabled_cache():
+    cache = TTLCache("test_disabled", maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
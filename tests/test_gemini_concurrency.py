@@ -0,0 +1,71 @@
+"""
+Gemini 非同步呼叫併發測試
+以慢速的本地 Gemini 替身確認多個 request 會同時進行，而非逐一排隊
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.integrations.llm_clients import LLMClientRegistry
+from src.services.base_service import BaseService
+
+GEMINI_DELAY = 0.2
+
+
+class SlowGeminiModels:
+    """模擬 client.aio.models：每次回覆固定延遲，並記錄同時進行中的請求數。"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_content(self, model, contents, config):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(GEMINI_DELAY)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+def make_service(max_concurrency):
+    models = SlowGeminiModels()
+    gemini_client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    registry = LLMClientRegistry(
+        {},
+        gemini_client=gemini_client,
+        openai_client=object(),
+        gemini_max_concurrency=max_concurrency,
+    )
+    return BaseService(config={}, clients=registry), models
+
+
+async def fire(service, n):
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(service.reply_gemini_text("hi", "sys") for _ in range(n))
+    )
+    assert all(r["response"] == "ok" for r in results)
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize("n", [1, 4, 16])
+def test_throughput_grows_with_concurrency(n):
+    service, models = make_service(max_concurrency=16)
+    elapsed = asyncio.run(fire(service, n))
+
+    # 全部同時進行：總耗時約等於單次延遲，吞吐量隨 n 線性成長
+    assert elapsed < GEMINI_DELAY * 2
+    assert models.peak == n
+
+
+def test_concurrency_cap_per_worker():
+    service, models = make_service(max_concurrency=2)
+    elapsed = asyncio.run(fire(service, 4))
+
+    assert models.peak == 2
+    assert elapsed >= GEMINI_DELAY * 2
@@ -0,0 +1,75 @@
+"""
+KBStore 測試
+與 kb_mappings.pkl 內容逐筆比對、None 欄位、壓縮與 mmap 開啟、增量合併不解碼既有資料
+"""
+
+import pickle
+
+import pytest
+
+from src.integrations.kb_store import KBStore
+
+
+@pytest.fixture(scope="module")
+def kb_mappings():
+    with open("config/kb_mappings.pkl", "rb") as f:
+        return pickle.load(f)
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_roundtrip_matches_pickle(tmp_path, kb_mappings, compression):
+    path = tmp_path / "kb_store.bin"
+    KBStore.write(path, kb_mappings, compression=compression)
+    store = KBStore.open(path)
+
+    assert len(store) == len(kb_mappings)
+    assert set(store) == set(kb_mappings)
+    for key, value in kb_mappings.items():
+        assert dict(store[key]) == value
+
+
+def test_dict_like_api():
+    mapping = {
+        "1050571_es-es": {"title": "Título", "summary": None, "content": "藍屏 " * 10},
+        "1050571_zh-tw": {"title": "標題", "summary": "摘要", "content": ""},
+        "None_en-us": {"title": "orphan", "summary": "", "content": ""},
+    }
+    store = KBStore(KBStore.build(mapping))
+
+    assert store.get("1050571_es-es").get("summary") is None
+    assert store.get("1050571_es-es").get("content") == "藍屏 " * 10
+    assert store["1050571_zh-tw"]["title"] == "標題"
+    assert store.get("None_en-us") == mapping["None_en-us"]
+    assert store.get("1050571_en-us", {}).get("title", "") == ""  # 不存在的語言
+    assert store.get("999_zh-tw") is None
+    assert "1050571_zh-tw" in store and "abc_zh-tw" not in store
+    with pytest.raises(KeyError):
+        store["1050571_zh-tw"]["author"]
+
+
+def test_rejects_foreign_buffer():
+    with pytest.raises(ValueError):
+        KBStore(b"not a store at all")
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_merge_copies_unchanged_rows_without_decoding(monkeypatch, compression):
+    base_mapping = {f"{1000 + i}_zh-tw": {"title": f"t{i}", "summary": None, "content": "c" * i} for i in range(500)}
+    base_mapping["None_en-us"] = {"title": "orphan", "summary": "", "content": ""}
+    base = KBStore(KBStore.build(base_mapping, compression=compression))
+    changes = {
+        "1001_zh-tw": {"title": "changed", "summary": "s", "content": "c"},
+        "1001_de-de": {"title": "新語言", "summary": None, "content": ""},  # 新語言：既有 lang_id 需重新對應
+        "9999_zh-tw": {"title": "new", "summary": "s", "content": "c"},
+    }
+
+    decoded = []
+    original_decode = KBStore._decode
+    monkeypatch.setattr(KBStore, "_decode", lambda self, row, column: decoded.append(row) or original_decode(self, row, column))
+    merged = KBStore(KBStore.merge(base, changes))
+    assert decoded == []  # 未變動的 KB 只複製已編碼的 bytes
+
+    expected = {**base_mapping, **changes}
+    assert merged.compression == compression
+    assert list(merged) == list(KBStore(KBStore.build(expected)))  # 順序與完整重建一致
+    assert {key: dict(value) for key, value in merged.items()} == expected
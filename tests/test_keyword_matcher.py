@@ -0,0 +1,54 @@
+"""
+高頻詞 Aho-Corasick 比對測試
+與原本逐一子字串迴圈的第一個命中結果一致、intent_dict 更新後重建
+"""
+
+import asyncio
+import random
+
+from src.services.service_discriminator_merge_input import KeywordSearch, ServiceDiscriminator
+from utils.keyword_matcher import KeywordMatcher
+
+
+def loop_search(intent_dict, text):
+    for intent, keywords in intent_dict.items():
+        for keyword in keywords:
+            if keyword in text:
+                return keyword, intent
+    return None
+
+
+def test_matches_loop_first_hit():
+    intent_dict = KeywordSearch(config={}).get_intent_dict()
+    matcher = KeywordMatcher(intent_dict)
+    keywords = [k for ks in intent_dict.values() for k in ks]
+    rng = random.Random(0)
+    fillers = ["我的筆電", "請問", " my laptop ", "怎麼辦", "?", "the ", "保", "ship"]
+    for _ in range(2000):
+        parts = rng.sample(keywords, rng.randint(0, 3)) + rng.sample(fillers, rng.randint(0, 4))
+        rng.shuffle(parts)
+        text = "".join(parts)
+        assert matcher.search(text) == loop_search(intent_dict, text), text
+
+
+def test_overlapping_keywords_keep_dict_priority():
+    intent_dict = {"A": ["cd"], "B": ["abcde", "bc"], "C": [""]}
+    matcher = KeywordMatcher(intent_dict)
+    assert matcher.search("xabcdex") == ("cd", "A")
+    assert matcher.search("abc") == ("bc", "B")
+    assert matcher.search("zzz") == ("", "C")
+    assert KeywordMatcher({"A": ["he", "she", "hers"]}).search("ushers") == ("he", "A")
+
+
+def test_keyword_search_type3_and_refresh():
+    sd = ServiceDiscriminator.__new__(ServiceDiscriminator)  # 不建立外部 client
+    sd.kw_search = KeywordSearch(config={})
+    sd.refresh_intent_dict()
+
+    assert asyncio.run(sd.keyword_search_type3("我要查詢維修進度", "repair progress")) == "Inquire Repair Status"
+    assert asyncio.run(sd.keyword_search_type3("你好", "check the invoice")) == "Invoice Content Inquiry"
+    assert sd.keyword_search("hello there") == {"keyword": "None", "type3": "None"}
+
+    sd.kw_search.get_intent_dict = lambda: {"Greeting": ["hello"]}
+    sd.refresh_intent_dict()
+    assert sd.keyword_search("hello there") == {"keyword": "hello", "type3": "Greeting"}
@@ -0,0 +1,28 @@
+"""
+LLMClientRegistry 單元測試
+確認 BaseService 子類共用同一組 client，不在每個 request 重建
+"""
+
+from src.core.technical_support_async import TSProductLine, TSRAG
+from src.integrations.llm_clients import LLMClientRegistry
+from src.services.base_service import BaseService
+
+
+def test_services_share_registry_clients():
+    gemini_client, openai_client = object(), object()
+    registry = LLMClientRegistry(
+        {"TECH_GEMINI_MODEL_NAME": "gemini-test"},
+        gemini_client=gemini_client,
+        openai_client=openai_client,
+    )
+
+    services = [
+        BaseService(config={}, clients=registry),
+        TSRAG(config={}, clients=registry),
+        TSProductLine(config={}, productline_name_map={}, clients=registry),
+    ]
+
+    for service in services:
+        assert service.client is gemini_client
+        assert service.openai_client_gpt41_mini is openai_client
+        assert service.model_name == "gemini-test"
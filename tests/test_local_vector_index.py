@@ -0,0 +1,86 @@
+"""
+LocalVectorIndex 測試
+以合成向量離線建立索引，檢查遮罩、top-k 與 RedisConfig 回應格式
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.integrations.Redis_process import RedisConfig
+from src.integrations.local_vector_index import LocalVectorIndex
+
+DIM = 16
+
+
+def synthetic_records(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, DIM)).astype(np.float32)
+    records = [
+        {
+            "kb_no": 1000000 + i,
+            "websiteCode": ("tw", "us", "jp")[i % 3],
+            "productLine": ("notebook,desktop", "phone", "notebook")[i % 3 if i % 5 else 1],
+            "version": "4.0" if i < 150 else "5.0",
+            "hide": 999 if i < 150 else i,
+            "key": f"tech_support:4.0--{1000000 + i}-999-{i}",
+            "type": "question",
+        }
+        for i in range(n)
+    ]
+    return embeddings, records
+
+
+def brute_force(embeddings, records, query, keep, n):
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    candidates = [i for i in range(len(records)) if keep(records[i])]
+    return [records[i]["kb_no"] for i in sorted(candidates, key=lambda i: -scores[i])[:n]]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_top_k_matches_brute_force(tmp_path, dtype):
+    embeddings, records = synthetic_records()
+    index = LocalVectorIndex.build(tmp_path, embeddings, records, dtype=dtype, version="v1")
+    assert isinstance(index.embeddings, np.memmap)
+
+    query = embeddings[6] + 0.1
+    payload = {"websiteCode": "tw", "productLine": "notebook", "version": "4.0", "n": 4, "hide_min": 0, "hide_max": 999}
+    result = index.search_vector(query, payload)
+
+    faqs = result["result"]["faqs"]
+    expected = brute_force(
+        embeddings, records, query,
+        lambda r: r["websiteCode"] == "tw" and "notebook" in r["productLine"] and r["version"] == "4.0",
+        4,
+    )
+    assert [f["kb_no"] for f in faqs] == expected
+    assert faqs[0]["kb_no"] == 1000006
+    assert set(faqs[0]) == {"kb_no", "websiteCode", "productLine", "key", "type", "hide", "cosineSimilarity"}
+    assert all(a["cosineSimilarity"] >= b["cosineSimilarity"] for a, b in zip(faqs, faqs[1:]))
+
+
+def test_filters(tmp_path):
+    embeddings, records = synthetic_records()
+    index = LocalVectorIndex.build(tmp_path, embeddings, records)
+
+    assert index.mask({"websiteCode": "kr"}).sum() == 0
+    assert index.mask({"productLine": "watch"}).sum() == 0
+    assert index.mask({"websiteCode": "all", "version": "5.0", "hide_min": 160, "hide_max": 169}).sum() == 10
+    assert index.search_vector(embeddings[0], {"websiteCode": "kr", "n": 3}) == {"status": 200, "result": {"faqs": []}}
+
+
+def test_redis_config_uses_local_index(tmp_path):
+    embeddings, records = synthetic_records()
+
+    async def embedder(texts):
+        return np.stack([embeddings[int(t)] for t in texts])
+
+    LocalVectorIndex.build(tmp_path, embeddings, records, version="v1")
+    redis_config = RedisConfig({"TECH_REDIS_E50_URL": "http://unused"}, session=None)
+    redis_config.use_local_index(LocalVectorIndex.open(tmp_path, embedder=embedder))
+
+    result = asyncio.run(redis_config.get_hint_simiarity("3"))
+    assert result == {"faq": 1000003, "cosineSimilarity": pytest.approx(1.0, abs=1e-5), "hints_id": "3"}
+    assert redis_config.index_version == "local:v1"
@@ -0,0 +1,65 @@
+"""
+Logging pipeline 測試
+LazyJson 只在輸出時序列化、大型 payload 抽樣、stage level 設定、佇列滿時丟棄
+"""
+
+import logging
+import os
+import queue
+
+import utils.logger as log_module
+from utils.logger import DroppingQueueHandler, LazyJson, get_stage_logger, parse_stage_levels
+
+
+class CountingPayload(dict):
+    serialized = 0
+
+    def items(self):  # json.dumps 走訪 dict 時會呼叫
+        CountingPayload.serialized += 1
+        return super().items()
+
+
+def capture(stage_logger):
+    records = queue.Queue()
+    handler = DroppingQueueHandler(records)
+    stage_logger.addHandler(handler)
+    stage_logger.propagate = False
+    return records
+
+
+def test_payload_is_serialized_only_when_emitted():
+    stage_logger = get_stage_logger("test_lazy")
+    records = capture(stage_logger)
+    payload = CountingPayload(answer="螢幕不亮")
+
+    stage_logger.setLevel(logging.WARNING)
+    stage_logger.info("payload: %s", LazyJson(payload))
+    assert CountingPayload.serialized == 0 and records.empty()
+
+    stage_logger.setLevel(logging.INFO)
+    stage_logger.info("payload: %s", LazyJson(payload))
+    payload["answer"] = "changed"  # 已在呼叫端組好訊息，之後修改不影響
+    record = records.get_nowait()
+    assert record.msg == 'payload: {"answer": "螢幕不亮"}' and record.args is None
+
+
+def test_large_payload_sampling(monkeypatch):
+    if "TECH_LOG_LARGE_PAYLOAD_SAMPLE_RATE" not in os.environ:
+        assert log_module.LARGE_PAYLOAD_SAMPLE_RATE == 1.0  # 預設全部記錄，抽樣需明確設定
+    monkeypatch.setattr(log_module, "LARGE_PAYLOAD_SAMPLE_RATE", 0.0)
+    assert str(LazyJson({"a": 1}, large=True)).startswith("<omitted")
+    assert str(LazyJson({"a": 1})) == '{"a": 1}'
+    monkeypatch.setattr(log_module, "LARGE_PAYLOAD_SAMPLE_RATE", 1.0)
+    assert str(LazyJson({"a": 1}, large=True)) == '{"a": 1}'
+
+
+def test_stage_levels_and_full_queue():
+    assert parse_stage_levels("history=warning, cosmos=DEBUG,bad=LOUD,,x") == {
+        "history": logging.WARNING, "cosmos": logging.DEBUG,
+    }
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "msg", None, None)
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
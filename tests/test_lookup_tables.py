@@ -0,0 +1,29 @@
+"""
+預編譯 xlsx 對照表測試
+JSON 與來源 xlsx 一致、來源更新後自動重新編譯
+"""
+
+import shutil
+
+from src.core import lookup_tables
+
+
+def test_compiled_artifacts_match_sources():
+    for name in lookup_tables.LOOKUPS:
+        assert lookup_tables.load_lookup(name) == lookup_tables.read_source(name)
+
+
+def test_stale_artifact_is_recompiled(tmp_path, monkeypatch):
+    name = "ts_rag_open_remarks_mappings"
+    shutil.copy(lookup_tables.DATA_DIR / f"{name}.xlsx", tmp_path / f"{name}.xlsx")
+    monkeypatch.setattr(lookup_tables, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(lookup_tables, "COMPILED_DIR", tmp_path / "compiled")
+
+    (tmp_path / "compiled").mkdir()
+    (tmp_path / "compiled" / f"{name}.json").write_text(
+        '{"source_sha1": "outdated", "data": {"en-us": "old"}}', encoding="utf-8"
+    )
+
+    mappings = lookup_tables.load_lookup(name)
+    assert mappings["en-us"] != "old"
+    assert '"outdated"' not in (tmp_path / "compiled" / f"{name}.json").read_text(encoding="utf-8")
@@ -0,0 +1,194 @@
+"""
+Mapping 重新載入測試
+背景 job、驗證失敗不發布、單一參照交換下進行中的 request 仍看到舊版本、_ts 水位增量更新
+"""
+
+import asyncio
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from src.integrations.containers import DependencyContainer
+from src.integrations.kb_store import KBStore
+from src.integrations.mapping_snapshot import MappingTables, read_signature
+from src.services import update_service as update_module
+from src.services.reload_jobs import ReloadJobs
+from src.services.update_service import UpdateService
+
+
+class FakeCosmos:
+    def __init__(self, containers):
+        self.containers = containers
+
+    def get_container_client(self, name):
+        def query_items(query, parameters=(), **kwargs):
+            params = {p["name"]: p["value"] for p in parameters}
+            items = self.containers[name]
+            if "@since" in params:
+                items = [item for item in items if item.get("_ts", 0) >= params["@since"]]
+            return iter(items)
+
+        return SimpleNamespace(query_items=query_items)
+
+
+def kb_items(n, title="v1"):
+    return [{"kb_no": 1000 + i, "lang": "zh-tw", "title": f"{title}-{i}", "summary": "s", "content": "c"} for i in range(n)]
+
+
+def rag_items(n):
+    return [{"id": str(i), "kb_no": 1000 + i, "websitecode": "tw", "index": 1, "question": "q", "rag": "r", "title": "t"}
+            for i in range(n)]
+
+
+@pytest.fixture
+def containers(tmp_path, monkeypatch):
+    for name, filename in [
+        ("KB_STORE_PATH", "kb_store.bin"), ("KB_PICKLE_PATH", "kb_mappings.pkl"),
+        ("RAG_MAPPINGS_PATH", "rag_mappings.pkl"), ("RAG_INDEX_PATH", "rag_index.pkl"),
+        ("MAPPING_SNAPSHOT_PATH", "mapping_snapshot.bin"), ("WATERMARK_PATH", "mapping_watermarks.json"),
+    ]:
+        monkeypatch.setattr(update_module, name, str(tmp_path / filename))
+    with open(tmp_path / "rag_mappings.pkl", "wb") as f:
+        pickle.dump({"1000_tw_1": {"question": "q", "rag_response": "r", "title": "t", "ASUS_link": "", "ROG_link": ""}}, f)
+    with open(tmp_path / "rag_index.pkl", "wb") as f:
+        pickle.dump({"0_tw": {"index": 1, "rag": "r"}}, f)
+    with open(tmp_path / "kb_mappings.pkl", "wb") as f:
+        pickle.dump({f"{i['kb_no']}_{i['lang']}": {"title": i["title"], "summary": "s", "content": "c"} for i in kb_items(4)}, f)
+
+    containers = DependencyContainer.__new__(DependencyContainer)  # 不建立外部 client
+    containers.mappings = MappingTables()
+    containers.lookup_db = FakeCosmos({"ApChatbotKnowledge": kb_items(4, title="v2"), "sample_question": rag_items(3)})
+    return containers
+
+
+def test_setter_swaps_whole_tables(containers):
+    before = containers.mappings
+    containers.KB_mappings = {"1_zh-tw": {"title": "t"}}
+
+    assert containers.mappings is not before
+    assert before.KB_mappings == {}
+    assert containers.KB_mappings["1_zh-tw"]["title"] == "t"
+
+
+def test_paired_tables_swap_together(containers):
+    before = containers.mappings
+    containers.load_rag_pickle({"k": {"question": "q"}}, {"0_tw": {"index": 1}})
+    after_rag = containers.mappings
+    containers.load_pl_mappings({"tw": {"notebook"}}, {"tw": {"notebook": "Laptop"}})
+
+    # 每次只替換一次參照：不會出現只有其中一張表是新版的中間狀態
+    assert before.rag_mappings == {} and before.rag_hint_id_index_mapping == {}
+    assert after_rag.rag_mappings["k"] and after_rag.rag_hint_id_index_mapping["0_tw"]
+    assert after_rag.PL_mappings == {} and after_rag.productline_name_map == {}
+    assert containers.mappings.productline_name_map["tw"]["notebook"] == "Laptop"
+    assert containers.mappings.rag_mappings is after_rag.rag_mappings
+
+
+def test_reload_job_publishes_new_version(containers):
+    update_service = UpdateService(containers)
+
+    async def scenario():
+        containers.reload_jobs = ReloadJobs()
+        containers.publish_mappings(await asyncio.to_thread(update_service.attach_mapping_snapshot))
+        in_flight = containers.mappings  # 模擬進行中的 request 持有的參照
+
+        job = update_service.submit_reload(["KB"])
+        assert job["status"] == "pending"
+        await asyncio.gather(*containers.reload_jobs._tasks)
+        return in_flight, containers.reload_jobs.get(job["job_id"])
+
+    in_flight, job = asyncio.run(scenario())
+    assert job["status"] == "succeeded", job
+    assert job["version"] == containers.mappings.version != in_flight.version
+    assert containers.KB_mappings["1000_zh-tw"]["title"] == "v2-0"
+    assert in_flight.KB_mappings["1000_zh-tw"]["title"] == "v1-0"  # 舊版 mmap 仍可讀
+    assert containers.rag_mappings["1000_tw_1"]["question"] == "q"  # 未重新載入的表沿用
+    assert "tw" in containers.PL_mappings
+    assert containers.productline_name_map["tw"]["notebook"]  # 與 PL_mappings 同一份 snapshot
+    assert read_signature(update_module.MAPPING_SNAPSHOT_PATH) == containers.mappings.signature
+
+
+def test_failed_validation_keeps_current_version(containers):
+    containers.lookup_db.containers["ApChatbotKnowledge"] = kb_items(1)  # 4 -> 1 筆，視為查詢不完整
+    update_service = UpdateService(containers)
+
+    async def scenario():
+        containers.reload_jobs = ReloadJobs()
+        containers.publish_mappings(await asyncio.to_thread(update_service.attach_mapping_snapshot))
+        before = containers.mappings
+        job = update_service.submit_reload(["KB"])
+        await asyncio.gather(*containers.reload_jobs._tasks)
+        return before, containers.reload_jobs.get(job["job_id"])
+
+    before, job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert "shrank" in job["error"]
+    assert containers.mappings is before
+    assert read_signature(update_module.MAPPING_SNAPSHOT_PATH) == before.signature
+
+
+def test_incremental_reload_merges_changes_since_watermark(containers):
+    kb = kb_items(4, title="v2")
+    for i, item in enumerate(kb):
+        item["_ts"] = 90 + i  # 水位會停在 93
+    containers.lookup_db.containers["ApChatbotKnowledge"] = kb
+    update_service = UpdateService(containers)
+
+    async def run(incremental):
+        job = update_service.submit_reload(["KB"], incremental=incremental)
+        await asyncio.gather(*containers.reload_jobs._tasks)
+        return containers.reload_jobs.get(job["job_id"])
+
+    async def scenario():
+        containers.reload_jobs = ReloadJobs()
+        containers.publish_mappings(await asyncio.to_thread(update_service.attach_mapping_snapshot))
+        first = await run(incremental=True)  # 尚無水位：完整讀取
+
+        kb[1] = {**kb[1], "title": "v3-1", "_ts": 200}
+        kb.append({"kb_no": 2000, "lang": "en", "title": "new", "summary": "s", "content": "c", "_ts": 200})
+        del kb[0]  # 增量模式看不到刪除
+        second = await run(incremental=True)
+        third = await run(incremental=True)  # 水位之後沒有新變動
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first["kind"] == "KB:delta" and first["changed"] == {"KB": 4}
+    assert second["changed"] == {"KB": 2}  # _ts == 93 的邊界文件重複讀到，但內容未變
+    assert third["changed"] == {"KB": 0}
+    assert third["version"] == second["version"]
+    assert update_module.load_watermarks() == {"KB": 200}
+    assert containers.KB_mappings["1001_zh-tw"]["title"] == "v3-1"
+    assert containers.KB_mappings["1002_zh-tw"]["title"] == "v2-2"
+    assert containers.KB_mappings["2000_en"]["title"] == "new"
+    assert "1000_zh-tw" in containers.KB_mappings
+
+
+def test_incremental_kb_reload_does_not_load_every_record(containers, monkeypatch):
+    kb = kb_items(300)
+    for i, item in enumerate(kb):
+        item["_ts"] = i  # 水位會停在 299
+    containers.lookup_db.containers["ApChatbotKnowledge"] = kb
+    update_service = UpdateService(containers)
+    decoded = []
+    original_decode = KBStore._decode
+
+    async def scenario():
+        containers.reload_jobs = ReloadJobs()
+        containers.publish_mappings(await asyncio.to_thread(update_service.attach_mapping_snapshot))
+        job = update_service.submit_reload(["KB"])  # 完整讀取並設定水位
+        await asyncio.gather(*containers.reload_jobs._tasks)
+        assert containers.reload_jobs.get(job["job_id"])["status"] == "succeeded"
+
+        kb[5] = {**kb[5], "title": "changed", "_ts": 500}
+        monkeypatch.setattr(KBStore, "_decode", lambda self, row, column: decoded.append(row) or original_decode(self, row, column))
+        job = update_service.submit_reload(["KB"], incremental=True)
+        await asyncio.gather(*containers.reload_jobs._tasks)
+        return containers.reload_jobs.get(job["job_id"])
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "succeeded" and job["changed"] == {"KB": 1}, job
+    assert len(decoded) <= 6  # 只比對水位後讀到的兩筆（含邊界秒），其餘 298 筆不解碼
+    assert containers.KB_mappings["1005_zh-tw"]["title"] == "changed"
+    assert containers.KB_mappings["1299_zh-tw"]["title"] == "v1-299"
+    assert dict(KBStore.open(update_module.KB_STORE_PATH)["1005_zh-tw"])["title"] == "changed"
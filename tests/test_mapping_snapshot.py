@@ -0,0 +1,101 @@
+"""
+MappingSnapshot 測試
+內容與原始 pickle 一致、只建檔一次、signature 變動才重建、多行程同時啟動只有一個建檔
+"""
+
+import multiprocessing
+import pickle
+
+import pytest
+
+from src.integrations import mapping_snapshot
+from src.integrations.mapping_snapshot import FrozenJsonMap, MappingSnapshot
+
+
+@pytest.fixture(scope="module")
+def tables():
+    with open("config/rag_mappings.pkl", "rb") as f1, open("config/rag_hint_id_index_mapping.pkl", "rb") as f2, \
+            open("config/kb_mappings.pkl", "rb") as f3:
+        rag_mappings, rag_index, kb_mappings = pickle.load(f1), pickle.load(f2), pickle.load(f3)
+    return {
+        "rag_mappings": rag_mappings,
+        "rag_hint_id_index_mapping": rag_index,
+        "KB_mappings": kb_mappings,
+        "PL_mappings": {"tw": {"notebook", "phone"}, "co ": {"aio"}},
+        "productline_name_map": {"tw": {"notebook": "筆記型電腦"}},
+        "specific_kb_mappings": {"1015071_desktop": {"id": "0", "correct_kb_no": 1047955}},
+    }
+
+
+def test_snapshot_matches_source_tables(tables):
+    snapshot = MappingSnapshot(mapping_snapshot.build_snapshot(tables, signature="s1"))
+
+    assert snapshot.signature == "s1"
+    assert dict(snapshot.rag_mappings) == tables["rag_mappings"]
+    assert dict(snapshot.rag_hint_id_index_mapping) == tables["rag_hint_id_index_mapping"]
+    assert {k: dict(v) for k, v in snapshot.KB_mappings.items()} == tables["KB_mappings"]
+    assert snapshot.PL_mappings["tw"] == frozenset({"notebook", "phone"})
+    assert "notebook" in snapshot.PL_mappings["tw"]
+    assert snapshot.productline_name_map.get("tw").get("notebook") == "筆記型電腦"
+    assert snapshot.specific_kb_mappings.get("1015071_desktop").get("correct_kb_no") == 1047955
+
+
+def test_json_map_returns_fresh_values():
+    table = FrozenJsonMap(FrozenJsonMap.build({"b": {"x": 1}, "a": [1, 2], "中文": "值"}))
+
+    value = table["b"]
+    value["x"] = 2  # 呼叫端可修改（如 rag_mappings.get(key).copy() 後加欄位），不影響 snapshot
+    assert table["b"] == {"x": 1}
+    assert list(table) == ["a", "b", "中文"]
+    assert table.get("中文") == "值" and table.get("c") is None
+    assert "a" in table and 1 not in table
+
+
+def test_load_or_build_only_rebuilds_on_signature_change(tmp_path, tables):
+    path = tmp_path / "mapping_snapshot.bin"
+    builds = []
+
+    def build():
+        builds.append(1)
+        return tables
+
+    first = mapping_snapshot.load_or_build(path, "v1", build)
+    mapping_snapshot.load_or_build(path, "v1", build)
+    assert len(builds) == 1
+    mapping_snapshot.load_or_build(path, "v2", build)
+    assert len(builds) == 2
+    # 舊的 mmap 在 rename 後仍然可讀
+    assert first.rag_mappings.get("1014276_hk_1")["question"] == "我的設備無法開機"
+
+
+def _build_counted(counter_path):
+    with open(counter_path, "a") as f:
+        f.write("x")
+    return {
+        "rag_mappings": {"k": 1},
+        "rag_hint_id_index_mapping": {},
+        "KB_mappings": {"1_zh-tw": {"title": "t", "summary": "s", "content": "c"}},
+        "PL_mappings": {},
+        "productline_name_map": {},
+        "specific_kb_mappings": {},
+    }
+
+
+def _worker(path, counter_path):
+    snapshot = mapping_snapshot.load_or_build(path, "same", lambda: _build_counted(counter_path))
+    assert snapshot.rag_mappings["k"] == 1
+
+
+@pytest.mark.skipif(mapping_snapshot.fcntl is None, reason="needs fcntl")
+def test_concurrent_workers_build_once(tmp_path):
+    path, counter_path = str(tmp_path / "snap.bin"), str(tmp_path / "builds")
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_worker, args=(path, counter_path)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [w.exitcode for w in workers] == [0] * 4
+    with open(counter_path) as f:
+        assert f.read() == "x"
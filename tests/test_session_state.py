@@ -0,0 +1,198 @@
+"""
+Session 狀態測試
+預設停用、查無時回 Cosmos 讀取、insert_data / insert_hint_data write-through、LRU 淘汰、turn / audit 拆分
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.integrations.cosmos_process import CosmosConfig, project_history, split_turn
+
+
+def turn(session_id, user_input, bot_scope="notebook"):
+    return {
+        "session_id": session_id,
+        "user_input": user_input,
+        "user_info": {"main_product_category": bot_scope},
+        "process_info": {"bot_scope": bot_scope},
+        "extract": {"output": {"answer": f"re: {user_input}"}},
+    }
+
+
+class NullContainer:
+    async def execute_item_batch(self, batch_operations, partition_key):
+        pass
+
+
+def make_settings(monkeypatch, size=10, window=20, container=True):
+    settings = CosmosConfig({"TECH_SESSION_STATE_SIZE": str(size), "TECH_HISTORY_WINDOW": str(window)})
+    if container:  # 歷史查詢已替換，container 只需接受寫入
+        settings.async_container = NullContainer()
+    calls = []
+
+    async def query_history(session_id):
+        calls.append(("history", session_id))
+        return [project_history(turn(session_id, "舊問題"))]
+
+    async def latest_hint(session_id):
+        calls.append(("hint", session_id))
+        return None
+
+    monkeypatch.setattr(settings, "_query_history", query_history)
+    monkeypatch.setattr(settings, "get_latest_hint", latest_hint)
+    return settings, calls
+
+
+def test_write_through_avoids_cosmos_reads(monkeypatch):
+    settings, calls = make_settings(monkeypatch)
+
+    async def scenario():
+        first = await settings.load_session("s1", "螢幕不亮")
+        await settings.insert_data(turn("s1", "螢幕不亮", bot_scope="desktop"))
+        await settings.insert_hint_data(
+            SimpleNamespace(session_id="s1", chat_id="c2", user_input="螢幕不亮"),
+            intent_hints=[{"id": 1}], search_info="screen is black", hint_type="productline-reask",
+        )
+        second = await settings.load_session("s1", "還是不亮")
+        return first, second
+
+    (first_history, first_hint), (second_history, second_hint) = asyncio.run(scenario())
+    assert calls == [("history", "s1"), ("hint", "s1")]
+    assert first_history[:2] == (["舊問題", "螢幕不亮"], 1)
+    assert first_hint is None
+
+    messages, chat_count, user_info, last_bot_scope, last_extract_output = second_history
+    assert messages == ["舊問題", "螢幕不亮", "還是不亮"] and chat_count == 2
+    assert user_info == {"main_product_category": "desktop"} and last_bot_scope == "desktop"
+    assert last_extract_output == {"answer": "re: 螢幕不亮", "ask_flag": None, "kb": {"kb_no": ""}}
+    assert second_hint["hintType"] == "productline-reask" and second_hint["chatId"] == "c2"
+
+    user_info["main_product_category"] = "changed"  # 呼叫端修改不影響保存的狀態
+    assert asyncio.run(settings.load_session("s1", "x"))[0][2] == {"main_product_category": "desktop"}
+
+
+def test_unknown_session_is_not_created_from_a_write(monkeypatch):
+    settings, calls = make_settings(monkeypatch)
+
+    async def scenario():
+        await settings.insert_data(turn("s2", "第一句"))
+        return await settings.load_session("s2", "第二句")
+
+    history, _ = asyncio.run(scenario())
+    assert ("history", "s2") in calls  # 沒有載入過，仍回 Cosmos 讀完整紀錄
+    assert history[0] == ["舊問題", "第二句"]
+
+
+def test_state_is_opt_in_and_never_cached_from_mock_history(monkeypatch):
+    assert CosmosConfig({}).session_state.cache.maxsize == 0  # 多 worker 未做 session affinity 時會讀到舊狀態
+
+    settings, calls = make_settings(monkeypatch, container=False)
+
+    async def scenario():
+        await settings.load_session("s4", "q1")
+        await settings.load_session("s4", "q2")
+
+    asyncio.run(scenario())
+    assert [kind for kind, _ in calls] == ["history", "hint", "history", "hint"]
+    assert settings.session_state.get("s4") is None
+
+
+def test_idle_sessions_are_evicted(monkeypatch):
+    settings, calls = make_settings(monkeypatch, size=2)
+
+    async def scenario():
+        for session_id in ("a", "b", "a", "c", "a", "b"):
+            await settings.load_session(session_id, "q")
+
+    asyncio.run(scenario())
+    assert [session_id for kind, session_id in calls if kind == "history"] == ["a", "b", "c", "b"]
+
+
+def test_history_window_applies_to_cached_state(monkeypatch):
+    settings, _ = make_settings(monkeypatch, window=2)
+
+    async def scenario():
+        await settings.load_session("s3", "q1")
+        for text in ("q1", "q2", "q3"):
+            await settings.insert_data(turn("s3", text))
+        return await settings.load_session("s3", "q4")
+
+    (messages, chat_count, *_), _ = asyncio.run(scenario())
+    assert messages == ["q2", "q3", "q4"] and chat_count == 2
+
+
+def test_history_query_is_parameterized_projected_and_windowed():
+    settings = CosmosConfig({"TECH_HISTORY_WINDOW": "3"})
+    calls = []
+
+    class FakeContainer:
+        def query_items(self, query, parameters, **kwargs):
+            calls.append((query, parameters, kwargs))
+
+            async def rows():
+                for ts in (30, 20, 10):  # ORDER BY c._ts DESC
+                    yield {"user_input": f"q{ts}", "bot_scope": "nb", "extract_output": None, "_ts": ts}
+            return rows()
+
+    settings.async_container = FakeContainer()
+    results = asyncio.run(settings._query_history("s1"))
+
+    assert [r["user_input"] for r in results] == ["q10", "q20", "q30"]
+    query, parameters, kwargs = calls[0]
+    assert "SELECT TOP @k c.user_input" in query and "SELECT *" not in query
+    assert {"name": "@session_id", "value": "s1"} in parameters and {"name": "@k", "value": 3} in parameters
+    assert kwargs == {"partition_key": "s1"}
+
+
+def test_turn_record_stays_flat_and_audit_keeps_payload():
+    def document(size):
+        data = turn("s1", "螢幕不亮")
+        data["id"] = "test-s1-c1"
+        data["extract"]["output"] = {"answer": "a" * size, "ask_flag": False, "hint_candidates": ["h"] * size,
+                                     "kb": {"kb_no": "1014276", "title": "t" * size}}
+        data["process_info"].update(faq_pl={"faq": list(range(size))}, faq_wo_pl={"faq": list(range(size))})
+        data["final_result"] = {"message": "m" * size}
+        return data
+
+    small_turn, _ = split_turn(document(10))
+    big_turn, big_audit = split_turn(document(50_000))
+
+    assert len(json.dumps(big_turn)) - len(json.dumps(small_turn)) <= 2000  # 只有回答受上限截斷後的長度差
+    assert big_turn["extract"]["output"]["kb"] == {"kb_no": "1014276"}
+    assert project_history(big_turn)["bot_scope"] == "notebook"
+    assert big_audit["id"] == big_turn["id"]
+    assert len(big_audit["final_result"]["message"]) == 50_000
+    assert len(big_audit["extract"]["output"]["hint_candidates"]) == 50_000
+
+
+def test_insert_data_writes_turn_and_audit():
+    settings = CosmosConfig({})
+    written = {}
+
+    class FakeContainer:
+        def __init__(self, name):
+            self.name = name
+
+        async def execute_item_batch(self, batch_operations, partition_key):
+            assert partition_key == "s1"
+            for operation, (item,) in batch_operations:
+                assert operation == "upsert"
+                written[self.name] = item
+
+        async def upsert_item(self, body):  # audit 逐筆寫入
+            written[self.name] = body
+
+    settings.async_container = FakeContainer("turn")
+    settings.async_audit_container = FakeContainer("audit")
+    data = turn("s1", "螢幕不亮")
+    data["final_result"] = {"status": 200}
+
+    async def main():
+        assert await settings.insert_data(data) == "success"
+        await settings.close()
+
+    asyncio.run(main())
+
+    assert "final_result" not in written["turn"] and written["turn"]["user_input"] == "螢幕不亮"
+    assert written["audit"]["final_result"] == {"status": 200}
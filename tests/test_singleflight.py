@@ -0,0 +1,81 @@
+"""
+SingleFlight 測試
+並發相同 key 只執行一次、例外共用、呼叫端取消不影響其他人
+"""
+
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_share")
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("a", lambda: fetch("a")) for _ in range(5)),
+            flight.do("b", lambda: fetch("b")),
+        )
+
+    results = asyncio.run(scenario())
+    assert calls == ["a", "b"]
+    assert results[:5] == [{"key": "a"}] * 5
+    assert flight.saved == 4
+    assert len(flight) == 0
+
+
+def test_sequential_calls_are_not_cached():
+    flight = SingleFlight("test_sequential")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [await flight.do("a", fetch), await flight.do("a", fetch)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_exception_is_shared():
+    flight = SingleFlight("test_error")
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("vector api down")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("a", boom), flight.do("a", boom), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.saved == 1
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight("test_cancel")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("a", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("a", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "ok"
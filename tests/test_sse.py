@@ -0,0 +1,59 @@
+"""
+SSE 串流測試
+心跳、資料事件格式、TTFB callback 與 client 斷線時取消上游
+"""
+
+import asyncio
+import json
+
+from utils.sse import sse_stream
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after_checks=None):
+        self.checks = 0
+        self.disconnect_after_checks = disconnect_after_checks
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after_checks is not None and self.checks >= self.disconnect_after_checks
+
+
+def test_heartbeat_and_events():
+    first_event = []
+
+    async def events():
+        await asyncio.sleep(0.12)
+        yield {"status": 200, "message": "OK", "result": {"text": "哈囉"}}
+
+    async def run():
+        return [c async for c in sse_stream(FakeRequest(), events(), heartbeat_interval=0.05,
+                                            on_first_event=lambda: first_event.append(True))]
+
+    chunks = asyncio.run(run())
+
+    assert chunks[0] == ": ping\n\n"
+    assert chunks[-1].startswith("data: ") and chunks[-1].endswith("\n\n")
+    assert json.loads(chunks[-1][len("data: "):])["result"]["text"] == "哈囉"
+    assert first_event == [True]
+
+
+def test_disconnect_cancels_upstream():
+    cancelled = asyncio.Event()
+
+    async def events():
+        try:
+            await asyncio.sleep(10)  # 模擬進行中的 LLM 呼叫
+            yield {"status": 200}
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        chunks = [c async for c in sse_stream(FakeRequest(disconnect_after_checks=2), events(), heartbeat_interval=0.02)]
+        return chunks, cancelled.is_set()
+
+    chunks, was_cancelled = asyncio.run(asyncio.wait_for(run(), 2))
+
+    assert chunks == [": ping\n\n"]
+    assert was_cancelled
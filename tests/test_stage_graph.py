@@ -0,0 +1,252 @@
+"""
+Stage graph scheduler 測試
+確認 stage 在輸入就緒時即啟動、critical path 正確，以及 TechAgentProcessor 前處理的並行順序與 stage latency
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import tech_agent_api
+from src.core.stage_graph import Stage, StageGraph
+from src.core.tech_agent_api import TechAgentInput, TechAgentProcessor
+from src.integrations.mapping_snapshot import MappingTables
+from utils.stage_metrics import stage_latency_seconds
+
+
+def sleeper(delay, log, name):
+    async def run():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+    return run
+
+
+def test_stage_starts_when_inputs_ready_and_critical_path():
+    log = []
+    graph = StageGraph([
+        Stage("a", sleeper(0.01, log, "a"), outputs=("x",)),
+        Stage("slow", sleeper(0.15, log, "slow"), inputs=("x",), outputs=("y",)),
+        Stage("fast", sleeper(0.01, log, "fast"), inputs=("x",), outputs=("z",)),
+        Stage("join", sleeper(0.01, log, "join"), inputs=("y", "z")),
+    ])
+
+    run = asyncio.run(graph.run())
+
+    # fast 不必等 slow 完成
+    assert log.index(("end", "fast")) < log.index(("end", "slow"))
+    assert [t.name for t in run.critical_path()] == ["a", "slow", "join"]
+
+
+@pytest.mark.parametrize("stages", [
+    [Stage("a", None, inputs=("missing",))],
+    [Stage("a", None, inputs=("y",), outputs=("x",)), Stage("b", None, inputs=("x",), outputs=("y",))],
+])
+def test_invalid_graph_rejected(stages):
+    with pytest.raises(ValueError):
+        StageGraph(stages)
+
+
+def test_failure_cancels_running_stages():
+    cancelled = []
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    graph = StageGraph([Stage("boom", boom), Stage("slow", slow)])
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await graph.run()
+        assert cancelled == [True]  # run() 拋出前已等到被取消的 stage 結束
+
+    asyncio.run(main())
+
+
+def test_pipeline_failure_cancels_background_tasks(monkeypatch):
+    processor, _ = make_processor(monkeypatch)
+
+    async def fail(**kwargs):
+        raise RuntimeError("redis down")
+
+    async def slow_avatar(*args):
+        await asyncio.sleep(5)
+
+    processor.containers.sd.service_discreminator_with_productline = fail
+    monkeypatch.setattr(
+        tech_agent_api, "ServiceProcess",
+        lambda system_code, container, mappings=None: SimpleNamespace(
+            ts_rag=SimpleNamespace(reply_with_faq_gemini_sys_avatar=slow_avatar)
+        ),
+    )
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await processor._run_pipeline()
+        await asyncio.sleep(0)
+        assert processor.avatar_process.cancelled()
+
+    asyncio.run(main())
+
+
+class FakeChatFlow:
+    events = []
+
+    def __init__(self, data, last_hint, container):
+        self.container = container
+        self.default_user_info = {"main_product_category": data.product_line, "first_time": True}
+
+    async def get_searchInfo(self, his_inputs):
+        self.events.append(("translation", list(his_inputs)))
+        return his_inputs[-1].lower()
+
+    async def get_userInfo(self, his_inputs):
+        return [{"main_product_category": "notebook"}]
+
+    async def get_bot_scope_chat(self, prev_user_info, curr_user_info, last_bot_scope):
+        return "notebook"
+
+    async def is_follow_up(self, **kwargs):
+        return {"is_follow_up": False}
+
+
+class FakeGrouping:
+    async def sentence_group_classification(self, his_inputs):
+        await asyncio.sleep(0.1)
+        FakeChatFlow.events.append(("grouping_done", None))
+        return {"groups": [{"statements": his_inputs[-1:]}]}
+
+
+def make_processor(monkeypatch, bot_scope="notebook", last_bot_scope="notebook"):
+    FakeChatFlow.events = []
+    faq_calls = []
+
+    async def load_session(session_id, user_input):
+        return (["舊問題", user_input], 1, None, last_bot_scope, {"answer": "", "kb": {"kb_no": ""}}), None
+
+    async def lang(*args):
+        return "zh-tw"
+
+    async def faq_search(**kwargs):
+        faq_calls.append(kwargs["productLine"])
+        return {"faq": [1], "cosineSimilarity": [0.9], "productLine": [kwargs["productLine"]]}, {}
+
+    async def avatar(*args):
+        return {"response": "hi"}
+
+    async def get_bot_scope_chat(self, prev_user_info, curr_user_info, last_bot_scope):
+        return bot_scope
+
+    containers = SimpleNamespace(
+        cosmos_settings=SimpleNamespace(
+            load_session=load_session, get_language_by_websitecode_dev=lang,
+        ),
+        sentence_group_classification=FakeGrouping(),
+        sd=SimpleNamespace(service_discreminator_with_productline=faq_search),
+        mappings=MappingTables(),
+    )
+    monkeypatch.setattr(FakeChatFlow, "get_bot_scope_chat", get_bot_scope_chat)
+    monkeypatch.setattr(tech_agent_api, "ChatFlow", FakeChatFlow)
+    monkeypatch.setattr(
+        tech_agent_api, "ServiceProcess",
+        lambda system_code, container, mappings=None: SimpleNamespace(ts_rag=SimpleNamespace(reply_with_faq_gemini_sys_avatar=avatar)),
+    )
+
+    processor = TechAgentProcessor(containers, TechAgentInput(
+        cus_id="c", session_id="s", chat_id="t", user_input="筆電無法開機",
+        websitecode="tw", product_line="", system_code="rog",
+    ))
+    return processor, faq_calls
+
+
+def test_processor_translation_overlaps_sentence_grouping(monkeypatch):
+    processor, _ = make_processor(monkeypatch)
+    asyncio.run(processor._run_pipeline())
+
+    assert FakeChatFlow.events[0] == ("translation", ["筆電無法開機"])
+    assert processor.search_info == "筆電無法開機"
+    assert processor.bot_scope_chat == "notebook"
+    assert processor.top1_kb == 1
+    assert "sentence_grouping" in [t.name for t in processor.stage_run.critical_path()]
+
+
+@pytest.mark.parametrize("bot_scope, expected_calls, outcome", [
+    ("notebook", ["notebook"], "hit"),
+    ("desktop", ["notebook", "desktop"], "miss"),
+])
+def test_speculative_faq_search(monkeypatch, bot_scope, expected_calls, outcome):
+    monkeypatch.setattr(tech_agent_api, "SPECULATIVE_FAQ_SEARCH", True)
+    processor, faq_calls = make_processor(monkeypatch, bot_scope=bot_scope)
+    before = tech_agent_api.speculative_faq_total.value(result=outcome)
+
+    asyncio.run(processor._run_pipeline())
+
+    assert faq_calls == expected_calls
+    assert processor.faq_result["productLine"] == [bot_scope]
+    assert tech_agent_api.speculative_faq_total.value(result=outcome) == before + 1
+
+
+def test_stage_latency_observed_once_response_type_known(monkeypatch):
+    processor, _ = make_processor(monkeypatch)
+    labels = {"type": "avatarText", "websitecode": "tw"}
+    stages = ("history_fetch", "sentence_grouping", "translation", "user_info_gpt", "bot_scope", "vector_search")
+    before = {stage: stage_latency_seconds.snapshot(stage=stage, **labels)["count"] for stage in stages}
+
+    async def main():
+        processor.stage_recorder.use()
+        await processor._run_pipeline()
+        assert stage_latency_seconds.snapshot(stage="history_fetch", **labels)["count"] == before["history_fetch"]
+        processor.stage_recorder.finish("avatarText", "tw")
+
+    asyncio.run(main())
+
+    for stage in stages:
+        assert stage_latency_seconds.snapshot(stage=stage, **labels)["count"] == before[stage] + 1
+    assert stage_latency_seconds.snapshot(stage="sentence_grouping", **labels)["sum"] > 0
+
+
+def test_speculation_skipped_when_translation_finishes_after_bot_scope(monkeypatch):
+    monkeypatch.setattr(tech_agent_api, "SPECULATIVE_FAQ_SEARCH", True)
+    processor, faq_calls = make_processor(monkeypatch)
+
+    async def slow_translation(self, his_inputs):
+        await asyncio.sleep(0.3)  # 句子分組 0.1s 後 bot scope 就已確定
+        return his_inputs[-1].lower()
+
+    monkeypatch.setattr(FakeChatFlow, "get_searchInfo", slow_translation)
+    before = {r: tech_agent_api.speculative_faq_total.value(result=r) for r in ("hit", "miss", "skipped")}
+
+    async def main():
+        await processor._run_pipeline()
+        assert processor.faq_speculation is None
+
+    asyncio.run(main())
+
+    assert faq_calls == ["notebook"]
+    after = {r: tech_agent_api.speculative_faq_total.value(result=r) for r in ("hit", "miss", "skipped")}
+    assert after == {**before, "skipped": before["skipped"] + 1}
+
+
+def test_unknown_websitecode_is_labelled_other(monkeypatch):
+    processor, _ = make_processor(monkeypatch)
+    processor.user_input.websitecode = "x" * 40  # 任意呼叫端輸入不可產生新的 series
+    before = stage_latency_seconds.snapshot(stage="history_fetch", type="avatarText", websitecode="other")["count"]
+
+    async def main():
+        processor.stage_recorder.use()
+        await processor._run_pipeline()
+        processor.stage_recorder.finish("avatarText", tech_agent_api.websitecode_label(processor.user_input.websitecode))
+
+    asyncio.run(main())
+
+    assert tech_agent_api.websitecode_label("tw") == "tw"
+    assert stage_latency_seconds.snapshot(stage="history_fetch", type="avatarText", websitecode="other")["count"] == before + 1
+    assert stage_latency_seconds.snapshot(stage="history_fetch", type="avatarText", websitecode="x" * 40)["count"] == 0
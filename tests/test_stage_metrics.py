@@ -0,0 +1,50 @@
+"""
+Stage latency recorder 測試
+回應類型確定前暫存、之後直接 observe，以及 contextvar 傳遞到子 task
+"""
+
+import asyncio
+
+import pytest
+
+from utils.stage_metrics import StageRecorder, stage_latency_seconds, stage_timer, timed_stage
+
+
+def count(stage, response_type="avatarTechnicalSupport", websitecode="tw"):
+    return stage_latency_seconds.snapshot(stage=stage, type=response_type, websitecode=websitecode)["count"]
+
+
+def test_records_from_child_tasks_and_after_finish():
+    @timed_stage("t_avatar")
+    async def avatar():
+        await asyncio.sleep(0.01)
+
+    async def main():
+        recorder = StageRecorder().use()
+        background = asyncio.create_task(avatar())  # 繼承 recorder
+        with stage_timer("t_search"):
+            await asyncio.sleep(0)
+        assert count("t_search") == 0  # 類型未定，先暫存
+        recorder.finish("avatarTechnicalSupport", "tw")
+        recorder.finish("avatarText", "tw")  # 只有第一次有效
+        assert count("t_search") == 1
+        await background
+        assert count("t_avatar") == 1
+        assert count("t_avatar", "avatarText") == 0
+
+    asyncio.run(main())
+
+
+def test_failed_stage_and_no_recorder_are_ignored():
+    async def main():
+        with stage_timer("t_outside"):  # 不在 request 內
+            pass
+        recorder = StageRecorder().use()
+        with pytest.raises(RuntimeError):
+            with stage_timer("t_failed"):
+                raise RuntimeError("gemini 500")
+        recorder.finish("avatarText", "jp")
+
+    asyncio.run(main())
+    assert count("t_outside", "unknown", "") == 0
+    assert count("t_failed", "avatarText", "jp") == 0
@@ -0,0 +1,51 @@
+"""
+coalesce_text 測試
+確認逐字的上游輸出會依字數 / 時間窗合併，且內容與例外都原樣保留
+"""
+
+import asyncio
+
+import pytest
+
+from utils.streaming import coalesce_text
+
+
+async def source(pieces, delay=0.0, error=None):
+    for piece in pieces:
+        if delay:
+            await asyncio.sleep(delay)
+        yield piece
+    if error:
+        raise error
+
+
+async def collect(chunks):
+    return [c async for c in chunks]
+
+
+def test_coalesce_by_size():
+    text = "我的筆電卡在登入畫面" * 20
+    out = asyncio.run(collect(coalesce_text(source(list(text)), max_chars=40, max_wait=1.0)))
+
+    assert "".join(out) == text
+    assert len(out) == len(text) // 40
+    assert all(len(c) == 40 for c in out)
+
+
+def test_coalesce_by_time_window():
+    # 上游每 20ms 一個字，30ms 時間窗應每 1~2 個字就送出，不會等到 40 字
+    out = asyncio.run(collect(coalesce_text(source(list("abcdefgh"), delay=0.02), max_chars=40, max_wait=0.03)))
+
+    assert "".join(out) == "abcdefgh"
+    assert 1 < len(out) < 8
+
+
+def test_upstream_error_after_flush():
+    async def run():
+        received = []
+        with pytest.raises(RuntimeError):
+            async for chunk in coalesce_text(source(list("abc"), error=RuntimeError("boom")), max_chars=40):
+                received.append(chunk)
+        return received
+
+    assert asyncio.run(run()) == ["abc"]
@@ -0,0 +1,152 @@
+"""
+RedisConfig 向量搜尋結果快取測試
+以假的 aiohttp session 計算實際打出的請求數
+"""
+
+import asyncio
+import json
+
+from src.integrations.Redis_process import RedisConfig
+
+
+class FakeResponse:
+    def __init__(self, payload, delay=0):
+        self.payload = payload
+        self.delay = delay
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, payload=None, delay=0):
+        self.posts = []
+        self.delay = delay
+        self.payload = payload or {"status": 200, "result": {"faqs": [{"kb_no": 1051479, "key": "tech_support:4.0--1051479-999-90028", "hide": 3, "cosineSimilarity": 0.91}]}}
+
+    def post(self, url, headers=None, data=None):
+        self.posts.append(data)
+        return FakeResponse(self.payload, self.delay)
+
+
+def make_config(session, **extra):
+    config = {"TECH_REDIS_E50_URL": "http://vector.test/search", **extra}
+    return RedisConfig(config, session)
+
+
+def test_same_payload_is_served_from_cache():
+    session = FakeSession()
+    redis_config = make_config(session)
+
+    async def scenario():
+        first = await redis_config.get_service("無法開機", "tw")
+        second = await redis_config.get_service("無法開機", "tw")
+        await redis_config.get_service("無法開機", "us")  # 不同 site 不共用
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert len(session.posts) == 2
+    stats = redis_config.cache_stats()["get_service"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert redis_config.cache_stats()["get_replace_service"]["hits"] == 0
+
+
+def test_version_change_invalidates():
+    session = FakeSession()
+    redis_config = make_config(session, TECH_VECTOR_INDEX_VERSION="v1")
+
+    async def scenario():
+        await redis_config.get_hint_simiarity("藍屏")
+        redis_config.index_version = "v2"
+        await redis_config.get_hint_simiarity("藍屏")
+        redis_config.faq_ver = "4.1"
+        await redis_config.get_hint_simiarity("藍屏")
+        await redis_config.get_hint_simiarity("藍屏")
+
+    asyncio.run(scenario())
+    assert len(session.posts) == 3
+
+
+def test_empty_result_is_not_cached():
+    session = FakeSession({"status": 200, "result": {"faqs": []}})
+    redis_config = make_config(session)
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await redis_config.get_service("???", "tw")
+            except IndexError:
+                pass
+
+    asyncio.run(scenario())
+    assert len(session.posts) == 2
+
+
+def test_concurrent_identical_queries_share_one_post():
+    session = FakeSession(delay=0.01)
+    redis_config = make_config(session)
+
+    async def scenario():
+        return await asyncio.gather(*(redis_config.get_service("無法開機", "tw") for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(session.posts) == 1
+    assert all(r == results[0] for r in results)
+    assert redis_config.inflight.saved == 4
+
+
+class FakeBatchSession(FakeSession):
+    """list payload 端點：依 keyword 回傳各自的 faqs。"""
+
+    def post(self, url, headers=None, data=None):
+        payloads = json.loads(data)
+        self.posts.append(payloads)
+        result = [
+            {"faqs": [{"kb_no": i, "key": f"k-{i}", "hide": i, "cosineSimilarity": round(0.9 + i / 100, 2)}]}
+            for i, p in enumerate(payloads)
+        ]
+        return FakeResponse({"status": 200, "result": result}, self.delay)
+
+
+def test_batching_sends_one_list_payload():
+    session = FakeBatchSession(delay=0.01)
+    redis_config = make_config(session, TECH_VECTOR_BATCH_ENABLED="true", TECH_VECTOR_BATCH_WINDOW_MS="5")
+
+    async def scenario():
+        results = await asyncio.gather(
+            redis_config.get_specific_service("translated", "tw"),
+            redis_config.get_service("translated", "tw"),
+            redis_config.get_service("原文", "tw"),
+            redis_config.get_replace_service("merged", "tw"),
+        )
+        await redis_config.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(session.posts) == 1
+    assert [p["keyword"] for p in session.posts[0]] == ["translated", "translated", "原文", "merged"]
+    assert [r["service_similarity"] for r in results] == [0.9, 0.91, 0.92, 0.93]  # 依序拆回各呼叫端
+    assert redis_config.batcher.calls == 1
+
+
+def test_batch_result_size_mismatch_fails_all_callers():
+    session = FakeSession({"status": 200, "result": [{"faqs": []}]})
+    redis_config = make_config(session, TECH_VECTOR_BATCH_ENABLED="1")
+
+    async def scenario():
+        return await asyncio.gather(
+            redis_config.get_service("a", "tw"),
+            redis_config.get_service("b", "tw"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
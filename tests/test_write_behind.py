@@ -0,0 +1,210 @@
+"""
+Write-behind 佇列測試
+依 kind 批次寫入、失敗重試（部分失敗只重試失敗項目）、佇列滿時捨棄可丟棄項目、shutdown 時寫完、
+寫入失敗移除 session 狀態、partition key 設定與 audit 逐筆寫入
+"""
+
+import asyncio
+
+from src.integrations.cosmos_process import CosmosConfig
+from src.integrations.session_state import SessionState
+from src.integrations.write_behind import PartialWriteError, WriteBehindQueue, write_dropped_total
+
+
+def test_batches_items_by_kind():
+    batches = []
+
+    async def write_batch(kind, items):
+        batches.append((kind, list(items)))
+
+    async def main():
+        queue = WriteBehindQueue("t-batch", write_batch, batch_size=10, flush_interval=0.01)
+        for i in range(3):
+            assert await queue.put("turn", i)
+            assert await queue.put("audit", f"a{i}")
+        await queue.close()
+
+    asyncio.run(main())
+    assert sorted(batches) == [("audit", ["a0", "a1", "a2"]), ("turn", [0, 1, 2])]
+
+
+def test_retries_then_drops_failed_batch():
+    attempts, dropped = [], []
+
+    async def write_batch(kind, items):
+        attempts.append(kind)
+        if kind == "bad" or len(attempts) == 1:
+            raise RuntimeError("503")
+
+    async def main():
+        queue = WriteBehindQueue(
+            "t-retry", write_batch, max_retries=2, retry_backoff=0.001,
+            on_drop=lambda kind, items: dropped.append((kind, items)),
+        )
+        await queue.put("good", 1)
+        await queue.close()
+        await asyncio.sleep(0)
+        queue = WriteBehindQueue(
+            "t-retry", write_batch, max_retries=2, retry_backoff=0.001,
+            on_drop=lambda kind, items: dropped.append((kind, items)),
+        )
+        await queue.put("bad", 2)
+        await queue.close()
+
+    asyncio.run(main())
+    assert attempts == ["good", "good", "bad", "bad", "bad"]  # 第一次失敗後重試成功；bad 共 1 + 2 次
+    assert dropped == [("bad", [2])]
+    assert write_dropped_total.value(queue="t-retry", kind="bad", reason="failed") == 1
+
+
+def test_full_queue_sheds_audit_and_applies_backpressure():
+    release = None
+
+    async def write_batch(kind, items):
+        await release.wait()
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        queue = WriteBehindQueue("t-full", write_batch, max_size=2, batch_size=1, put_timeout=0.01)
+        await queue.put("turn", 0)
+        await asyncio.sleep(0.01)  # worker 取走第一筆後卡在寫入
+        assert await queue.put("turn", 1) and await queue.put("turn", 2)
+        assert await queue.put("audit", "a", sheddable=True) is False
+        assert await queue.put("turn", 3) is False  # 等待 put_timeout 後仍滿
+        release.set()
+        await queue.close()
+
+    asyncio.run(main())
+    assert write_dropped_total.value(queue="t-full", kind="audit", reason="full") == 1
+    assert write_dropped_total.value(queue="t-full", kind="turn", reason="timeout") == 1
+
+
+def test_close_drains_pending_items():
+    written = []
+
+    async def write_batch(kind, items):
+        await asyncio.sleep(0.001)
+        written.extend(items)
+
+    async def main():
+        queue = WriteBehindQueue("t-drain", write_batch, batch_size=7)
+        for i in range(50):
+            await queue.put("turn", i)
+        await queue.close()
+        assert await queue.put("turn", 99) is False  # 關閉後不再接受
+
+    asyncio.run(main())
+    assert sorted(written) == list(range(50))
+
+
+def test_cosmos_batches_per_partition_and_discards_state_on_drop():
+    settings = CosmosConfig({"TECH_COSMOS_WRITE_RETRIES": "0", "TECH_SESSION_STATE_SIZE": "10"})
+    settings.session_state.put("s1", SessionState(user_inputs=("q",)))
+    settings.session_state.put("s2", SessionState(user_inputs=("q",)))
+    calls = []
+
+    class FakeContainer:
+        async def execute_item_batch(self, batch_operations, partition_key):
+            calls.append((partition_key, len(batch_operations)))
+            if partition_key == "s2":
+                raise RuntimeError("conflict")
+
+    settings.async_container = FakeContainer()
+    docs = [{"id": str(i), "session_id": "s1"} for i in range(120)] + [{"id": "x", "session_id": "s2"}]
+
+    async def main():
+        await settings._write_batch("turn", docs[:120])
+        try:
+            await settings._write_batch("turn", docs[120:])
+        except RuntimeError:
+            settings._on_write_dropped("turn", docs[120:])
+
+    asyncio.run(main())
+    assert sorted(calls) == [("s1", 20), ("s1", 100), ("s2", 1)]  # 每批最多 100 筆
+    assert settings.session_state.get("s1") is not None
+    assert settings.session_state.get("s2") is None
+
+
+def test_failing_on_drop_does_not_stop_worker():
+    written = []
+
+    async def write_batch(kind, items):
+        if kind == "bad":
+            raise RuntimeError("503")
+        written.extend(items)
+
+    def on_drop(kind, items):
+        raise KeyError(kind)
+
+    async def main():
+        queue = WriteBehindQueue("t-on-drop", write_batch, max_retries=0, on_drop=on_drop)
+        await queue.put("bad", 1)
+        worker = queue._worker
+        await asyncio.sleep(0.1)
+        assert not worker.done()  # on_drop 拋出例外後 worker 仍在執行
+        await queue.put("good", 2)
+        assert queue._worker is worker
+        await queue.close(drain_timeout=1.0)
+
+    asyncio.run(main())
+    assert written == [2]
+
+
+def test_partial_failure_retries_only_failed_items():
+    attempts = []
+
+    async def write_batch(kind, items):
+        attempts.append(list(items))
+        failed = [item for item in items if item == "big"]
+        if failed:
+            raise PartialWriteError(failed, RuntimeError("413"))
+
+    async def main():
+        queue = WriteBehindQueue("t-partial", write_batch, batch_size=10, max_retries=1, retry_backoff=0.001)
+        for item in ("a", "big", "b"):
+            await queue.put("audit", item)
+        await queue.close()
+
+    asyncio.run(main())
+    assert attempts == [["a", "big", "b"], ["big"]]
+    assert write_dropped_total.value(queue="t-partial", kind="audit", reason="failed") == 1
+
+
+def test_cosmos_partition_keys_and_itemwise_audit():
+    settings = CosmosConfig({"TECH_COSMOS_WRITE_RETRIES": "0", "TECH_COSMOS_TURN_PARTITION_KEY": "cus_id"})
+    calls = []
+
+    class FakeContainer:
+        def __init__(self, name, partition_path):
+            self.name, self.partition_path = name, partition_path
+
+        async def read(self):
+            calls.append((self.name, "read"))
+            return {"id": self.name, "partitionKey": {"paths": [self.partition_path], "kind": "Hash"}}
+
+        async def execute_item_batch(self, batch_operations, partition_key):
+            calls.append((self.name, partition_key, len(batch_operations)))
+
+        async def upsert_item(self, body):
+            if len(body["payload"]) > 10:
+                raise RuntimeError("413 request entity too large")
+            calls.append((self.name, body["id"]))
+
+    settings.async_container = FakeContainer("turn", "/session_id")
+    settings.async_hint_container = FakeContainer("hint", "/chatId")
+    settings.async_audit_container = FakeContainer("audit", "/session_id")
+
+    async def main():
+        await settings._write_batch("turn", [{"id": "t", "session_id": "s1", "cus_id": "c1"}])
+        for _ in range(2):
+            await settings._write_batch("hint", [{"id": "h", "sessionId": "s1", "chatId": "c9"}])
+        try:
+            await settings._write_batch("audit", [{"id": "ok", "payload": "x"}, {"id": "big", "payload": "x" * 100}])
+        except PartialWriteError as e:
+            return e.failed
+
+    failed = asyncio.run(main())
+    assert ("turn", "c1", 1) in calls and ("turn", "read") not in calls  # 有設定就不讀 container
+    assert [c for c in calls if c[0] == "hint"] == [("hint", "read"), ("hint", "c9", 1), ("hint", "c9", 1)]
+    assert ("audit", "ok") in calls and [item["id"] for item in failed] == ["big"]
@@ -0,0 +1,95 @@
+import time
+import unicodedata
+from collections import OrderedDict
+
+from utils.metrics import REGISTRY
+
+cache_requests_total = REGISTRY.counter(
+    "tech_agent_cache_requests_total",
+    "In-process cache lookups by cache name and result (hit / miss).",
+    ("cache", "result"),
+)
+cache_evictions_total = REGISTRY.counter(
+    "tech_agent_cache_evictions_total",
+    "Entries evicted from in-process caches because of size or TTL.",
+    ("cache",),
+)
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """快取 key 用：NFKC 全半形統一、去頭尾空白、合併連續空白、忽略大小寫。"""
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+class TTLCache:
+    """有上限的 LRU + TTL 快取（單一 event loop 內使用，不加鎖）。
+
+    ``maxsize <= 0`` 時停用：``get`` 一律 miss、``set`` 不保存。
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                cache_requests_total.inc(cache=self.name, result="hit")
+                return value
+            del self._data[key]
+            self._record_eviction()
+        self.misses += 1
+        cache_requests_total.inc(cache=self.name, result="miss")
+        return default
+
+    def peek(self, key, default=None):
+        """讀取但不計入命中統計、不更新 LRU 順序（寫入路徑用）。"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._record_eviction()
+
+    def clear(self):
+        self._data.clear()
+
+    def _record_eviction(self):
+        self.evictions += 1
+        cache_evictions_total.inc(cache=self.name)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,69 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """``{intent: [keyword, ...]}`` 編譯成 Aho-Corasick 自動機，每段文字只掃描一次。
+
+    結果與逐一 ``keyword in text`` 的迴圈相同：依 ``intent_dict`` 的 intent 順序、
+    再依 keyword 順序，取第一個出現在文字中的 (keyword, intent)。
+    每個 keyword 以其在迴圈中的先後作為優先序，狀態上預先存好「此處結束的 keyword 中最優先者」，
+    掃描時只需取最小值。比對區分大小寫（與原本的子字串判斷一致）。
+    """
+
+    def __init__(self, intent_dict: dict):
+        self.intent_dict = intent_dict
+        self.entries = []  # 優先序 -> (keyword, intent)
+        goto, best = [{}], [None]
+        for intent, keywords in intent_dict.items():
+            for keyword in keywords:
+                priority = len(self.entries)
+                self.entries.append((keyword, intent))
+                state = 0
+                for ch in keyword:
+                    next_state = goto[state].get(ch)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][ch] = next_state
+                        goto.append({})
+                        best.append(None)
+                    state = next_state
+                if best[state] is None:  # 重複的 keyword 保留最先出現的
+                    best[state] = priority
+
+        # BFS 建 failure link，並把 suffix 上的最優先 keyword 合併進來
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())  # 深度 1 的 failure link 皆為 root
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[next_state] = goto[f].get(ch, 0)
+                inherited = best[fail[next_state]]
+                if inherited is not None and (best[next_state] is None or inherited < best[next_state]):
+                    best[next_state] = inherited
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, text: str):
+        """回傳第一優先的 (keyword, intent)，沒有任何 keyword 出現時回傳 None。"""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = best[0]  # 空字串 keyword 對任何文字都成立
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            priority = best[state]
+            if priority is not None and (found is None or priority < found):
+                found = priority
+                if found == 0:
+                    break
+        return None if found is None else self.entries[found]
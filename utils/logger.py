@@ -1,29 +1,99 @@
 import os
+import atexit
+import json
+import queue
+import random
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 # 取得 main.py 所在目錄
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.abspath(os.path.join(BASE_DIR, ".."))  # 回到 project root
-LOG_PATH = os.path.join(BASE_DIR, "tech_agent.log")
+# 設為空字串則不寫檔（測試、benchmark 只輸出到 console）
+LOG_PATH = os.getenv("TECH_LOG_PATH", os.path.join(BASE_DIR, "tech_agent.log"))
+
+# 寫檔 / 輸出到 console 由背景 thread 處理；佇列滿時丟棄（不阻塞 event loop）
+LOG_QUEUE_SIZE = int(os.getenv("TECH_LOG_QUEUE_SIZE", "10000"))
+# 大型 payload（歷史對話、FAQ 搜尋結果、cosmos_data）的抽樣比例；預設 1.0 全部記錄，調低才抽樣（opt-in）
+LARGE_PAYLOAD_SAMPLE_RATE = float(os.getenv("TECH_LOG_LARGE_PAYLOAD_SAMPLE_RATE", "1.0"))
+# 各 stage 的 log level，例如 "history=WARNING,cosmos=DEBUG"
+STAGE_LEVELS = os.getenv("TECH_LOG_STAGE_LEVELS", "")
 
 
 class SuppressGoogleAuthInfoFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
         return "The user provided Google Cloud credentials" not in record.getMessage()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
+
+class LazyJson:
+    """當作 %s 參數傳給 logger：只有真的要輸出時才序列化。
+
+    ``large=True`` 的 payload 依 TECH_LOG_LARGE_PAYLOAD_SAMPLE_RATE 抽樣，沒抽中只留佔位字串。
+    """
+
+    __slots__ = ("payload", "large")
+
+    def __init__(self, payload, large: bool = False):
+        self.payload = payload
+        self.large = large
+
+    def __str__(self):
+        if self.large and random.random() >= LARGE_PAYLOAD_SAMPLE_RATE:
+            return f"<omitted, sample rate {LARGE_PAYLOAD_SAMPLE_RATE:g}>"
+        return json.dumps(self.payload, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """佇列滿時丟棄 record 並計數，而不是讓 request 等待寫檔。"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 訊息（含 LazyJson）在呼叫端 thread 組好：payload 之後可能被修改，不能交給 writer thread 讀
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:  # traceback 物件不跨 thread 保留
+            record.exc_text = _formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_formatter = logging.Formatter(
+    fmt="%(asctime)s | %(levelname)s | %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(LOG_PATH, encoding="utf-8"),
-        logging.StreamHandler()
-    ]
 )
-
-for handler in logging.getLogger().handlers:
+_output_handlers = [logging.StreamHandler()]
+if LOG_PATH:
+    _output_handlers.insert(0, logging.FileHandler(LOG_PATH, encoding="utf-8"))
+for handler in _output_handlers:
+    handler.setFormatter(_formatter)
     handler.addFilter(SuppressGoogleAuthInfoFilter())
 
+queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+
+_listener = QueueListener(queue_handler.queue, *_output_handlers, respect_handler_level=True)
+_listener.start()
+
+
+def stop_logging():
+    """把佇列中剩下的 log 寫完並停止背景 thread（process 結束時自動呼叫）"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
 # 避免過多日誌訊息
 for noisy_logger in [
     "azure.core.pipeline.policies.http_logging_policy",
@@ -33,14 +103,36 @@ for noisy_logger in [
     "azure",
     "openai",
     "httpx",
-    "google.auth", 
+    "google.auth",
     "google.auth._default",
     "google.genai",
     "google.api_core.client_info",
-    "google.api_core.bidi",            
+    "google.api_core.bidi",
     "google.cloud",
 ]:
     logging.getLogger(noisy_logger).setLevel(logging.WARNING)
 
 # 提供共用 logger
 logger = logging.getLogger(__name__)
+
+
+def parse_stage_levels(spec: str) -> dict:
+    """"history=WARNING,cosmos=DEBUG" -> {"history": 30, "cosmos": 10}；無法辨識的項目略過"""
+    levels = {}
+    for item in spec.split(","):
+        stage, _, level = item.partition("=")
+        level = logging.getLevelName(level.strip().upper())
+        if stage.strip() and isinstance(level, int):
+            levels[stage.strip()] = level
+    return levels
+
+
+_stage_levels = parse_stage_levels(STAGE_LEVELS)
+
+
+def get_stage_logger(stage: str) -> logging.Logger:
+    """各 stage 的 logger（utils.logger.<stage>），level 依 TECH_LOG_STAGE_LEVELS 設定，未設定則沿用共用 logger"""
+    stage_logger = logger.getChild(stage)
+    if stage in _stage_levels:
+        stage_logger.setLevel(_stage_levels[stage])
+    return stage_logger
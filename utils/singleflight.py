@@ -0,0 +1,42 @@
+import asyncio
+
+from utils.metrics import REGISTRY
+
+singleflight_saved_total = REGISTRY.counter(
+    "tech_agent_singleflight_saved_total",
+    "Calls that joined an identical in-flight request instead of issuing their own.",
+    ("flight",),
+)
+
+
+class SingleFlight:
+    """同一 key 同時只執行一次：並發的相同呼叫共用同一個進行中的 task 與其結果（或例外）。
+
+    task 完成即移除，不做結果快取（快取交給呼叫端）。個別呼叫端被取消時以 ``shield`` 保護，
+    不會連帶取消其他正在等待的呼叫端。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+        self.saved = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.saved += 1
+            singleflight_saved_total.inc(flight=self.name)
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 所有呼叫端都已取消時，避免 "exception was never retrieved"
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from utils.logger import logger
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache, no-transform",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # 關閉 Nginx 緩衝，事件才會即時送達
+}
+
+_END = object()
+
+
+def format_sse(data: dict) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def sse_stream(request, events, heartbeat_interval: float = 15.0, on_first_event=None):
+    """把 ``events``（async iterator of dict）轉成 SSE 字串串流。
+
+    - 閒置超過 ``heartbeat_interval`` 秒送出 ``: ping`` 註解，避免 proxy / LB 斷線
+    - 每次心跳檢查 ``request.is_disconnected()``；client 斷線或本串流被關閉時，
+      取消仍在執行的上游（連帶取消其中進行中的 LLM 呼叫）
+    - 第一個資料事件送出前呼叫 ``on_first_event()``（TTFB 量測用）
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        except Exception as e:
+            logger.error(f"Streaming error: {e}", exc_info=True)
+            queue.put_nowait({"status": 500, "message": f"error: {str(e)}", "result": {}})
+        finally:
+            queue.put_nowait(_END)
+
+    producer = asyncio.create_task(pump())
+    first = True
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_interval)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    logger.info("[SSE] client 已斷線，取消上游處理")
+                    break
+                yield ": ping\n\n"
+                continue
+
+            if event is _END:
+                break
+            if first:
+                first = False
+                if on_first_event:
+                    on_first_event()
+            yield format_sse(event)
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,74 @@
+"""Per-request stage latency，依回應類型與 websitecode 分類後輸出到 ``/metrics``。
+
+回應類型要到 pipeline 後段才知道，所以各 stage 的耗時先記在本 request 的 ``StageRecorder``，
+``finish(type, websitecode)`` 時一次 observe；之後才完成的 stage（背景 avatar、Cosmos 寫入）直接 observe。
+Recorder 透過 contextvar 傳遞：request 開始時 ``use()``，之後建立的 task 都會繼承，
+深層的 service（RAG、avatar）只需 ``with stage_timer("rag_generation"):``，不必層層傳參數。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from utils.metrics import REGISTRY
+
+stage_latency_seconds = REGISTRY.histogram(
+    "tech_agent_stage_latency_seconds",
+    "Latency of each pipeline stage by response type and websitecode.",
+    ("stage", "type", "websitecode"),
+)
+
+_current: ContextVar[Optional["StageRecorder"]] = ContextVar("stage_recorder", default=None)
+
+
+class StageRecorder:
+    def __init__(self):
+        self.pending = []  # (stage, seconds)，finish 前暫存
+        self.labels = None
+
+    def use(self):
+        """設為目前 context 的 recorder（之後建立的 task 會繼承）"""
+        _current.set(self)
+        return self
+
+    def record(self, stage: str, seconds: float):
+        if self.labels is None:
+            self.pending.append((stage, seconds))
+        else:
+            stage_latency_seconds.observe(seconds, stage=stage, **self.labels)
+
+    def finish(self, response_type: str, websitecode: str):
+        """回應類型確定後呼叫：送出暫存的耗時；只有第一次呼叫有效"""
+        if self.labels is not None:
+            return
+        self.labels = {"type": response_type or "unknown", "websitecode": websitecode or ""}
+        pending, self.pending = self.pending, []
+        for stage, seconds in pending:
+            stage_latency_seconds.observe(seconds, stage=stage, **self.labels)
+
+
+def record_stage(stage: str, seconds: float):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.record(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """只記錄正常完成的 stage（例外、取消不計）；不在 request 內時不做事"""
+    start = time.perf_counter()
+    yield
+    record_stage(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage: str):
+    """async function 的 decorator 版本"""
+    def decorator(async_func):
+        @wraps(async_func)
+        async def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return await async_func(*args, **kwargs)
+        return wrapper
+    return decorator
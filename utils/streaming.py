@@ -0,0 +1,62 @@
+import asyncio
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+async def coalesce_text(chunks, max_chars: int = 40, max_wait: float = 0.03):
+    """將上游的文字 chunk 依「字數或時間窗」合併後再輸出。
+
+    緩衝區累積到 ``max_chars`` 字元，或第一個字進入緩衝後超過 ``max_wait`` 秒，
+    就輸出一次；上游拋出的例外會在送出已緩衝內容後原樣拋出。
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for text in chunks:
+                if text:
+                    queue.put_nowait(text)
+        except Exception as e:
+            queue.put_nowait(_Failure(e))
+        finally:
+            queue.put_nowait(_END)
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(pump())
+    buffer: list[str] = []
+    size = 0
+    deadline = None
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+                continue
+
+            if item is _END:
+                break
+            if isinstance(item, _Failure):
+                if buffer:
+                    yield "".join(buffer)
+                raise item.error
+
+            buffer.append(item)
+            size += len(item)
+            if deadline is None:
+                deadline = loop.time() + max_wait
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        task.cancel()